@@ -1,26 +1,243 @@
+import argparse
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta, timezone
+from pathlib import Path
 from typing import Any, cast
 
 import requests
 
-from src.paths import data_dir
-from src.utils import write_json_atomic
-from src.validation import validate_archive_output
+from src.http_client import HttpClient, shared_http_client
+from src.metrics import metrics, span, timed
+from src.paths import CONFIG_PATH, data_dir
+from src.utils import configure_json_output, json_digest, write_output_json
+from src.validation import count_records, validate_archive_output
 
 
 class ArchiveFetchError(RuntimeError):
     """Raised when existing published data cannot be safely retrieved."""
 
 
+class ArchiveCompactionError(RuntimeError):
+    """Raised when an archive cannot be safely compacted from its log."""
+
+
+STORAGE_MODES = ("json", "log")
+
+
+def upsert_events(
+    archive: dict[str, list[dict[str, Any]]], events: list[dict[str, Any]]
+) -> None:
+    """Add events to an archive in order, replacing records with the same URL.
+
+    Positions of each touched category's records are built once per
+    category, so every event is an O(1) insert or in-place update.
+    """
+    positions: dict[str, dict[str, int]] = {}
+    for event in events:
+        category = event["category"]
+        records = archive.setdefault(category, [])
+        if category not in positions:
+            positions[category] = {e["article_url"]: i for i, e in enumerate(records)}
+        position = positions[category].get(event["article_url"])
+        if position is None:
+            positions[category][event["article_url"]] = len(records)
+            records.append(event)
+        else:
+            records[position] = event
+
+
+class ArchiveIndex:
+    """Where each archived event is published, kept in ``archives/index.json``.
+
+    Maps every ``article_url`` to the year and category of its archived
+    record and a digest of that record, so the archiver can tell without
+    downloading an archive whether an event is already in it unchanged.
+    """
+
+    FILE_NAME = "index.json"
+
+    def __init__(self, entries: dict[str, dict[str, Any]] | None = None):
+        self.entries = entries or {}
+
+    @classmethod
+    def from_json(cls, data: Any) -> "ArchiveIndex":
+        """Build an index from its JSON form; anything malformed starts empty."""
+        if isinstance(data, dict) and all(
+            isinstance(entry, dict)
+            and isinstance(entry.get("year"), int)
+            and isinstance(entry.get("category"), str)
+            and isinstance(entry.get("digest"), str)
+            for entry in data.values()
+        ):
+            return cls(data)
+        print("Archive index is malformed; rebuilding it", flush=True)
+        return cls()
+
+    @classmethod
+    def load(cls, path: Path) -> "ArchiveIndex":
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return cls()
+        except (OSError, ValueError):
+            data = None
+        return cls.from_json(data)
+
+    def contains(self, year: int, event: dict[str, Any]) -> bool:
+        """Whether ``event`` is already archived in ``year`` exactly as it is."""
+        entry = self.entries.get(event["article_url"])
+        return entry == {
+            "year": year,
+            "category": event["category"],
+            "digest": json_digest(event),
+        }
+
+    def add(self, year: int, event: dict[str, Any]) -> None:
+        self.entries[event["article_url"]] = {
+            "year": year,
+            "category": event["category"],
+            "digest": json_digest(event),
+        }
+
+    def record(self, year: int, archive: dict[str, list[dict[str, Any]]]) -> None:
+        """Replace the entries of ``year`` with the records of its archive."""
+        self.entries = {
+            url: entry for url, entry in self.entries.items() if entry["year"] != year
+        }
+        for events in archive.values():
+            for event in events:
+                self.add(year, event)
+
+    def save(self, path: Path) -> None:
+        write_output_json(path, dict(sorted(self.entries.items())))
+
+
+class ArchiveLog:
+    """Append-only NDJSON segments of archived events, under ``archives/log``.
+
+    Each year has a directory of monthly segments, named for the month the
+    events were appended, with one archived event per line. Reading the
+    segments in name order replays the events in the order they were
+    archived. A line torn by a crash is skipped: the run that tore it never
+    saved the cleaned events.json, so the event is archived again.
+    """
+
+    DIR_NAME = "log"
+
+    def __init__(self, archives_dir: Path):
+        self.directory = archives_dir / self.DIR_NAME
+
+    def append(
+        self, year: int, events: list[dict[str, Any]], now_utc: datetime
+    ) -> Path:
+        segment = self.directory / f"archive_{year}" / f"{now_utc:%Y-%m}.ndjson"
+        segment.parent.mkdir(parents=True, exist_ok=True)
+        with segment.open("a", encoding="utf-8") as f:
+            f.writelines(json.dumps(e, ensure_ascii=False) + "\n" for e in events)
+        return segment
+
+    def years(self) -> list[int]:
+        return sorted(
+            int(path.name.removeprefix("archive_"))
+            for path in self.directory.glob("archive_*")
+            if path.is_dir() and path.name.removeprefix("archive_").isdigit()
+        )
+
+    def segments(self, year: int) -> list[Path]:
+        return sorted((self.directory / f"archive_{year}").glob("*.ndjson"))
+
+    def clear(self, year: int) -> None:
+        for segment in self.segments(year):
+            segment.unlink()
+        try:
+            (self.directory / f"archive_{year}").rmdir()
+        except OSError:
+            pass
+
+    def read(self, year: int) -> list[dict[str, Any]]:
+        events = []
+        for segment in self.segments(year):
+            for line in segment.read_text(encoding="utf-8").splitlines():
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    print(f"Skipping a torn line in {segment}", flush=True)
+                    continue
+                if isinstance(event, dict):
+                    events.append(event)
+        return events
+
+
+def compact_archives(archives_dir: Path) -> list[int]:
+    """Fold each year's log into ``archive_YYYY.json`` and clear the log.
+
+    Every year is merged and validated before anything is written. Replaying
+    a log is idempotent, so a compaction interrupted before the log is
+    cleared is simply run again. Returns the compacted years.
+    """
+    log = ArchiveLog(archives_dir)
+    compacted: dict[int, dict[str, list[dict[str, Any]]]] = {}
+    for year in log.years():
+        archive_name = f"archive_{year}"
+        archive_path = archives_dir / f"{archive_name}.json"
+        try:
+            archive = json.loads(archive_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            archive = {}
+        except (OSError, ValueError) as e:
+            raise ArchiveCompactionError(f"Could not read {archive_path}") from e
+        if not isinstance(archive, dict):
+            raise ArchiveCompactionError(f"{archive_path} is not a JSON object")
+        validate_archive_output(archive_name, archive, allow_empty=True)
+        upsert_events(archive, log.read(year))
+        validate_archive_output(archive_name, archive)
+        compacted[year] = archive
+
+    if not compacted:
+        print("No archive log to compact.", flush=True)
+        return []
+
+    index_path = archives_dir / ArchiveIndex.FILE_NAME
+    index = ArchiveIndex.load(index_path)
+    for year, archive in compacted.items():
+        write_output_json(archives_dir / f"archive_{year}.json", archive)
+        index.record(year, archive)
+        metrics.set_gauge(
+            "output_records", count_records(archive), file=f"archive_{year}"
+        )
+    index.save(index_path)
+    for year in compacted:
+        log.clear(year)
+        print(f"Compacted the archive_{year} log into archive_{year}.json.", flush=True)
+    return sorted(compacted)
+
+
+# Matches archiver.max_workers in config.json.
+DEFAULT_MAX_WORKERS = 4
+
+
 class EventArchiver:
-    def __init__(self, user: str, repo: str):
+    def __init__(
+        self,
+        user: str,
+        repo: str,
+        http_client: HttpClient | None = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        storage: str = "json",
+    ):
+        if storage not in STORAGE_MODES:
+            raise ValueError(f"Unknown archive storage mode: {storage}")
         self.repo_base_url = f"https://raw.githubusercontent.com/{user}/{repo}/data"
         self.events_url = f"{self.repo_base_url}/events.json"
+        self.index_url = f"{self.repo_base_url}/archives/{ArchiveIndex.FILE_NAME}"
 
         self.json_dir = data_dir()
         self.archives_dir = self.json_dir / "archives"
         self.events_path = self.json_dir / "events.json"
+        self.http = http_client or shared_http_client()
+        self.max_workers = max_workers
+        self.storage = storage
 
     def _should_archive(
         self, event: dict[str, Any], now_utc: datetime
@@ -46,12 +263,15 @@ class EventArchiver:
 
         return False, None
 
+    @timed("EventArchiver.run")
     def run(self) -> None:
         print("--- Running Event Archiver ---", flush=True)
         now_utc = datetime.now(UTC)
 
         try:
-            response = requests.get(self.events_url, timeout=15)
+            with span("EventArchiver.fetch_events") as stage:
+                response = self.http.get(self.events_url)
+                stage.add_bytes(len(response.content))
             response.raise_for_status()
             current_events_data = response.json()
         except requests.exceptions.HTTPError as e:
@@ -86,10 +306,28 @@ class EventArchiver:
             if active_events_in_category:
                 remaining_events[category] = active_events_in_category
 
-        for year, events in events_to_archive_by_year.items():
-            self._update_archive_file(year, events)
+        merged: dict[int, dict[str, list[dict[str, Any]]]] = {}
+        if events_to_archive_by_year:
+            index = self._fetch_index()
+            unarchived = self._unarchived_events(index, events_to_archive_by_year)
+            if self.storage == "log":
+                self._append_to_log(index, unarchived, now_utc)
+            else:
+                merged = self._merge_archives(unarchived)
+            for year, archive_data in merged.items():
+                index.record(year, archive_data)
+
+        for year, archive_data in merged.items():
+            self._write_archive(
+                year, archive_data, len(events_to_archive_by_year[year])
+            )
+        if merged:
+            index.save(self.archives_dir / ArchiveIndex.FILE_NAME)
 
-        write_json_atomic(self.events_path, remaining_events)
+        write_output_json(self.events_path, remaining_events)
+        metrics.set_gauge(
+            "output_records", count_records(remaining_events), file="events"
+        )
         if events_to_archive_by_year:
             print(
                 f"events.json has been cleaned and saved to {self.events_path}.",
@@ -98,13 +336,109 @@ class EventArchiver:
         else:
             print("No new events to archive.", flush=True)
 
-    def _update_archive_file(self, year: int, events: list[dict[str, Any]]) -> None:
+    def _fetch_index(self) -> ArchiveIndex:
+        try:
+            with span("EventArchiver.fetch_index") as stage:
+                response = self.http.get(self.index_url)
+                stage.add_bytes(len(response.content))
+            response.raise_for_status()
+            data = response.json()
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return ArchiveIndex()
+            raise ArchiveFetchError("Could not fetch the archive index") from e
+        except json.JSONDecodeError:
+            data = None
+        except requests.exceptions.RequestException as e:
+            raise ArchiveFetchError("Could not fetch the archive index") from e
+        return ArchiveIndex.from_json(data)
+
+    @staticmethod
+    def _unarchived_events(
+        index: ArchiveIndex, events_by_year: dict[int, list[dict[str, Any]]]
+    ) -> dict[int, list[dict[str, Any]]]:
+        """Drop events the index shows are already archived unchanged.
+
+        A year left with no events is not fetched or rewritten at all.
+        """
+        unarchived = {}
+        for year, events in events_by_year.items():
+            pending = [event for event in events if not index.contains(year, event)]
+            if pending:
+                unarchived[year] = pending
+            else:
+                print(
+                    f"archive_{year} already holds its {len(events)} event(s) "
+                    "unchanged; not fetched.",
+                    flush=True,
+                )
+        return unarchived
+
+    def _append_to_log(
+        self,
+        index: ArchiveIndex,
+        events_by_year: dict[int, list[dict[str, Any]]],
+        now_utc: datetime,
+    ) -> None:
+        """Append new and changed events to the archive log, in O(new events).
+
+        Published archives are neither fetched nor rewritten; ``compact``
+        folds the log into them later. Every year's events are validated
+        before any is appended.
+        """
+        for year, events in events_by_year.items():
+            by_category: dict[str, list[dict[str, Any]]] = {}
+            for event in events:
+                by_category.setdefault(event["category"], []).append(event)
+            validate_archive_output(f"archive_{year}", by_category)
+
+        log = ArchiveLog(self.archives_dir)
+        for year, events in sorted(events_by_year.items()):
+            segment = log.append(year, events, now_utc)
+            for event in events:
+                index.add(year, event)
+            print(f"Logged {len(events)} event(s) to {segment}.", flush=True)
+        if events_by_year:
+            index.save(self.archives_dir / ArchiveIndex.FILE_NAME)
+
+    def _merge_archives(
+        self, events_by_year: dict[int, list[dict[str, Any]]]
+    ) -> dict[int, dict[str, list[dict[str, Any]]]]:
+        """Fetches and merges every year's archive on a bounded worker pool.
+
+        Nothing is written here: if any archive cannot be fetched or merged
+        safely, its error is raised before a single file has changed.
+        """
+        years = sorted(events_by_year)
+        if not years:
+            return {}
+        max_workers = max(1, min(self.max_workers, len(years)))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self._merge_archive, year, events_by_year[year])
+                for year in years
+            ]
+            try:
+                return {
+                    year: future.result()
+                    for year, future in zip(years, futures, strict=True)
+                }
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    def _merge_archive(
+        self, year: int, events: list[dict[str, Any]]
+    ) -> dict[str, list[dict[str, Any]]]:
         archive_name = f"archive_{year}"
-        archive_file_path = self.archives_dir / f"{archive_name}.json"
         archive_url = f"{self.repo_base_url}/archives/{archive_name}.json"
 
         try:
-            response = requests.get(archive_url, timeout=15)
+            with span("EventArchiver.fetch_archive") as stage:
+                response = self.http.get(archive_url)
+                stage.add_bytes(len(response.content))
             response.raise_for_status()
             archive_data = response.json()
         except requests.exceptions.HTTPError as e:
@@ -122,18 +456,39 @@ class EventArchiver:
         archive_data = cast(dict[str, list[dict[str, Any]]], archive_data)
         validate_archive_output(archive_name, archive_data, allow_empty=True)
 
-        for event in events:
-            category = event["category"]
-            if category not in archive_data:
-                archive_data[category] = []
-            archive_data[category].append(event)
+        upsert_events(archive_data, events)
+        validate_archive_output(archive_name, archive_data)
+        return archive_data
 
-            # Simple de-duplication
-            unique_events = list(
-                {e["article_url"]: e for e in archive_data[category]}.values()
-            )
-            archive_data[category] = unique_events
+    def _write_archive(
+        self, year: int, archive_data: dict[str, list[dict[str, Any]]], added: int
+    ) -> None:
+        archive_name = f"archive_{year}"
+        archive_file_path = self.archives_dir / f"{archive_name}.json"
+        write_output_json(archive_file_path, archive_data)
+        metrics.set_gauge(
+            "output_records", count_records(archive_data), file=archive_name
+        )
+        print(f"Archived {added} event(s) to {archive_file_path}.", flush=True)
 
-        validate_archive_output(archive_name, archive_data)
-        write_json_atomic(archive_file_path, archive_data)
-        print(f"Archived {len(events)} event(s) to {archive_file_path}.", flush=True)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Fold the append-only archive log into the yearly archives."
+    )
+    parser.add_argument("action", choices=["compact"])
+    parser.add_argument(
+        "--archives-dir",
+        type=Path,
+        default=data_dir() / "archives",
+        help="directory holding archive_YYYY.json and log/ (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    with CONFIG_PATH.open("r", encoding="utf-8") as f:
+        configure_json_output(json.load(f).get("output"))
+    compact_archives(args.archives_dir)
+
+
+if __name__ == "__main__":
+    main()
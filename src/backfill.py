@@ -1,15 +1,28 @@
 import argparse
+import asyncio
+import hashlib
 import json
-import time
+from collections.abc import Callable
+from pathlib import Path
 from typing import Any, cast
 
 import requests
-from bs4 import BeautifulSoup
 
-from src.paths import data_dir
+from src.archiver import ArchiveIndex
+from src.cache import maintain_cache
+from src.http_client import HttpClient, configure_http_client, shared_http_client
+from src.metrics import metrics, span, timed
+from src.paths import data_dir, runtime_root
+from src.prometheus import export_textfile
 from src.scrapers.event_page_scraper import EventPageScraper
-from src.utils import write_json_atomic
-from src.validation import validate_archive_output
+from src.utils import (
+    configure_json_output,
+    json_digest,
+    save_run_metrics,
+    write_json_atomic,
+    write_output_json,
+)
+from src.validation import count_records, validate_archive_output
 
 POKEMON_DEFAULTS = {"asset_url": None, "shiny_available": False}
 
@@ -39,25 +52,156 @@ def modernize_details(details: dict[str, Any]) -> dict[str, Any]:
     }
 
 
+class RateLimiter:
+    """Spaces request starts at least ``1 / rate`` seconds apart.
+
+    Requests may still overlap; this caps how fast new ones begin. A rate of
+    None or 0 means no ceiling.
+    """
+
+    def __init__(self, rate: float | None) -> None:
+        self.interval = 1 / rate if rate else 0.0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        await asyncio.sleep(start - now)
+
+
+def shard_of(article_url: str, count: int) -> int:
+    """Return the shard an event belongs to, the same on every run and machine."""
+    digest = hashlib.sha256(article_url.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """Parse ``--shard I/N`` into (I, N), with 0 <= I < N."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected I/N, got {value!r}") from None
+    if not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard {value} is not one of 0/N to N-1/N")
+    return index, count
+
+
+class CheckpointJournal:
+    """An append-only log of the events already rebuilt for one archive.
+
+    Each line records an event's category, URL and published digest with the
+    rebuilt event and its outcome, and is flushed as soon as the event is
+    done, so an interrupted backfill loses at most the pages in flight. A
+    line torn by a crash is ignored on load, as are entries whose published
+    event has changed since.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def load(self) -> dict[tuple[str, str], dict[str, Any]]:
+        """Return the journaled entries by (category, article URL)."""
+        entries: dict[tuple[str, str], dict[str, Any]] = {}
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return entries
+        for line in lines:
+            try:
+                entry = json.loads(line)
+                entries[(entry["category"], entry["article_url"])] = entry
+            except (ValueError, TypeError, KeyError):
+                continue
+        return entries
+
+    def record(
+        self,
+        category: str,
+        source: dict[str, Any],
+        rebuilt: dict[str, Any],
+        outcome: str,
+    ) -> None:
+        entry = {
+            "category": category,
+            "article_url": source["article_url"],
+            "digest": json_digest(source),
+            "outcome": outcome,
+            "event": rebuilt,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def discard(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
 class ArchiveBackfiller:
     """Rebuilds published archives from their original Leek Duck pages.
 
     Re-scraping is the only authoritative source for details that were never
     captured, so pages that still exist are re-read and pages that are gone are
     left as-is apart from a format conversion.
+
+    Events from every requested year are re-read concurrently: at most
+    ``concurrency`` pages are in flight and at most ``requests_per_second``
+    requests start each second.
+
+    Every rebuilt event is journaled under ``journal_dir`` until its year's
+    archive is written, so a run started with ``resume`` only re-reads the
+    events an interrupted run had not finished.
+
+    With ``shard`` set to (I, N), only the events whose ``shard_of`` is I are
+    rebuilt, and the result is written to ``shards_dir`` as a partial file
+    instead of an archive. ``merge`` assembles the N partial files of each
+    year into the archive once every shard has run.
     """
 
-    def __init__(self, user: str, repo: str, years: list[int], delay: float = 0.15):
+    def __init__(
+        self,
+        user: str,
+        repo: str,
+        years: list[int],
+        http_client: HttpClient | None = None,
+        parser: str | None = None,
+        concurrency: int = 4,
+        requests_per_second: float | None = 5.0,
+        shard: tuple[int, int] | None = None,
+    ):
         self.repo_base_url = f"https://raw.githubusercontent.com/{user}/{repo}/data"
+        self.index_url = f"{self.repo_base_url}/archives/{ArchiveIndex.FILE_NAME}"
         self.archives_dir = data_dir() / "archives"
+        self.index: ArchiveIndex | None = None
         self.years = years
-        self.delay = delay
-        self.page_scraper = EventPageScraper({"timeout": 20})
+        self.concurrency = max(1, concurrency)
+        self.requests_per_second = requests_per_second
+        self.journal_dir = runtime_root() / "backfill"
+        self.shards_dir = data_dir() / "shards"
+        self.shard = shard
+        self.http = http_client or shared_http_client()
+        # Backfill requests are already capped by ``concurrency`` and the rate
+        # limiter, so the page scraper's per-host cap must not be tighter.
+        self.page_scraper = EventPageScraper(
+            {
+                "timeout": 20,
+                "parser": parser,
+                "max_requests_per_host": self.concurrency,
+            },
+            self.http,
+        )
 
     def _fetch_archive(self, year: int) -> dict[str, list[dict[str, Any]]]:
         url = f"{self.repo_base_url}/archives/archive_{year}.json"
         try:
-            response = requests.get(url, timeout=15)
+            with span("ArchiveBackfiller.fetch_archive") as stage:
+                response = self.http.get(url)
+                stage.add_bytes(len(response.content))
             response.raise_for_status()
             archive = response.json()
         except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
@@ -70,15 +214,45 @@ class ArchiveBackfiller:
         validate_archive_output(f"archive_{year}", archive, allow_empty=True)
         return archive
 
+    def _published_index(self) -> ArchiveIndex:
+        """The published archive index, fetched once and updated in memory.
+
+        Every year of the index is published, not only the years rebuilt, so
+        the rebuilt years are recorded into it rather than into a fresh one.
+        """
+        if self.index is not None:
+            return self.index
+        try:
+            with span("ArchiveBackfiller.fetch_index") as stage:
+                response = self.http.get(self.index_url)
+                stage.add_bytes(len(response.content))
+            response.raise_for_status()
+            data = response.json()
+        except requests.exceptions.HTTPError as e:
+            if e.response is None or e.response.status_code != 404:
+                raise ArchiveBackfillError("Could not fetch the archive index") from e
+            data = {}
+        except json.JSONDecodeError:
+            data = None
+        except requests.exceptions.RequestException as e:
+            raise ArchiveBackfillError("Could not fetch the archive index") from e
+        self.index = ArchiveIndex.from_json(data)
+        return self.index
+
     def _rescrape(self, event: dict[str, Any]) -> dict[str, Any] | None:
         """Return the current page's parse, or None when the page is gone."""
         url = event["article_url"]
-        response = requests.get(url, timeout=20)
+        with span("ArchiveBackfiller.fetch_page") as stage:
+            response = self.http.get(url, timeout=20)
+            stage.add_bytes(len(response.content))
         if response.status_code == 404:
             return None
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, "lxml")
-        return self.page_scraper._parse_event_details(soup, url)
+        self.http.html_store.put(url, response.content, response.encoding)
+        with span("ArchiveBackfiller.tree"):
+            root = self.page_scraper._parse_document(response.text, url)
+        with span("ArchiveBackfiller.parse"):
+            return self.page_scraper._parse_event_details(root, url)
 
     def _backfill_event(self, event: dict[str, Any]) -> tuple[dict[str, Any], str]:
         """Return the rebuilt event and the outcome for reporting."""
@@ -104,35 +278,273 @@ class ArchiveBackfiller:
             return rebuilt, "description recovered"
         return rebuilt, "updated" if changed else "unchanged"
 
-    def run(self, dry_run: bool = False) -> None:
-        print("--- Running Archive Backfill ---", flush=True)
-        for year in self.years:
-            archive = self._fetch_archive(year)
-            outcomes: dict[str, int] = {}
-            gone: list[str] = []
+    def _shard_name(self, year: int, shard: tuple[int, int]) -> str:
+        return f"archive_{year}.shard-{shard[0]}-of-{shard[1]}"
 
+    def _journal(self, year: int) -> CheckpointJournal:
+        name = f"archive_{year}"
+        if self.shard is not None:
+            name = self._shard_name(year, self.shard)
+        return CheckpointJournal(self.journal_dir / f"{name}.ndjson")
+
+    def _in_shard(self, event: dict[str, Any]) -> bool:
+        if self.shard is None:
+            return True
+        index, count = self.shard
+        return shard_of(event["article_url"], count) == index
+
+    @timed("ArchiveBackfiller.run")
+    def run(self, dry_run: bool = False, resume: bool = False) -> None:
+        print("--- Running Archive Backfill ---", flush=True)
+        asyncio.run(self._run(dry_run, resume))
+
+    async def _run(self, dry_run: bool, resume: bool) -> None:
+        archives = dict(
+            zip(
+                self.years,
+                await asyncio.gather(
+                    *(asyncio.to_thread(self._fetch_archive, y) for y in self.years)
+                ),
+                strict=True,
+            )
+        )
+        sources = {year: json_digest(archive) for year, archive in archives.items()}
+        journals = {year: self._journal(year) for year in archives}
+        results: dict[tuple[int, str, int], tuple[dict[str, Any], str]] = {}
+        jobs: list[tuple[int, str, int, dict[str, Any]]] = []
+        for year, archive in archives.items():
+            journaled = journals[year].load() if resume else {}
+            if not resume and not dry_run:
+                journals[year].discard()
             for category, events in archive.items():
                 for index, event in enumerate(events):
-                    rebuilt, outcome = self._backfill_event(event)
-                    events[index] = rebuilt
-                    outcomes[outcome] = outcomes.get(outcome, 0) + 1
-                    if outcome == "missing":
-                        gone.append(f"[{category}] {event['article_url']}")
-                    time.sleep(self.delay)
-
+                    if not self._in_shard(event):
+                        continue
+                    entry = journaled.get((category, event["article_url"]))
+                    if entry is not None and entry.get("digest") == json_digest(event):
+                        results[(year, category, index)] = (
+                            entry["event"],
+                            entry["outcome"],
+                        )
+                    else:
+                        jobs.append((year, category, index, event))
+            resumed = sum(1 for key in results if key[0] == year)
+            if resumed:
+                print(
+                    f"archive_{year}: resuming with {resumed} event(s) from the "
+                    "journal",
+                    flush=True,
+                )
+
+        def checkpoint(job: int, result: tuple[dict[str, Any], str]) -> None:
+            year, category, _, event = jobs[job]
+            if not dry_run:
+                journals[year].record(category, event, *result)
+
+        rebuilt_events = await self._backfill_events(
+            [event for *_, event in jobs], checkpoint
+        )
+        for (year, category, index, _), result in zip(
+            jobs, rebuilt_events, strict=True
+        ):
+            results[(year, category, index)] = result
+
+        for year, archive in archives.items():
+            rebuilt = [
+                (category, index, *results[(year, category, index)])
+                for category, events in archive.items()
+                for index in range(len(events))
+                if (year, category, index) in results
+            ]
+            if self.shard is None:
+                for category, index, event, _ in rebuilt:
+                    archive[category][index] = event
+                self._publish(year, archive, rebuilt, dry_run)
+            else:
+                self._write_shard(
+                    year, self.shard, archive, sources[year], rebuilt, dry_run
+                )
+            if not dry_run:
+                journals[year].discard()
+
+    def _report(self, label: str, rebuilt: list[tuple[str, int, Any, str]]) -> None:
+        """Print the outcome counts and the pages that no longer exist."""
+        outcomes: dict[str, int] = {}
+        for *_, outcome in rebuilt:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        summary = ", ".join(f"{count} {name}" for name, count in outcomes.items())
+        print(f"{label}: {summary or 'no events'}", flush=True)
+        for category, _, event, outcome in rebuilt:
+            if outcome == "missing":
+                print(
+                    f"   page no longer exists: [{category}] {event['article_url']}",
+                    flush=True,
+                )
+
+    def _publish(
+        self,
+        year: int,
+        archive: dict[str, list[dict[str, Any]]],
+        rebuilt: list[tuple[str, int, Any, str]],
+        dry_run: bool,
+    ) -> None:
+        with span("ArchiveBackfiller.validate"):
             validate_archive_output(f"archive_{year}", archive)
-            summary = ", ".join(f"{count} {name}" for name, count in outcomes.items())
-            print(f"archive_{year}: {summary}", flush=True)
-            for url in gone:
-                print(f"   page no longer exists: {url}", flush=True)
-
-            if dry_run:
-                print(f"archive_{year}: dry run, nothing written.", flush=True)
-                continue
-
-            archive_path = self.archives_dir / f"archive_{year}.json"
-            write_json_atomic(archive_path, archive)
-            print(f"archive_{year}: written to {archive_path}.", flush=True)
+        self._report(f"archive_{year}", rebuilt)
+
+        if dry_run:
+            print(f"archive_{year}: dry run, nothing written.", flush=True)
+            return
+
+        # Fetched before anything is written, so a failed fetch publishes
+        # neither the archive nor an index that lacks it.
+        index = self._published_index()
+        archive_path = self.archives_dir / f"archive_{year}.json"
+        write_output_json(archive_path, archive)
+        # Rebuilt records have new digests, so the year's entries are replaced.
+        index.record(year, archive)
+        index.save(self.archives_dir / ArchiveIndex.FILE_NAME)
+        metrics.set_gauge(
+            "output_records", count_records(archive), file=f"archive_{year}"
+        )
+        print(f"archive_{year}: written to {archive_path}.", flush=True)
+
+    def _write_shard(
+        self,
+        year: int,
+        shard: tuple[int, int],
+        archive: dict[str, list[dict[str, Any]]],
+        source: str,
+        rebuilt: list[tuple[str, int, Any, str]],
+        dry_run: bool,
+    ) -> None:
+        """Validate this shard's events and write them as a partial file."""
+        name = self._shard_name(year, shard)
+        sections: dict[str, list[dict[str, Any]]] = {}
+        for category, _, event, _ in rebuilt:
+            sections.setdefault(category, []).append(event)
+        with span("ArchiveBackfiller.validate"):
+            validate_archive_output(name, sections, allow_empty=True)
+        self._report(name, rebuilt)
+
+        if dry_run:
+            print(f"{name}: dry run, nothing written.", flush=True)
+            return
+
+        shard_path = self.shards_dir / f"{name}.json"
+        write_json_atomic(
+            shard_path,
+            {
+                "year": year,
+                "shard": f"{shard[0]}/{shard[1]}",
+                "source": source,
+                "layout": {
+                    category: len(events) for category, events in archive.items()
+                },
+                "events": [
+                    {"category": c, "index": i, "outcome": o, "event": e}
+                    for c, i, e, o in rebuilt
+                ],
+            },
+        )
+        print(f"{name}: written to {shard_path}.", flush=True)
+
+    @timed("ArchiveBackfiller.merge")
+    def merge(self, count: int, dry_run: bool = False) -> None:
+        """Assemble each year's archive from the partial files of ``count`` shards.
+
+        Every shard must have run against the same published archive, and
+        together they must cover each of its events exactly once.
+        """
+        print(f"--- Merging {count} Backfill Shards ---", flush=True)
+        for year in self.years:
+            archive, rebuilt = self._merge_year(year, count)
+            self._publish(year, archive, rebuilt, dry_run)
+            if not dry_run:
+                for shard in range(count):
+                    name = self._shard_name(year, (shard, count))
+                    (self.shards_dir / f"{name}.json").unlink()
+
+    def _merge_year(
+        self, year: int, count: int
+    ) -> tuple[dict[str, list[dict[str, Any]]], list[tuple[str, int, Any, str]]]:
+        partials = []
+        for shard in range(count):
+            path = self.shards_dir / f"{self._shard_name(year, (shard, count))}.json"
+            try:
+                partials.append(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError) as e:
+                raise ArchiveBackfillError(
+                    f"Shard {shard}/{count} of the {year} archive is missing or "
+                    "unreadable"
+                ) from e
+
+        first = partials[0]
+        if any(
+            (p.get("source"), p.get("layout")) != (first["source"], first["layout"])
+            for p in partials
+        ):
+            raise ArchiveBackfillError(
+                f"Shards of the {year} archive were built from different published "
+                "archives; rerun them"
+            )
+
+        slots: dict[str, list[Any]] = {
+            category: [None] * length for category, length in first["layout"].items()
+        }
+        rebuilt = []
+        for partial in partials:
+            for entry in partial["events"]:
+                category, index = entry["category"], entry["index"]
+                if category not in slots or not 0 <= index < len(slots[category]):
+                    raise ArchiveBackfillError(
+                        f"Shard {partial['shard']} of {year} has an event outside "
+                        "the archive"
+                    )
+                if slots[category][index] is not None:
+                    raise ArchiveBackfillError(
+                        f"{year} event {category}[{index}] is in more than one shard"
+                    )
+                slots[category][index] = entry["event"]
+                rebuilt.append((category, index, entry["event"], entry["outcome"]))
+
+        missing = sum(event is None for events in slots.values() for event in events)
+        if missing:
+            raise ArchiveBackfillError(
+                f"{missing} event(s) of the {year} archive are in no shard"
+            )
+        rebuilt.sort(key=lambda row: (list(slots).index(row[0]), row[1]))
+        return cast(dict[str, list[dict[str, Any]]], slots), rebuilt
+
+    async def _backfill_events(
+        self,
+        events: list[dict[str, Any]],
+        on_done: Callable[[int, tuple[dict[str, Any], str]], None] | None = None,
+    ) -> list[tuple[dict[str, Any], str]]:
+        """Rebuild ``events`` concurrently, returning results in the same order.
+
+        ``on_done`` is called with each event's position and result as soon
+        as it is rebuilt. The first failure cancels the events that have not
+        started yet.
+        """
+        slots = asyncio.Semaphore(self.concurrency)
+        limiter = RateLimiter(self.requests_per_second)
+
+        async def backfill(position: int) -> tuple[dict[str, Any], str]:
+            async with slots:
+                await limiter.wait()
+                result = await asyncio.to_thread(self._backfill_event, events[position])
+            if on_done is not None:
+                on_done(position, result)
+            return result
+
+        tasks = [asyncio.create_task(backfill(i)) for i in range(len(events))]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
 
 
 def main() -> None:
@@ -141,13 +553,74 @@ def main() -> None:
     parser.add_argument(
         "--dry-run", action="store_true", help="report changes without writing"
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="reuse events rebuilt by an interrupted run instead of re-reading them",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="I/N",
+        help="rebuild only shard I of N and write it as a partial file",
+    )
+    mode.add_argument(
+        "--merge",
+        type=int,
+        metavar="N",
+        help="assemble the archives from the partial files of N shards",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, help="pages fetched at once (default: config)"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help="most page requests started per second, 0 for no limit (default: config)",
+    )
     args = parser.parse_args()
+    if args.merge is not None and args.merge < 1:
+        parser.error("--merge needs at least one shard")
 
     with open("src/config.json", encoding="utf-8") as f:
-        github = json.load(f)["github"]
-
-    backfiller = ArchiveBackfiller(github["user"], github["repo"], args.years)
-    backfiller.run(dry_run=args.dry_run)
+        config = json.load(f)
+    github = config["github"]
+    settings = config.get("backfill", {})
+    http_client = configure_http_client(config.get("http"))
+    configure_json_output(config.get("output"))
+
+    backfiller = ArchiveBackfiller(
+        github["user"],
+        github["repo"],
+        args.years,
+        http_client=http_client,
+        parser=config["scrapers"]["EventScraper"].get(
+            "parser", config["scraper_settings"].get("parser")
+        ),
+        concurrency=args.concurrency or settings.get("concurrency", 4),
+        requests_per_second=(
+            args.rate
+            if args.rate is not None
+            else settings.get("requests_per_second", 5.0)
+        ),
+        shard=args.shard,
+    )
+    succeeded = False
+    try:
+        if args.merge is not None:
+            backfiller.merge(args.merge, dry_run=args.dry_run)
+        else:
+            backfiller.run(dry_run=args.dry_run, resume=args.resume)
+        succeeded = True
+    finally:
+        maintain_cache(
+            http_client,
+            config.get("cache", {}),
+            [scraper["file_name"] for scraper in config["scrapers"].values()],
+        )
+        save_run_metrics()
+        export_textfile("backfill", succeeded)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,201 @@
+"""Parser benchmarks over the saved page corpus in tests/fixtures/pages.
+
+Each scraper parses its pages repeatedly, offline, and reports the median time
+per run, throughput and peak allocation. Results can be saved as a baseline
+and later runs compared against it:
+
+    python -m src.bench --save-baseline bench_baseline.json
+    python -m src.bench --baseline bench_baseline.json --threshold 0.2
+"""
+
+import argparse
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from src import scrapers
+from src.main import load_config
+from src.paths import PROJECT_ROOT
+from src.scrapers.event_page_scraper import EventPageScraper
+from src.utils import write_json_atomic
+
+CORPUS_DIR = PROJECT_ROOT / "tests" / "fixtures" / "pages"
+
+# Scraper class name -> corpus pages it parses.
+BENCHMARKS: dict[str, tuple[str, ...]] = {
+    "RaidBossScraper": ("raid_bosses.html",),
+    "ResearchScraper": ("research_tasks.html",),
+    "RocketLineupScraper": ("rocket_lineups.html",),
+    "EggScraper": ("egg_pool.html",),
+    "EventPageScraper": (
+        "event_community_day.html",
+        "event_go_tour.html",
+        "event_twitch_drops.html",
+    ),
+}
+
+EVENT_PAGE_URL = "https://leekduck.com/events/benchmark/"
+
+
+def page_parser(class_name: str, parser: str | None) -> Callable[[bytes], Any]:
+    """Return a function that parses one page the way a run would."""
+    settings: dict[str, Any] = {"parser": parser}
+    if class_name == "EventPageScraper":
+        page_scraper = EventPageScraper(settings)
+
+        def parse_event_page(page: bytes) -> Any:
+            root = page_scraper._parse_document(page.decode("utf-8"), EVENT_PAGE_URL)
+            return page_scraper._parse_event_details(root, EVENT_PAGE_URL)
+
+        return parse_event_page
+
+    scraper = getattr(scrapers, class_name)("offline", class_name, settings)
+    return lambda page: scraper.parse(scraper.dom.parse(page))
+
+
+def run_benchmark(
+    class_name: str,
+    parser: str | None = None,
+    repeat: int = 20,
+    corpus_dir: Path = CORPUS_DIR,
+) -> dict[str, Any]:
+    """Time ``repeat`` runs over a scraper's pages and measure peak allocation."""
+    pages = [(corpus_dir / name).read_bytes() for name in BENCHMARKS[class_name]]
+    parse = page_parser(class_name, parser)
+
+    # One warm-up run, so imports and compiled patterns are not timed.
+    for page in pages:
+        parse(page)
+
+    gc.collect()
+    timings = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        for page in pages:
+            parse(page)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        for page in pages:
+            parse(page)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    median = statistics.median(timings)
+    return {
+        "parser": parser or "bs4",
+        "pages": len(pages),
+        "runs": len(timings),
+        "median_ms": round(median * 1000, 3),
+        "min_ms": round(min(timings) * 1000, 3),
+        "pages_per_second": round(len(pages) / median, 1),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def compare_to_baseline(
+    results: dict[str, dict[str, Any]],
+    baseline: dict[str, dict[str, Any]],
+    threshold: float,
+) -> list[str]:
+    """List the results that are more than ``threshold`` slower or larger."""
+    regressions = []
+    for class_name, result in results.items():
+        previous = baseline.get(class_name)
+        if previous is None or previous.get("parser") != result["parser"]:
+            continue
+        for metric in ("median_ms", "peak_kib"):
+            limit = previous[metric] * (1 + threshold)
+            if result[metric] > limit:
+                regressions.append(
+                    f"{class_name}: {metric} {result[metric]} exceeds baseline"
+                    f" {previous[metric]} by more than {threshold:.0%}"
+                )
+    return regressions
+
+
+def print_report(
+    results: dict[str, dict[str, Any]], baseline: dict[str, dict[str, Any]]
+) -> None:
+    print(
+        f"{'Scraper':<22}{'Parser':<8}{'Median ms':>11}{'Pages/s':>10}"
+        f"{'Peak KiB':>11}{'vs base':>10}",
+        flush=True,
+    )
+    for class_name, result in results.items():
+        previous = baseline.get(class_name)
+        change = ""
+        if previous is not None and previous.get("parser") == result["parser"]:
+            change = f"{result['median_ms'] / previous['median_ms'] - 1:+.1%}"
+        print(
+            f"{class_name:<22}{result['parser']:<8}{result['median_ms']:>11.3f}"
+            f"{result['pages_per_second']:>10.1f}{result['peak_kib']:>11.1f}"
+            f"{change:>10}",
+            flush=True,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the page parsers.")
+    parser.add_argument(
+        "scrapers", nargs="*", help="scrapers to benchmark (default: all)"
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per scraper")
+    parser.add_argument(
+        "--parser",
+        choices=["bs4", "lxml"],
+        help="parser backend for every scraper (default: as configured)",
+    )
+    parser.add_argument("--baseline", type=Path, help="baseline file to compare to")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="allowed slowdown over the baseline before failing (default: 0.2)",
+    )
+    parser.add_argument(
+        "--save-baseline", type=Path, help="write the results as a new baseline"
+    )
+    args = parser.parse_args()
+    unknown = sorted(set(args.scrapers) - set(BENCHMARKS))
+    if unknown:
+        parser.error(f"unknown scrapers {unknown}; expected some of {list(BENCHMARKS)}")
+
+    config = load_config()
+    default_parser = config["scraper_settings"].get("parser")
+    # Event pages are parsed with EventScraper's settings.
+    configured = {
+        name: config["scrapers"]
+        .get("EventScraper" if name == "EventPageScraper" else name, {})
+        .get("parser", default_parser)
+        for name in BENCHMARKS
+    }
+
+    results = {
+        name: run_benchmark(name, args.parser or configured[name], args.repeat)
+        for name in args.scrapers or BENCHMARKS
+    }
+
+    baseline: dict[str, dict[str, Any]] = {}
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    print_report(results, baseline)
+
+    if args.save_baseline is not None:
+        write_json_atomic(args.save_baseline, results)
+        print(f"Saved baseline to {args.save_baseline}", flush=True)
+
+    regressions = compare_to_baseline(results, baseline, args.threshold)
+    if regressions:
+        raise SystemExit("Regressions found:\n" + "\n".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
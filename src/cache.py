@@ -0,0 +1,319 @@
+import argparse
+import hashlib
+import json
+import tarfile
+from collections import Counter
+from collections.abc import Iterable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from src.html_store import HtmlStore
+from src.http_client import HttpClient, ValidatorStore
+from src.metrics import metrics
+from src.paths import HTML_DIR
+from src.utils import atomic_writer, write_json_atomic
+
+PARSED_DIR = HTML_DIR / "parsed"
+# The digest of the page behind each listing output, and the parser version
+# that built it, by output file name.
+DIGESTS_DIR = HTML_DIR / "digests"
+
+# What a cache snapshot carries, relative to the cache directory.
+SNAPSHOT_MEMBERS = ("store", "parsed", "digests", "validators.json")
+
+# The event pages the old one-file-per-URL cache wrote; the listing pages it
+# wrote are named after each scraper's output file.
+LEGACY_EVENT_PAGES = "event_page_*.html"
+
+
+class ParsedResultCache:
+    """Keeps the parsed result of each page next to the HTML cache.
+
+    Entries are keyed by URL, the digest of the exact HTML that was parsed and
+    the parser version, so a changed page or a changed parser never returns a
+    stale result. Only the latest entry per URL is kept. The cache is disabled
+    when ``directory`` is None.
+    """
+
+    def __init__(self, directory: Path | None):
+        self.directory = directory
+
+    def _path(self, url: str) -> Path | None:
+        if self.directory is None:
+            return None
+        return self.directory / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+    def get(self, url: str, digest: str, parser_version: str) -> Any | None:
+        path = self._path(url)
+        if path is None:
+            return None
+        result = self._read(path, url, digest, parser_version)
+        metrics.count(
+            "cache_requests_total",
+            cache="parsed",
+            result="miss" if result is None else "hit",
+        )
+        return result
+
+    def _read(
+        self, path: Path, url: str, digest: str, parser_version: str
+    ) -> Any | None:
+        if not path.exists():
+            return None
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if (
+            not isinstance(entry, dict)
+            or entry.get("url") != url
+            or entry.get("digest") != digest
+            or entry.get("parser_version") != parser_version
+        ):
+            return None
+        # The modification time records the last use, for eviction.
+        path.touch()
+        return entry.get("result")
+
+    def put(self, url: str, digest: str, parser_version: str, result: Any) -> None:
+        path = self._path(url)
+        if path is None:
+            return
+        write_json_atomic(
+            path,
+            {
+                "url": url,
+                "digest": digest,
+                "parser_version": parser_version,
+                "result": result,
+            },
+        )
+
+
+class CacheManager:
+    """Keeps the page cache under a byte budget and a maximum age.
+
+    Stored pages and parsed results are evicted least recently used first:
+    everything unused for longer than ``max_age`` goes, then the oldest
+    entries until the cache fits in ``max_bytes``. Pages left in
+    ``legacy_dir`` by the old one-file-per-URL cache are never read any more
+    and are always removed; only the names that cache wrote are touched, the
+    event pages and ``<name>.html`` for each of ``legacy_names``. The
+    ``validators`` of evicted pages are dropped with them.
+    """
+
+    def __init__(
+        self,
+        store: HtmlStore,
+        parsed_dir: Path | None,
+        max_bytes: int,
+        max_age: timedelta,
+        legacy_dir: Path | None = None,
+        legacy_names: Iterable[str] = (),
+        validators: ValidatorStore | None = None,
+    ):
+        self.store = store
+        self.parsed_dir = parsed_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.legacy_dir = legacy_dir
+        self.legacy_names = tuple(legacy_names)
+        self.validators = validators
+
+    def _legacy_pages(self) -> list[Path]:
+        if self.legacy_dir is None:
+            return []
+        pages = list(self.legacy_dir.glob(LEGACY_EVENT_PAGES))
+        for name in self.legacy_names:
+            path = self.legacy_dir / f"{name}.html"
+            if path.is_file():
+                pages.append(path)
+        return pages
+
+    def evict(self, now: datetime | None = None) -> dict[str, int]:
+        """Evict down to the limits.
+
+        Returns the entries and bytes evicted, the bytes of stored bodies no
+        URL referred to (dropped, but not entries of their own) and the bytes
+        kept.
+        """
+        now = now or datetime.now(UTC)
+        evicted = evicted_bytes = orphaned_bytes = 0
+        self.store.save()
+
+        for path in self._legacy_pages():
+            evicted_bytes += path.stat().st_size
+            evicted += 1
+            path.unlink()
+
+        blob_sizes = self.store.blobs()
+        references = Counter(
+            (self.store.entry(url) or {}).get("digest") for url in self.store.urls()
+        )
+        # Blobs no URL refers to (left by an interrupted write) are dropped.
+        for digest, size in blob_sizes.items():
+            if not references[digest]:
+                orphaned_bytes += size
+        total = sum(size for d, size in blob_sizes.items() if references[d])
+
+        never = datetime.min.replace(tzinfo=UTC)
+        candidates: list[tuple[datetime, str, Any]] = [
+            (self.store.last_used(url) or never, "page", url)
+            for url in self.store.urls()
+        ]
+        if self.parsed_dir is not None:
+            for path in self.parsed_dir.glob("*.json"):
+                stat = path.stat()
+                total += stat.st_size
+                used_at = datetime.fromtimestamp(stat.st_mtime, UTC)
+                candidates.append((used_at, "parsed", path))
+        candidates.sort(key=lambda candidate: candidate[0])
+
+        cutoff = now - self.max_age
+        evicted_urls = []
+        for used_at, kind, key in candidates:
+            if used_at >= cutoff and total <= self.max_bytes:
+                break
+            if kind == "page":
+                digest = (self.store.entry(key) or {}).get("digest")
+                references[digest] -= 1
+                freed = blob_sizes.get(digest, 0) if not references[digest] else 0
+                evicted_urls.append(key)
+            else:
+                freed = key.stat().st_size
+                key.unlink()
+            total -= freed
+            evicted += 1
+            evicted_bytes += freed
+        self.store.remove(evicted_urls)
+        if self.validators is not None:
+            self.validators.retain(self.store.urls())
+
+        return {
+            "evicted_entries": evicted,
+            "evicted_bytes": evicted_bytes,
+            "orphaned_bytes": orphaned_bytes,
+            "kept_bytes": total,
+        }
+
+
+def maintain_cache(
+    http_client: HttpClient,
+    settings: dict[str, Any],
+    legacy_names: Iterable[str] = (),
+) -> None:
+    """Evict the page cache down to its limits and report how it was used.
+
+    Also writes the validators the run collected, once for the whole run.
+    ``legacy_names`` are the scrapers' output file names, under which the old
+    cache kept their listing pages.
+    """
+    store = http_client.html_store
+    if not store.enabled:
+        http_client.validators.save()
+        return
+    manager = CacheManager(
+        store,
+        PARSED_DIR,
+        max_bytes=int(settings.get("max_megabytes", 256) * 1024 * 1024),
+        max_age=timedelta(days=settings.get("max_age_days", 14)),
+        legacy_dir=HTML_DIR,
+        legacy_names=legacy_names,
+        validators=http_client.validators,
+    )
+    stats = manager.evict()
+    http_client.validators.save()
+    metrics.count("cache_evicted_entries_total", stats["evicted_entries"])
+    metrics.count("cache_evicted_bytes_total", stats["evicted_bytes"])
+    metrics.count("cache_orphaned_bytes_total", stats["orphaned_bytes"])
+    metrics.set_gauge("cache_bytes", stats["kept_bytes"])
+
+    lookups: dict[str, dict[str, float]] = {}
+    for point in metrics.snapshot()["counters"].get("cache_requests_total", []):
+        labels = point["labels"]
+        lookups.setdefault(labels["cache"], {})[labels["result"]] = point["value"]
+    for cache, results in sorted(lookups.items()):
+        hits, misses = results.get("hit", 0), results.get("miss", 0)
+        print(
+            f"Cache {cache}: {hits:g} hit(s), {misses:g} miss(es), "
+            f"{hits / (hits + misses):.0%} hit ratio",
+            flush=True,
+        )
+    print(
+        f"Cache evicted {stats['evicted_entries']} entries "
+        f"({stats['evicted_bytes'] / 1024:.1f} KiB); "
+        f"{stats['kept_bytes'] / 1024:.1f} KiB kept",
+        flush=True,
+    )
+    if stats["orphaned_bytes"]:
+        print(
+            f"Cache dropped {stats['orphaned_bytes'] / 1024:.1f} KiB of stored "
+            "pages no URL referred to",
+            flush=True,
+        )
+
+
+def export_snapshot(path: Path, cache_dir: Path = HTML_DIR) -> None:
+    """Pack the stored pages, parsed results and validators into one file.
+
+    The snapshot is a gzip-compressed tar, written atomically.
+    """
+
+    def skip_temporary(member: tarfile.TarInfo) -> tarfile.TarInfo | None:
+        name = Path(member.name).name
+        return None if name.startswith(".") and name.endswith(".tmp") else member
+
+    with atomic_writer(path, binary=True) as f:
+        with tarfile.open(fileobj=f, mode="w:gz") as snapshot:
+            for name in SNAPSHOT_MEMBERS:
+                if (cache_dir / name).exists():
+                    snapshot.add(cache_dir / name, name, filter=skip_temporary)
+    print(
+        f"Cache snapshot of {cache_dir} saved to {path} "
+        f"({path.stat().st_size / 1024:.1f} KiB)",
+        flush=True,
+    )
+
+
+def import_snapshot(path: Path, cache_dir: Path = HTML_DIR) -> bool:
+    """Restore a snapshot into the cache directory.
+
+    A missing or unreadable snapshot leaves the cache as it is, so the run
+    simply starts cold; returns whether anything was restored.
+    """
+    if not path.exists():
+        print(f"No cache snapshot at {path}; starting with a cold cache", flush=True)
+        return False
+    try:
+        with tarfile.open(path, mode="r:gz") as snapshot:
+            members = [
+                member
+                for member in snapshot.getmembers()
+                if Path(member.name).parts[:1] in [(n,) for n in SNAPSHOT_MEMBERS]
+                and (member.isfile() or member.isdir())
+            ]
+            snapshot.extractall(cache_dir, members=members, filter="data")
+    except (OSError, EOFError, tarfile.TarError) as e:
+        print(f"Could not restore cache snapshot {path}: {e}", flush=True)
+        return False
+    print(f"Restored {len(members)} cache entries from {path}", flush=True)
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Save or restore the page cache as a single snapshot file."
+    )
+    parser.add_argument("action", choices=["export", "import"])
+    parser.add_argument("snapshot", type=Path, help="snapshot file (.tar.gz)")
+    args = parser.parse_args()
+
+    if args.action == "export":
+        export_snapshot(args.snapshot)
+    else:
+        import_snapshot(args.snapshot)
+
+
+if __name__ == "__main__":
+    main()
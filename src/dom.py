@@ -0,0 +1,275 @@
+"""Parser backends.
+
+Scrapers read pages through a small DOM interface so the same parsing code can
+run on a BeautifulSoup tree or on a native ``lxml.html`` tree, which is several
+times faster to build and walk. Both backends produce identical output.
+"""
+
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from typing import Any
+
+import lxml.html
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from bs4.dammit import UnicodeDammit
+from lxml import etree
+
+# Any parsed node: a bs4 Tag (or BeautifulSoup document) or an lxml HtmlElement.
+Node = Any
+
+
+def has_class(name: str) -> str:
+    """Return an XPath predicate matching elements with the CSS class ``name``."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+class Selector:
+    """A CSS selector and its XPath equivalent, precompiled for each backend.
+
+    The XPath must select the same elements, in document order, relative to
+    the node the selector is applied to.
+    """
+
+    __slots__ = ("css", "xpath", "first")
+
+    def __init__(self, css: str, xpath: str):
+        self.css = soupsieve.compile(css)
+        self.xpath = etree.XPath(xpath)
+        # Only builds the first match, for select_one.
+        self.first = etree.XPath(f"({xpath})[1]")
+
+
+class Scope:
+    """The regions of a document a scraper reads: elements carrying one of
+    ``classes`` or ``ids``, together with everything inside them."""
+
+    __slots__ = ("classes", "ids", "opening_tag")
+
+    def __init__(self, classes: tuple[str, ...] = (), ids: tuple[str, ...] = ()):
+        self.classes = frozenset(classes)
+        self.ids = frozenset(ids)
+        # An opening tag that may carry one of the classes or ids. It can
+        # match tags the scope does not (a longer class name, an attribute
+        # value that merely mentions one), never the other way round.
+        names = "|".join(re.escape(name) for name in (*classes, *ids)) or "(?!)"
+        self.opening_tag = re.compile(
+            rf"<[a-z][^>]*?\b(?:class|id)\s*=[^>]*?(?<![\w-])(?:{names})(?![\w-])",
+            re.IGNORECASE,
+        )
+
+    def matches(self, attrs: dict[str, Any]) -> bool:
+        if attrs.get("id") in self.ids:
+            return True
+        classes = attrs.get("class") or ()
+        if isinstance(classes, str):
+            classes = classes.split()
+        return not self.classes.isdisjoint(classes)
+
+
+class DomBackend(ABC):
+    name: str
+    # Whether parse_scoped() skips markup outside the scope.
+    scopes_parsing = False
+
+    @abstractmethod
+    def parse(self, markup: str | bytes) -> Node:
+        """Parse a whole document and return its root."""
+
+    def parse_scoped(self, markup: str | bytes, scope: Scope) -> Node:
+        """Parse only the parts of a document within ``scope``.
+
+        The root holds the outermost matching elements in document order, so
+        selectors find the same elements as on a full parse. Backends that
+        cannot skip markup cheaply parse the whole document.
+        """
+        return self.parse(markup)
+
+    @abstractmethod
+    def select(self, node: Node, selector: Selector) -> list[Node]:
+        pass
+
+    def select_one(self, node: Node, selector: Selector) -> Node | None:
+        matches = self.select(node, selector)
+        return matches[0] if matches else None
+
+    @abstractmethod
+    def text(self, node: Node, separator: str = "") -> str:
+        """Return the node's stripped text, like bs4's ``get_text(strip=True)``."""
+
+    @abstractmethod
+    def attr(self, node: Node, name: str) -> str | None:
+        pass
+
+    @abstractmethod
+    def tag(self, node: Node) -> str:
+        pass
+
+    @abstractmethod
+    def classes(self, node: Node) -> list[str]:
+        pass
+
+    @abstractmethod
+    def children(self, node: Node) -> Iterator[Node]:
+        """Yield the node's child elements."""
+
+    @abstractmethod
+    def next_siblings(self, node: Node) -> Iterator[Node]:
+        """Yield the elements that follow the node under the same parent."""
+
+    @abstractmethod
+    def parent(self, node: Node) -> Node | None:
+        pass
+
+
+class SoupBackend(DomBackend):
+    name = "bs4"
+    scopes_parsing = True
+
+    def parse(self, markup: str | bytes) -> BeautifulSoup:
+        return BeautifulSoup(markup, "lxml")
+
+    def parse_scoped(self, markup: str | bytes, scope: Scope) -> BeautifulSoup:
+        # Markup outside the scope is still tokenized by lxml, but no Tag or
+        # string objects are built for it, which is where bs4 spends its time.
+        return BeautifulSoup(markup, "lxml", parse_only=_ScopeStrainer(scope))
+
+    def select(self, node: Node, selector: Selector) -> list[Node]:
+        return selector.css.select(node)
+
+    def select_one(self, node: Node, selector: Selector) -> Node | None:
+        return selector.css.select_one(node)
+
+    def text(self, node: Node, separator: str = "") -> str:
+        return node.get_text(separator=separator, strip=True)
+
+    def attr(self, node: Node, name: str) -> str | None:
+        value = node.get(name)
+        return " ".join(value) if isinstance(value, list) else value
+
+    def tag(self, node: Node) -> str:
+        return node.name
+
+    def classes(self, node: Node) -> list[str]:
+        return list(node.get("class") or [])
+
+    def children(self, node: Node) -> Iterator[Node]:
+        return (child for child in node.children if isinstance(child, Tag))
+
+    def next_siblings(self, node: Node) -> Iterator[Node]:
+        return (sibling for sibling in node.next_siblings if isinstance(sibling, Tag))
+
+    def parent(self, node: Node) -> Node | None:
+        return node.parent
+
+
+class _ScopeStrainer(SoupStrainer):
+    """Keeps the top-level elements a ``Scope`` matches and drops the rest."""
+
+    def __init__(self, scope: Scope):
+        super().__init__()
+        self.scope = scope
+
+    def allow_tag_creation(
+        self, nsprefix: str | None, name: str, attrs: dict[str, Any] | None
+    ) -> bool:
+        return self.scope.matches(attrs or {})
+
+    def allow_string_creation(self, string: str) -> bool:
+        return False
+
+
+# bs4 keeps the strings inside these elements out of get_text().
+_TEXT = etree.XPath(
+    "descendant::text()[not(ancestor::script or ancestor::style"
+    " or ancestor::template or ancestor::rt or ancestor::rp)]"
+)
+
+
+class LxmlBackend(DomBackend):
+    name = "lxml"
+    scopes_parsing = True
+
+    def __init__(self) -> None:
+        # lxml parsers must not be shared between threads.
+        self._local = threading.local()
+
+    def _parser(self) -> lxml.html.HTMLParser:
+        parser = getattr(self._local, "parser", None)
+        if parser is None:
+            parser = lxml.html.HTMLParser(encoding="utf-8")
+            self._local.parser = parser
+        return parser
+
+    def parse(self, markup: str | bytes) -> lxml.html.HtmlElement:
+        # Decode bytes the way BeautifulSoup does, so both backends agree on
+        # the document's encoding.
+        if isinstance(markup, bytes):
+            markup = UnicodeDammit(markup, is_html=True).unicode_markup or ""
+        try:
+            return lxml.html.document_fromstring(
+                markup.encode("utf-8"), parser=self._parser()
+            )
+        except etree.ParserError:
+            # An empty document, which BeautifulSoup parses to an empty tree.
+            return lxml.html.Element("html")
+
+    def parse_scoped(self, markup: str | bytes, scope: Scope) -> lxml.html.HtmlElement:
+        # libxml2 builds a whole tree far faster than Python callbacks could
+        # filter one, so instead the markup before the first element the
+        # scope may match (the head, inline styles and scripts, navigation)
+        # is never handed to it. Unclosed ancestors of the cut are dropped;
+        # stray end tags in the rest are ignored, as in any parse.
+        if isinstance(markup, bytes):
+            markup = UnicodeDammit(markup, is_html=True).unicode_markup or ""
+        first = scope.opening_tag.search(markup)
+        return self.parse(markup[first.start() :] if first else markup)
+
+    def select(self, node: Node, selector: Selector) -> list[Node]:
+        return selector.xpath(node)
+
+    def select_one(self, node: Node, selector: Selector) -> Node | None:
+        matches = selector.first(node)
+        return matches[0] if matches else None
+
+    def text(self, node: Node, separator: str = "") -> str:
+        return separator.join(
+            stripped for string in _TEXT(node) if (stripped := string.strip())
+        )
+
+    def attr(self, node: Node, name: str) -> str | None:
+        return node.get(name)
+
+    def tag(self, node: Node) -> str:
+        return node.tag
+
+    def classes(self, node: Node) -> list[str]:
+        return (node.get("class") or "").split()
+
+    def children(self, node: Node) -> Iterator[Node]:
+        return (child for child in node if isinstance(child.tag, str))
+
+    def next_siblings(self, node: Node) -> Iterator[Node]:
+        return (
+            sibling for sibling in node.itersiblings() if isinstance(sibling.tag, str)
+        )
+
+    def parent(self, node: Node) -> Node | None:
+        return node.getparent()
+
+
+BACKENDS: dict[str, DomBackend] = {
+    backend.name: backend for backend in (SoupBackend(), LxmlBackend())
+}
+
+
+def get_backend(name: str | None = None) -> DomBackend:
+    """Return the backend called ``name``; BeautifulSoup is the default."""
+    try:
+        return BACKENDS[name or SoupBackend.name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown parser backend {name!r}; expected one of {sorted(BACKENDS)}"
+        ) from None
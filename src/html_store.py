@@ -0,0 +1,172 @@
+import gzip
+import hashlib
+import json
+import threading
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from src.paths import HTML_DIR
+from src.utils import write_bytes_atomic, write_json_atomic
+
+HTML_STORE_DIR = HTML_DIR / "store"
+
+
+def blob_file(directory: Path, digest: str) -> Path:
+    """Return where the body with SHA-256 ``digest`` is kept in a store."""
+    return directory / "blobs" / digest[:2] / f"{digest}.gz"
+
+
+class HtmlStore:
+    """Fetched pages, kept once per distinct body.
+
+    Bodies are gzip-compressed under ``blobs/`` and named by their SHA-256,
+    so a page that comes back unchanged, or is served at several URLs, is
+    stored once. ``index.json`` maps each URL to the digest of its latest
+    body, when it was fetched and the encoding to decode it with. The index is
+    kept in memory and written by ``save``, once at the end of a run, along
+    with when each copy was last read, for eviction.
+
+    The store is disabled when ``directory`` is None, and never writes when
+    ``read_only`` is set.
+    """
+
+    def __init__(self, directory: Path | None, read_only: bool = False):
+        self.directory = directory
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        self._index: dict[str, dict[str, Any]] = {}
+        self._used: dict[str, str] = {}
+        self._dirty = False
+        if directory is not None:
+            try:
+                index_path = directory / "index.json"
+                index = json.loads(index_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                index = {}
+            if isinstance(index, dict):
+                self._index = index
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def _write_index(self, directory: Path) -> None:
+        for url, used_at in self._used.items():
+            if url in self._index:
+                self._index[url]["used_at"] = used_at
+        self._used.clear()
+        self._dirty = False
+        write_json_atomic(directory / "index.json", self._index)
+
+    def save(self) -> None:
+        """Write the index, if a copy was stored, revalidated or read since."""
+        if self.directory is None or self.read_only:
+            return
+        with self._lock:
+            if self._dirty or self._used:
+                self._write_index(self.directory)
+
+    def put(self, url: str, body: bytes, encoding: str | None = None) -> None:
+        """Store ``body`` as the latest copy of ``url``, fetched just now."""
+        if self.directory is None or self.read_only:
+            return
+        digest = hashlib.sha256(body).hexdigest()
+        blob_path = blob_file(self.directory, digest)
+        if not blob_path.exists():
+            write_bytes_atomic(blob_path, gzip.compress(body, mtime=0))
+        with self._lock:
+            self._index[url] = {
+                "digest": digest,
+                "fetched_at": datetime.now(UTC).isoformat(timespec="seconds"),
+                "encoding": encoding or "utf-8",
+            }
+            self._dirty = True
+
+    def touch(self, url: str) -> None:
+        """Mark the stored copy of ``url`` as confirmed current just now."""
+        if self.directory is None or self.read_only:
+            return
+        with self._lock:
+            if url not in self._index:
+                return
+            self._index[url] = {
+                **self._index[url],
+                "fetched_at": datetime.now(UTC).isoformat(timespec="seconds"),
+            }
+            self._dirty = True
+
+    def entry(self, url: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._index.get(url)
+        return dict(entry) if entry is not None else None
+
+    def fetched_at(self, url: str) -> datetime | None:
+        entry = self.entry(url)
+        if entry is None:
+            return None
+        try:
+            return datetime.fromisoformat(entry["fetched_at"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def get(self, url: str) -> bytes | None:
+        """Return the stored body of ``url``, or None when there is none."""
+        entry = self.entry(url)
+        if self.directory is None or entry is None:
+            return None
+        try:
+            blob_path = blob_file(self.directory, entry["digest"])
+            body = gzip.decompress(blob_path.read_bytes())
+        except (OSError, KeyError, EOFError, gzip.BadGzipFile):
+            return None
+        with self._lock:
+            self._used[url] = datetime.now(UTC).isoformat(timespec="seconds")
+        return body
+
+    def get_text(self, url: str) -> str | None:
+        body = self.get(url)
+        if body is None:
+            return None
+        encoding = (self.entry(url) or {}).get("encoding") or "utf-8"
+        return body.decode(encoding, errors="replace")
+
+    def urls(self) -> list[str]:
+        with self._lock:
+            return list(self._index)
+
+    def last_used(self, url: str) -> datetime | None:
+        """When the copy of ``url`` was last fetched, revalidated or read."""
+        entry = self.entry(url) or {}
+        with self._lock:
+            used_at = self._used.get(url, entry.get("used_at"))
+        times = []
+        for value in (entry.get("fetched_at"), used_at):
+            try:
+                times.append(datetime.fromisoformat(value))
+            except (TypeError, ValueError):
+                continue
+        return max(times, default=None)
+
+    def blobs(self) -> dict[str, int]:
+        """Return the size of every blob on disk, by digest."""
+        if self.directory is None:
+            return {}
+        return {
+            path.name.removesuffix(".gz"): path.stat().st_size
+            for path in (self.directory / "blobs").glob("*/*.gz")
+        }
+
+    def remove(self, urls: list[str]) -> None:
+        """Forget ``urls`` and delete the blobs no URL refers to any more."""
+        if self.directory is None or self.read_only:
+            return
+        with self._lock:
+            for url in urls:
+                self._index.pop(url, None)
+                self._used.pop(url, None)
+            referenced = {entry.get("digest") for entry in self._index.values()}
+            self._write_index(self.directory)
+        for digest in self.blobs():
+            if digest not in referenced:
+                blob_file(self.directory, digest).unlink(missing_ok=True)
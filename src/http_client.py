@@ -0,0 +1,191 @@
+import json
+import threading
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.html_store import HTML_STORE_DIR, HtmlStore
+from src.metrics import metrics
+from src.paths import HTML_DIR, cache_enabled
+from src.utils import write_json_atomic
+
+DEFAULT_USER_AGENT = "leak-duck (+https://github.com/zhenga8533/leak-duck)"
+VALIDATORS_PATH = HTML_DIR / "validators.json"
+
+
+class ValidatorStore:
+    """Remembers each URL's ETag and Last-Modified between runs.
+
+    Validators are only recorded once the caller has safely stored what it
+    built from a response, so a 304 always refers to output that exists.
+    Changes are kept in memory and written by ``save``, once at the end of a
+    run. The store is in-memory only when ``path`` is None.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._validators: dict[str, dict[str, str]] = {}
+        self._dirty = False
+        if path is not None and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = {}
+            if isinstance(data, dict):
+                self._validators = data
+
+    def request_headers(self, url: str) -> dict[str, str]:
+        with self._lock:
+            validators = self._validators.get(url, {})
+        headers = {}
+        if "etag" in validators:
+            headers["If-None-Match"] = validators["etag"]
+        if "last_modified" in validators:
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    def remember(self, url: str, response: requests.Response) -> None:
+        """Record the validators of a 200 response; a 304 keeps the old ones."""
+        if response.status_code == 304:
+            return
+        validators = {}
+        if response.headers.get("ETag"):
+            validators["etag"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            validators["last_modified"] = response.headers["Last-Modified"]
+
+        with self._lock:
+            if self._validators.get(url, {}) == validators:
+                return
+            if validators:
+                self._validators[url] = validators
+            else:
+                self._validators.pop(url, None)
+            self._dirty = True
+
+    def retain(self, urls: Iterable[str]) -> None:
+        """Forget the validators of every URL not in ``urls``."""
+        keep = set(urls)
+        with self._lock:
+            dropped = [url for url in self._validators if url not in keep]
+            for url in dropped:
+                del self._validators[url]
+            self._dirty = self._dirty or bool(dropped)
+
+    def save(self) -> None:
+        """Write the validators, if any changed since they were loaded."""
+        if self.path is None:
+            return
+        with self._lock:
+            if self._dirty:
+                write_json_atomic(self.path, self._validators)
+                self._dirty = False
+
+
+class HttpClient:
+    """A keep-alive HTTP client shared by every component of a run.
+
+    Connections are pooled per host, so a run that touches leekduck.com and
+    raw.githubusercontent.com a few hundred times reuses a handful of sockets
+    instead of paying a TCP and TLS handshake for each request.
+
+    ``html_store`` is where components keep the pages they fetch; without one
+    nothing is kept.
+    """
+
+    def __init__(
+        self,
+        settings: dict[str, Any] | None = None,
+        validators: ValidatorStore | None = None,
+        html_store: HtmlStore | None = None,
+    ):
+        settings = settings or {}
+        self.timeout = settings.get("timeout", 15)
+        self.validators = validators or ValidatorStore()
+        self.html_store = html_store or HtmlStore(None)
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = settings.get(
+            "user_agent", DEFAULT_USER_AGENT
+        )
+        adapter = HTTPAdapter(
+            pool_connections=settings.get("pool_connections", 4),
+            pool_maxsize=settings.get("pool_maxsize", 8),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(
+        self, url: str, timeout: float | None = None, **kwargs: Any
+    ) -> requests.Response:
+        host = urlsplit(url).netloc
+        started = time.perf_counter()
+        try:
+            response = self.session.get(
+                url, timeout=self.timeout if timeout is None else timeout, **kwargs
+            )
+        except requests.exceptions.RequestException:
+            metrics.count("fetch_errors_total", host=host)
+            raise
+        finally:
+            metrics.observe("fetch_seconds", time.perf_counter() - started, host=host)
+        metrics.count("responses_total", host=host, status=str(response.status_code))
+        metrics.count("downloaded_bytes_total", len(response.content), host=host)
+        return response
+
+    def conditional_get(
+        self, url: str, reusable: bool, timeout: float | None = None
+    ) -> requests.Response:
+        """GET ``url``, revalidating the caller's copy when it has one.
+
+        Stored validators are only sent when ``reusable`` is set, so a
+        304 Not Modified is never returned to a caller with nothing to reuse.
+        Callers record the new validators with ``validators.remember`` once
+        the response has been processed successfully.
+        """
+        headers = self.validators.request_headers(url) if reusable else {}
+        response = self.get(url, timeout=timeout, headers=headers)
+        if headers:
+            metrics.count(
+                "cache_requests_total",
+                cache="http",
+                result="hit" if response.status_code == 304 else "miss",
+            )
+        return response
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_shared_client: HttpClient | None = None
+_shared_client_lock = threading.Lock()
+
+
+def configure_http_client(settings: dict[str, Any] | None = None) -> HttpClient:
+    """Replace the process-wide client with one built from ``settings``.
+
+    Validators and fetched pages persist across runs when the cache is kept.
+    """
+    global _shared_client
+    keep = cache_enabled()
+    validators = ValidatorStore(VALIDATORS_PATH if keep else None)
+    html_store = HtmlStore(HTML_STORE_DIR if keep else None)
+    with _shared_client_lock:
+        if _shared_client is not None:
+            _shared_client.close()
+        _shared_client = HttpClient(settings, validators, html_store)
+        return _shared_client
+
+
+def shared_http_client() -> HttpClient:
+    """Return the process-wide client, creating a default one on first use."""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient()
+        return _shared_client
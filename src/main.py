@@ -1,9 +1,16 @@
+import functools
 import json
 from typing import Any
 
 from src import scrapers
-from src.archiver import EventArchiver
+from src.archiver import DEFAULT_MAX_WORKERS, EventArchiver
+from src.cache import maintain_cache
+from src.http_client import HttpClient, configure_http_client
+from src.metrics import metrics
 from src.paths import CONFIG_PATH
+from src.prometheus import export_textfile
+from src.scheduler import TaskGraph
+from src.utils import configure_json_output, save_run_metrics
 
 
 def load_config() -> dict[str, Any]:
@@ -14,19 +21,29 @@ def load_config() -> dict[str, Any]:
 def run_scraper(scraper_info: dict[str, Any]) -> None:
     scraper_class_name = scraper_info["class_name"]
     config = scraper_info["config"]
+    http_client: HttpClient | None = scraper_info.get("http_client")
 
     print(f"--- Running {scraper_class_name} ---", flush=True)
     scraper_class = getattr(scrapers, scraper_class_name)
 
+    scraper_config = config["scrapers"][scraper_class_name]
+    scraper_settings = dict(config["scraper_settings"])
+    if "parser" in scraper_config:
+        scraper_settings["parser"] = scraper_config["parser"]
+
     scraper_args: dict[str, Any] = {
-        "url": config["scrapers"][scraper_class_name]["url"],
-        "file_name": config["scrapers"][scraper_class_name]["file_name"],
-        "scraper_settings": config["scraper_settings"],
+        "url": scraper_config["url"],
+        "file_name": scraper_config["file_name"],
+        "scraper_settings": scraper_settings,
+        "http_client": http_client,
     }
     if scraper_class_name == "EventScraper":
         scraper_args["check_existing_events"] = config["scrapers"]["EventScraper"].get(
             "check_existing", False
         )
+        scraper_args["incremental"] = config["scrapers"]["EventScraper"].get(
+            "incremental", False
+        )
         scraper_args["github_user"] = config["github"]["user"]
         scraper_args["github_repo"] = config["github"]["repo"]
 
@@ -36,30 +53,81 @@ def run_scraper(scraper_info: dict[str, Any]) -> None:
 
 
 def main() -> None:
+    metrics.reset()
+    succeeded = False
+    try:
+        run_all()
+        succeeded = True
+    finally:
+        save_run_metrics()
+        export_textfile("scrapers", succeeded)
+
+
+# Task -> tasks it must run after. EventScraper reads the events.json that
+# EventArchiver prunes, and both write it, so the archiver always goes first.
+# A failed archiver skips only its dependents: the other scrapers still run
+# and write their outputs, and the run fails once they finish.
+DEPENDENCIES: dict[str, tuple[str, ...]] = {"EventScraper": ("EventArchiver",)}
+
+
+def run_all() -> None:
     print("=== Starting Leak Duck Scrapers ===", flush=True)
     config = load_config()
     print("Configuration loaded", flush=True)
+    http_client = configure_http_client(config.get("http"))
+    configure_json_output(config.get("output"))
 
+    archiver_settings = config.get("archiver", {})
     archiver = EventArchiver(
-        user=config["github"]["user"], repo=config["github"]["repo"]
+        user=config["github"]["user"],
+        repo=config["github"]["repo"],
+        http_client=http_client,
+        max_workers=archiver_settings.get("max_workers", DEFAULT_MAX_WORKERS),
+        storage=archiver_settings.get("storage", "json"),
     )
-    archiver.run()
-    print("Event archiver completed", flush=True)
 
-    scrapers_to_run: list[dict[str, Any]] = [
-        {"class_name": name, "config": config}
-        for name, settings in config["scrapers"].items()
-        if settings["enabled"]
-    ]
+    def run_archiver() -> None:
+        archiver.run()
+        print("Event archiver completed", flush=True)
+
+    graph = TaskGraph()
+    graph.add("EventArchiver", run_archiver)
+    for name, settings in config["scrapers"].items():
+        if not settings["enabled"]:
+            continue
+        scraper_info = {
+            "class_name": name,
+            "config": config,
+            "http_client": http_client,
+        }
+        graph.add(
+            name,
+            functools.partial(run_scraper, scraper_info),
+            after=DEPENDENCIES.get(name, ()),
+        )
+
+    try:
+        report = graph.run(config.get("scheduler", {}).get("max_workers", 4))
+    finally:
+        maintain_cache(
+            http_client,
+            config.get("cache", {}),
+            [scraper["file_name"] for scraper in config["scrapers"].values()],
+        )
 
     failures: list[str] = []
-    for scraper_info in scrapers_to_run:
-        try:
-            run_scraper(scraper_info)
-        except Exception as e:
-            class_name = scraper_info["class_name"]
-            failures.append(f"{class_name}: {e}")
-            print(f"✗ ERROR running {class_name}: {e}", flush=True)
+    for name, error in report.failures.items():
+        failures.append(f"{name}: {error}")
+        print(f"✗ ERROR running {name}: {error}", flush=True)
+    for name, blocked_by in report.skipped.items():
+        failures.append(f"{name}: skipped because {blocked_by} did not run")
+        print(f"✗ SKIPPED {name}: {blocked_by} did not run", flush=True)
+
+    path, seconds = report.critical_path()
+    if path:
+        steps = " -> ".join(f"{name} ({report.durations[name]:.2f}s)" for name in path)
+        print(f"Critical path ({seconds:.2f}s): {steps}", flush=True)
+        metrics.set_gauge("critical_path_seconds", round(seconds, 6))
 
     if failures:
         raise RuntimeError("One or more scrapers failed: " + "; ".join(failures))
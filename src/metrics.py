@@ -0,0 +1,178 @@
+"""Per-stage timing and counters for a run.
+
+Code marks a stage with ``span("name")`` (a context manager) or ``@timed("name")``.
+Each stage accumulates its number of calls, wall time, CPU time of the calling
+thread and the bytes it moved; ``snapshot()`` returns the totals for
+``run_metrics.json``. Stages nest, so the wall time of an outer stage includes
+its inner ones.
+
+Counters, gauges and histograms (``count``, ``set_gauge``, ``observe``) carry
+labels and are what the Prometheus exporter publishes.
+"""
+
+import functools
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from typing import Any, ParamSpec, TypeVar
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+# Histogram bucket upper bounds, in seconds.
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: dict[str, str]) -> Labels:
+    return tuple(sorted(labels.items()))
+
+
+class Span:
+    """A stage being timed; callers add the bytes it moved."""
+
+    __slots__ = ("bytes",)
+
+    def __init__(self) -> None:
+        self.bytes = 0
+
+    def add_bytes(self, count: int) -> None:
+        self.bytes += count
+
+
+class RunMetrics:
+    """Thread-safe totals per stage for one run."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages: dict[str, dict[str, Any]] = {}
+            self._counters: dict[str, dict[Labels, float]] = {}
+            self._gauges: dict[str, dict[Labels, float]] = {}
+            self._histograms: dict[str, dict[Labels, dict[str, Any]]] = {}
+            self._started_at = datetime.now(UTC)
+            self._started_wall = time.perf_counter()
+            self._started_cpu = time.process_time()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[Span]:
+        span = Span()
+        started_wall = time.perf_counter()
+        started_cpu = time.thread_time()
+        try:
+            yield span
+        finally:
+            self.record(
+                name,
+                time.perf_counter() - started_wall,
+                time.thread_time() - started_cpu,
+                span.bytes,
+            )
+
+    def timed(self, name: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+        def decorator(function: Callable[P, R]) -> Callable[P, R]:
+            @functools.wraps(function)
+            def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+                with self.span(name):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def record(
+        self, name: str, wall_seconds: float, cpu_seconds: float, byte_count: int = 0
+    ) -> None:
+        with self._lock:
+            stage = self._stages.setdefault(
+                name, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "bytes": 0}
+            )
+            stage["calls"] += 1
+            stage["wall_seconds"] += wall_seconds
+            stage["cpu_seconds"] += cpu_seconds
+            stage["bytes"] += byte_count
+
+    def count(self, name: str, value: float = 1, **labels: str) -> None:
+        """Add ``value`` to a counter."""
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            key = _labels(labels)
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        with self._lock:
+            self._gauges.setdefault(name, {})[_labels(labels)] = value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Add an observation, in seconds, to a histogram."""
+        with self._lock:
+            histogram = self._histograms.setdefault(name, {}).setdefault(
+                _labels(labels),
+                {"buckets": [0] * len(BUCKETS), "sum": 0.0, "count": 0},
+            )
+            for i, bound in enumerate(BUCKETS):
+                if value <= bound:
+                    histogram["buckets"][i] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """Observe the wall time of a block in a histogram."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            stages = {
+                name: {
+                    **stage,
+                    "wall_seconds": round(stage["wall_seconds"], 6),
+                    "cpu_seconds": round(stage["cpu_seconds"], 6),
+                }
+                for name, stage in self._stages.items()
+            }
+            return {
+                "started_at": self._started_at.isoformat(timespec="seconds"),
+                "wall_seconds": round(time.perf_counter() - self._started_wall, 6),
+                "cpu_seconds": round(time.process_time() - self._started_cpu, 6),
+                "stages": stages,
+                "counters": _series(self._counters),
+                "gauges": _series(self._gauges),
+                "histograms": {
+                    name: [
+                        {
+                            "labels": dict(labels),
+                            "buckets": dict(zip(BUCKETS, h["buckets"], strict=True)),
+                            "sum": round(h["sum"], 6),
+                            "count": h["count"],
+                        }
+                        for labels, h in series.items()
+                    ]
+                    for name, series in self._histograms.items()
+                },
+            }
+
+
+def _series(values: dict[str, dict[Labels, float]]) -> dict[str, list[dict[str, Any]]]:
+    return {
+        name: [
+            {"labels": dict(labels), "value": value} for labels, value in series.items()
+        ]
+        for name, series in values.items()
+    }
+
+
+# The process-wide metrics every component records into.
+metrics = RunMetrics()
+span = metrics.span
+timed = metrics.timed
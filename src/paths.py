@@ -15,7 +15,38 @@ def runtime_root() -> Path:
     return Path.cwd().resolve()
 
 
-HTML_DIR = runtime_root() / "html"
+def _cache_root() -> Path:
+    configured_dir = os.getenv("LEAK_DUCK_CACHE_DIR")
+    if configured_dir:
+        return Path(configured_dir).expanduser().resolve()
+    return runtime_root() / "html"
+
+
+HTML_DIR = _cache_root()
+
+
+def cache_enabled() -> bool:
+    """Whether fetched pages, parse results and validators are kept.
+
+    CI publishes every JSON file in the checkout, so there the cache is only
+    kept when ``LEAK_DUCK_CACHE_DIR`` puts it somewhere else.
+    """
+    return bool(os.getenv("LEAK_DUCK_CACHE_DIR")) or not os.getenv("CI")
+
+
+def metrics_path() -> Path | None:
+    """Return where run metrics are written, or None when they are not kept."""
+    configured_path = os.getenv("LEAK_DUCK_METRICS_PATH")
+    if configured_path:
+        return Path(configured_path).expanduser().resolve()
+    # CI publishes every JSON file in the checkout, so it must set a path.
+    return None if os.getenv("CI") else runtime_root() / "run_metrics.json"
+
+
+def prometheus_dir() -> Path | None:
+    """Return the textfile collector directory, or None when not exporting."""
+    configured_dir = os.getenv("LEAK_DUCK_PROMETHEUS_DIR")
+    return Path(configured_dir).expanduser().resolve() if configured_dir else None
 
 
 def data_dir() -> Path:
@@ -0,0 +1,136 @@
+"""Exports a run's metrics in the Prometheus textfile format.
+
+When ``LEAK_DUCK_PROMETHEUS_DIR`` is set, each command writes
+``leak_duck_<command>.prom`` there at the end of a run, for node_exporter's
+textfile collector to pick up. The file is replaced atomically, so a scrape
+never sees half a run.
+"""
+
+import math
+import time
+from typing import Any
+
+from src.metrics import metrics
+from src.paths import prometheus_dir
+from src.utils import write_text_atomic
+
+PREFIX = "leak_duck_"
+
+# name -> (type, help); every counter, gauge and histogram the run records.
+METRICS: dict[str, tuple[str, str]] = {
+    "fetch_seconds": ("histogram", "Latency of HTTP requests, by host."),
+    "fetch_errors_total": ("counter", "HTTP requests that failed without a response."),
+    "fetch_retries_total": ("counter", "Fetches retried after an error."),
+    "responses_total": ("counter", "HTTP responses, by host and status code."),
+    "downloaded_bytes_total": ("counter", "Response body bytes downloaded."),
+    "cache_requests_total": (
+        "counter",
+        "Cache lookups by cache (http, html, content, parsed) and result.",
+    ),
+    "output_records": ("gauge", "Records in each output file written by the run."),
+    "output_writes_total": (
+        "counter",
+        "Published output writes, by result (written, or unchanged and skipped).",
+    ),
+    "validation_seconds": ("histogram", "Time spent validating each output file."),
+    "cache_evicted_entries_total": ("counter", "Cache entries evicted."),
+    "cache_evicted_bytes_total": ("counter", "Bytes freed by cache eviction."),
+    "cache_orphaned_bytes_total": (
+        "counter",
+        "Bytes of stored pages no URL referred to, dropped during eviction.",
+    ),
+    "cache_bytes": ("gauge", "Bytes kept in the page cache after eviction."),
+    "critical_path_seconds": (
+        "gauge",
+        "Duration of the longest chain of dependent tasks in the run.",
+    ),
+}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(v))}"' for name, v in labels.items())
+    return "{" + pairs + "}"
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _header(lines: list[str], name: str, kind: str, help_text: str) -> None:
+    lines.append(f"# HELP {PREFIX}{name} {help_text}")
+    lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+
+def render(snapshot: dict[str, Any], command: str, succeeded: bool) -> str:
+    """Render a ``RunMetrics.snapshot()`` as Prometheus exposition text."""
+    lines: list[str] = []
+    run = {"command": command}
+
+    for name, value, help_text in (
+        ("run_success", int(succeeded), "Whether the last run succeeded."),
+        ("run_duration_seconds", snapshot["wall_seconds"], "Wall time of the run."),
+        ("run_cpu_seconds", snapshot["cpu_seconds"], "CPU time of the run."),
+        (
+            "run_finished_timestamp_seconds",
+            round(time.time(), 3),
+            "Unix time the run finished.",
+        ),
+    ):
+        _header(lines, name, "gauge", help_text)
+        lines.append(f"{PREFIX}{name}{_labels(run)} {_number(value)}")
+
+    stages = snapshot["stages"]
+    for field, name, help_text in (
+        ("calls", "stage_calls_total", "Times each stage ran."),
+        ("wall_seconds", "stage_seconds_total", "Wall time spent in each stage."),
+        ("cpu_seconds", "stage_cpu_seconds_total", "CPU time spent in each stage."),
+        ("bytes", "stage_bytes_total", "Bytes moved by each stage."),
+    ):
+        if not stages:
+            break
+        _header(lines, name, "counter", help_text)
+        for stage, totals in stages.items():
+            labels = _labels({**run, "stage": stage})
+            lines.append(f"{PREFIX}{name}{labels} {_number(totals[field])}")
+
+    for kind in ("counters", "gauges"):
+        for name, series in snapshot[kind].items():
+            default_type = "counter" if kind == "counters" else "gauge"
+            metric_type, help_text = METRICS.get(name, (default_type, name))
+            _header(lines, name, metric_type, help_text)
+            for point in series:
+                labels = _labels({**run, **point["labels"]})
+                lines.append(f"{PREFIX}{name}{labels} {_number(point['value'])}")
+
+    for name, series in snapshot["histograms"].items():
+        _, help_text = METRICS.get(name, ("histogram", name))
+        _header(lines, name, "histogram", help_text)
+        for point in series:
+            base = {**run, **point["labels"]}
+            for bound, count in point["buckets"].items():
+                labels = _labels({**base, "le": _number(float(bound))})
+                lines.append(f"{PREFIX}{name}_bucket{labels} {count}")
+            labels = _labels({**base, "le": "+Inf"})
+            lines.append(f"{PREFIX}{name}_bucket{labels} {point['count']}")
+            lines.append(f"{PREFIX}{name}_sum{_labels(base)} {_number(point['sum'])}")
+            lines.append(f"{PREFIX}{name}_count{_labels(base)} {point['count']}")
+
+    return "\n".join(lines) + "\n"
+
+
+def export_textfile(command: str, succeeded: bool) -> None:
+    """Write the run's metrics for ``command``, if exporting is configured."""
+    directory = prometheus_dir()
+    if directory is None:
+        return
+    path = directory / f"leak_duck_{command}.prom"
+    write_text_atomic(path, render(metrics.snapshot(), command, succeeded))
+    print(f"Prometheus metrics exported to {path}", flush=True)
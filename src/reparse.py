@@ -0,0 +1,90 @@
+"""Rebuilds every scraper output from the HTML store, without the network.
+
+Pages are served from the store that normal runs fill, so a parser change
+can be applied to the last fetched pages in seconds:
+
+    python -m src.reparse
+"""
+
+import argparse
+import copy
+import functools
+from typing import Any
+
+import requests
+
+from src.html_store import HTML_STORE_DIR, HtmlStore
+from src.http_client import HttpClient
+from src.main import load_config, run_scraper
+from src.scheduler import TaskGraph
+from src.utils import configure_json_output
+
+
+class StoredPageClient(HttpClient):
+    """An HTTP client that answers every GET from an ``HtmlStore``.
+
+    A URL the store has no copy of fails like an unreachable host.
+    """
+
+    def __init__(self, html_store: HtmlStore):
+        super().__init__(html_store=html_store)
+
+    def get(
+        self, url: str, timeout: float | None = None, **kwargs: Any
+    ) -> requests.Response:
+        body = self.html_store.get(url)
+        if body is None:
+            raise requests.exceptions.ConnectionError(f"{url} is not in the HTML store")
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = body
+        response.encoding = (self.html_store.entry(url) or {}).get("encoding")
+        return response
+
+
+def reparse(config: dict[str, Any], max_workers: int = 4) -> None:
+    """Rebuild each enabled scraper's output, running scrapers in parallel."""
+    client = StoredPageClient(HtmlStore(HTML_STORE_DIR, read_only=True))
+    configure_json_output(config.get("output"))
+    # Every event comes from the stored pages, not from published data, and a
+    # page missing from the store will not appear by retrying.
+    config = copy.deepcopy(config)
+    config["scraper_settings"]["retries"] = 1
+    config["scrapers"]["EventScraper"]["check_existing"] = False
+    config["scrapers"]["EventScraper"]["incremental"] = False
+
+    graph = TaskGraph()
+    for name, settings in config["scrapers"].items():
+        if settings["enabled"]:
+            scraper_info = {"class_name": name, "config": config, "http_client": client}
+            graph.add(name, functools.partial(run_scraper, scraper_info))
+    report = graph.run(max_workers)
+
+    failures = [f"{name}: {error}" for name, error in report.failures.items()]
+    for failure in failures:
+        print(f"✗ ERROR reparsing {failure}", flush=True)
+    if failures:
+        raise RuntimeError(
+            "One or more outputs failed to rebuild: " + "; ".join(failures)
+        )
+    print("=== All outputs rebuilt from stored pages ===", flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Rebuild every output from stored pages, offline."
+    )
+    parser.add_argument(
+        "--max-workers", type=int, help="scrapers rebuilt at once (default: config)"
+    )
+    args = parser.parse_args()
+
+    config = load_config()
+    reparse(
+        config, args.max_workers or config.get("scheduler", {}).get("max_workers", 4)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Runs a run's components as a dependency graph.
+
+Each task starts as soon as everything it depends on has succeeded, so
+independent tasks run concurrently. A failed task does not stop unrelated
+ones; tasks that depend on it are skipped and reported with it.
+"""
+
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+
+class TaskGraph:
+    """A set of named tasks and the tasks each one must run after."""
+
+    def __init__(self) -> None:
+        self._functions: dict[str, Callable[[], None]] = {}
+        self._dependencies: dict[str, tuple[str, ...]] = {}
+
+    def add(
+        self, name: str, function: Callable[[], None], after: Iterable[str] = ()
+    ) -> None:
+        if name in self._functions:
+            raise ValueError(f"Task {name} is already scheduled")
+        self._functions[name] = function
+        self._dependencies[name] = tuple(after)
+
+    def _check(self) -> None:
+        """Reject dependencies on unknown tasks and dependency cycles."""
+        for name, dependencies in self._dependencies.items():
+            unknown = [d for d in dependencies if d not in self._functions]
+            if unknown:
+                raise ValueError(f"Task {name} depends on unknown tasks {unknown}")
+
+        visiting: set[str] = set()
+        done: set[str] = set()
+
+        def visit(name: str, path: list[str]) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                cycle = path[path.index(name) :] + [name]
+                raise ValueError(f"Dependency cycle: {' -> '.join(cycle)}")
+            visiting.add(name)
+            for dependency in self._dependencies[name]:
+                visit(dependency, [*path, name])
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self._functions:
+            visit(name, [])
+
+    def run(self, max_workers: int = 4) -> "ScheduleReport":
+        """Run every task, at most ``max_workers`` at a time."""
+        self._check()
+        report = ScheduleReport(self._dependencies)
+        pending = dict(self._dependencies)
+        running: dict[Future[None], str] = {}
+        started: dict[str, float] = {}
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            while pending or running:
+                for name, dependencies in list(pending.items()):
+                    blocked_by = next(
+                        (d for d in dependencies if d in report.not_run), None
+                    )
+                    if blocked_by is not None:
+                        del pending[name]
+                        report.skipped[name] = blocked_by
+                    elif all(d in report.durations for d in dependencies):
+                        del pending[name]
+                        started[name] = time.perf_counter()
+                        running[executor.submit(self._functions[name])] = name
+
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        report.durations[name] = time.perf_counter() - started[name]
+                    else:
+                        report.failures[name] = error
+        return report
+
+
+class ScheduleReport:
+    """What happened to each task of a ``TaskGraph`` run."""
+
+    def __init__(self, dependencies: dict[str, tuple[str, ...]]) -> None:
+        self.dependencies = dependencies
+        self.durations: dict[str, float] = {}
+        self.failures: dict[str, BaseException] = {}
+        # Skipped task -> the failed or skipped dependency that blocked it.
+        self.skipped: dict[str, str] = {}
+
+    @property
+    def not_run(self) -> set[str]:
+        return set(self.failures) | set(self.skipped)
+
+    def critical_path(self) -> tuple[list[str], float]:
+        """Return the chain of succeeded tasks that took longest end to end."""
+        longest: dict[str, tuple[float, list[str]]] = {}
+
+        def chain(name: str) -> tuple[float, list[str]]:
+            if name not in longest:
+                before = [
+                    chain(d) for d in self.dependencies[name] if d in self.durations
+                ]
+                seconds, path = max(before, default=(0.0, []))
+                longest[name] = (seconds + self.durations[name], [*path, name])
+            return longest[name]
+
+        seconds, path = max((chain(name) for name in self.durations), default=(0.0, []))
+        return path, seconds
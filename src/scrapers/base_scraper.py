@@ -1,13 +1,24 @@
+import sys
 import time
 from abc import ABC, abstractmethod
+from pathlib import Path
 from typing import Any
 
 import requests
-from bs4 import BeautifulSoup
 
-from src.paths import HTML_DIR, data_dir
-from src.utils import save_html, write_json_atomic
-from src.validation import validate_scraper_output
+from src import dom, utils
+from src.cache import DIGESTS_DIR
+from src.dom import Node, get_backend
+from src.http_client import HttpClient, shared_http_client
+from src.metrics import metrics, span
+from src.paths import cache_enabled, data_dir
+from src.utils import (
+    content_digest,
+    source_fingerprint,
+    write_output_json,
+    write_text_atomic,
+)
+from src.validation import count_records, validate_scraper_output
 
 
 class ScraperFetchError(RuntimeError):
@@ -15,14 +26,61 @@ class ScraperFetchError(RuntimeError):
 
 
 class BaseScraper(ABC):
-    def __init__(self, url: str, file_name: str, scraper_settings: dict[str, Any]):
+    # Whether an unchanged listing page (a 304, or a body with the same digest
+    # as last run) means the saved JSON is still current.
+    reuses_unchanged_output = True
+
+    def __init__(
+        self,
+        url: str,
+        file_name: str,
+        scraper_settings: dict[str, Any],
+        http_client: HttpClient | None = None,
+    ):
         self.url = url
         self.file_name = file_name
-        self.raw_html_path = HTML_DIR / f"{file_name}.html"
         self.json_path = data_dir() / f"{file_name}.json"
+        # Kept with the rest of the cache rather than next to the output, which
+        # CI rebuilds from the published data on every run.
+        self.digest_path: Path | None = (
+            DIGESTS_DIR / f"{file_name}.sha256" if cache_enabled() else None
+        )
         self.scraper_settings = scraper_settings
+        self.http = http_client or shared_http_client()
+        self.dom = get_backend(scraper_settings.get("parser"))
+
+    @property
+    def parser_version(self) -> str:
+        """Changes whenever the code that builds this scraper's output changes."""
+        module_file = sys.modules[type(self).__module__].__file__
+        return source_fingerprint(
+            str(module_file), str(utils.__file__), str(dom.__file__)
+        )
+
+    def _saved_output_is_reusable(self) -> bool:
+        """Whether the saved JSON was built from this scraper's current code."""
+        if not self.reuses_unchanged_output or not self.json_path.exists():
+            return False
+        return self._saved_digest()[1] == self.parser_version
 
-    def _fetch_html(self) -> BeautifulSoup:
+    def _saved_digest(self) -> tuple[str | None, str | None]:
+        """Return the saved output's page digest and parser version."""
+        if self.digest_path is None:
+            return None, None
+        try:
+            saved = self.digest_path.read_text(encoding="utf-8").split()
+        except OSError:
+            return None, None
+        return (saved[0], saved[1]) if len(saved) == 2 else (None, None)
+
+    def _fetch_page(self) -> requests.Response | None:
+        """Fetches the page, or returns None when the server says it is unchanged.
+
+        The server can only answer 304 Not Modified when the previous output
+        still exists and was built by the current parser, since that output is
+        what the run keeps.
+        """
+        reusable = self._saved_output_is_reusable()
         retries = self.scraper_settings.get("retries", 3)
         delay = self.scraper_settings.get("delay", 5)
         timeout = self.scraper_settings.get("timeout", 15)
@@ -33,16 +91,20 @@ class BaseScraper(ABC):
                 flush=True,
             )
             try:
-                response = requests.get(self.url, timeout=timeout)
+                response = self.http.conditional_get(
+                    self.url, reusable, timeout=timeout
+                )
                 response.raise_for_status()
+                if response.status_code == 304:
+                    return None
 
-                save_html(response.text, self.raw_html_path)
-
-                return BeautifulSoup(response.content, "lxml")
+                self.http.html_store.put(self.url, response.content, response.encoding)
+                return response
             except requests.exceptions.RequestException as e:
                 print(f"Error fetching {self.url}: {e}", flush=True)
                 if attempt < retries - 1:
                     print(f"Retrying in {delay} seconds...", flush=True)
+                    metrics.count("fetch_retries_total", component=type(self).__name__)
                     time.sleep(delay)
                 else:
                     print("All retry attempts failed.", flush=True)
@@ -53,15 +115,55 @@ class BaseScraper(ABC):
 
     def save_to_json(self, data: dict[Any, Any] | list[Any]) -> None:
         print(f"Saving data to {self.json_path}...")
-        write_json_atomic(self.json_path, data)
-        print(f"Successfully saved {self.json_path}")
+        written = write_output_json(self.json_path, data)
+        metrics.set_gauge("output_records", count_records(data), file=self.file_name)
+        if written:
+            print(f"Successfully saved {self.json_path}")
+        else:
+            print(f"{self.json_path} is unchanged; left as it is")
 
     @abstractmethod
-    def parse(self, soup: BeautifulSoup) -> dict[Any, Any] | list[Any]:
-        pass
+    def parse(self, soup: Node) -> dict[Any, Any] | list[Any]:
+        """Parse a document root produced by ``self.dom``."""
 
     def run(self) -> None:
-        soup = self._fetch_html()
-        data = self.parse(soup)
-        validate_scraper_output(self.file_name, data)
-        self.save_to_json(data)
+        stage = type(self).__name__
+        with span(f"{stage}.fetch") as fetch:
+            response = self._fetch_page()
+            if response is not None:
+                fetch.add_bytes(len(response.content))
+        if response is None:
+            print(f"{self.url} is unchanged; keeping {self.json_path}", flush=True)
+            return
+
+        digest = content_digest(
+            response.content, self.scraper_settings.get("volatile_markup", [])
+        )
+        unchanged = False
+        if self._saved_output_is_reusable():
+            unchanged = self._saved_digest()[0] == digest
+            metrics.count(
+                "cache_requests_total",
+                cache="content",
+                result="hit" if unchanged else "miss",
+            )
+        if unchanged:
+            print(
+                f"{self.url} content is unchanged; skipped parsing and kept "
+                f"{self.json_path}",
+                flush=True,
+            )
+            self.http.validators.remember(self.url, response)
+            return
+
+        with span(f"{stage}.tree"):
+            root = self.dom.parse(response.content)
+        with span(f"{stage}.parse"):
+            data = self.parse(root)
+        with span(f"{stage}.validate"):
+            validate_scraper_output(self.file_name, data)
+        with span(f"{stage}.write"):
+            self.save_to_json(data)
+        self.http.validators.remember(self.url, response)
+        if self.digest_path is not None:
+            write_text_atomic(self.digest_path, f"{digest} {self.parser_version}\n")
@@ -1,42 +1,61 @@
 import re
-from typing import Any, cast
-
-from bs4 import BeautifulSoup, Tag
+from typing import Any
 
+from src.dom import DomBackend, Node, Selector, has_class
+from src.http_client import HttpClient
 from src.utils import parse_pokemon_list
 
 from .base_scraper import BaseScraper
 
+EGG_GROUP_TITLES = Selector(
+    "article.article-page h2",
+    f"descendant::h2[ancestor::article[{has_class('article-page')}]]",
+)
+RARITY_EGGS = Selector(
+    "div.rarity > svg.mini-egg",
+    f"descendant::svg[{has_class('mini-egg')}][parent::div[{has_class('rarity')}]]",
+)
 
-class EggScraper(BaseScraper):
-    def __init__(self, url: str, file_name: str, scraper_settings: dict[str, Any]):
-        super().__init__(url, file_name, scraper_settings)
 
-    def parse(self, soup: BeautifulSoup) -> dict[str, Any]:
+def rarity_tier(card: Node, dom: DomBackend) -> dict[str, Any]:
+    """Reads a card's rarity, shown as one to five small eggs."""
+    return {"rarity_tier": len(dom.select(card, RARITY_EGGS))}
+
+
+class EggScraper(BaseScraper):
+    def __init__(
+        self,
+        url: str,
+        file_name: str,
+        scraper_settings: dict[str, Any],
+        http_client: HttpClient | None = None,
+    ):
+        super().__init__(url, file_name, scraper_settings, http_client)
+
+    def parse(self, soup: Node) -> dict[str, Any]:
+        dom = self.dom
         egg_pool: dict[str, Any] = {}
-        egg_group_titles = soup.select("article.article-page h2")
+        egg_group_titles = dom.select(soup, EGG_GROUP_TITLES)
 
         for title_element in egg_group_titles:
-            title_element = cast(Tag, title_element)
-            egg_grid = title_element.find_next_sibling("ul", class_="egg-grid")
-            if not isinstance(egg_grid, Tag):
+            egg_grid = next(
+                (
+                    sibling
+                    for sibling in dom.next_siblings(title_element)
+                    if dom.tag(sibling) == "ul" and "egg-grid" in dom.classes(sibling)
+                ),
+                None,
+            )
+            if egg_grid is None:
                 continue
 
-            egg_group_name = title_element.get_text(strip=True)
+            egg_group_name = dom.text(title_element)
             distance_match = re.search(r"\d+", egg_group_name)
             hatch_distance = int(distance_match.group(0)) if distance_match else None
 
-            pokemon_data = parse_pokemon_list(egg_grid)
-
+            pokemon_data = parse_pokemon_list(egg_grid, dom, [rarity_tier])
             for pokemon in pokemon_data:
                 pokemon["hatch_distance"] = hatch_distance
-                name_span = egg_grid.find("span", class_="name", string=pokemon["name"])
-                if name_span:
-                    card = name_span.find_parent("li")
-                    if isinstance(card, Tag):
-                        pokemon["rarity_tier"] = len(
-                            card.select("div.rarity > svg.mini-egg")
-                        )
 
             egg_pool[egg_group_name] = pokemon_data
 
@@ -1,15 +1,71 @@
+import hashlib
 import re
+import threading
 import time
-from datetime import datetime, timedelta
-from pathlib import Path
-from typing import Any, cast
-from urllib.parse import quote_plus
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from urllib.parse import urlsplit
 
 import requests
-from bs4 import BeautifulSoup, Tag
 
-from src.paths import HTML_DIR
-from src.utils import clean_banner_url, process_time_data, save_html
+from src import dom, utils
+from src.cache import PARSED_DIR, ParsedResultCache
+from src.dom import Node, Scope, Selector, get_backend, has_class
+from src.http_client import HttpClient, shared_http_client
+from src.metrics import metrics, span
+from src.paths import cache_enabled
+from src.utils import (
+    clean_banner_url,
+    process_time_data,
+    source_fingerprint,
+)
+
+# Any edit to the parsing code yields a new version, invalidating parsed results.
+PARSER_VERSION = source_fingerprint(__file__, str(utils.__file__), str(dom.__file__))
+
+PAGE_CONTENT = Selector(
+    "div.page-content", f"descendant::div[{has_class('page-content')}]"
+)
+START_DATE = Selector(
+    "span#event-date-start", "descendant::span[@id='event-date-start']"
+)
+START_TIME = Selector(
+    "span#event-time-start", "descendant::span[@id='event-time-start']"
+)
+END_DATE = Selector("span#event-date-end", "descendant::span[@id='event-date-end']")
+END_TIME = Selector("span#event-time-end", "descendant::span[@id='event-time-end']")
+EVENT_DESCRIPTION = Selector(
+    "div.event-description", f"descendant::div[{has_class('event-description')}]"
+)
+SECTION_HEADERS = Selector(
+    "h2.event-section-header", f"descendant::h2[{has_class('event-section-header')}]"
+)
+PKMN_ITEMS = Selector(
+    "li.pkmn-list-item", f"descendant::li[{has_class('pkmn-list-item')}]"
+)
+PKMN_NAME = Selector("div.pkmn-name", f"descendant::div[{has_class('pkmn-name')}]")
+PKMN_IMAGE = Selector(
+    ".pkmn-list-img img", f"descendant::img[ancestor::*[{has_class('pkmn-list-img')}]]"
+)
+SHINY_ICON = Selector("img.shiny-icon", f"descendant::img[{has_class('shiny-icon')}]")
+BONUS_TEXT = Selector("div.bonus-text", f"descendant::div[{has_class('bonus-text')}]")
+
+DATE_SELECTORS = {
+    "event-date-start": START_DATE,
+    "event-time-start": START_TIME,
+    "event-date-end": END_DATE,
+    "event-time-end": END_TIME,
+}
+DATE_ID_PATTERN = re.compile(
+    r"""\bid\s*=\s*["']?(event-(?:date|time)-(?:start|end))\b"""
+)
+# Matches scraper_settings.max_requests_per_host in config.json.
+DEFAULT_MAX_REQUESTS_PER_HOST = 3
+
+# The only parts of an event page the parser reads.
+PAGE_SCOPE = Scope(classes=("page-content",), ids=tuple(DATE_SELECTORS))
 
 
 def clean_spacing(text: str) -> str:
@@ -33,264 +89,351 @@ def clean_spacing(text: str) -> str:
     return text.strip()
 
 
+class _ContentWalk:
+    """What one pass over an event page's content has collected so far."""
+
+    def __init__(self, headers: list[Node]):
+        # Keeping the headers referenced keeps their ids stable for lookups.
+        self.headers = headers
+        self.index = {id(header): i for i, header in enumerate(headers)}
+        self.section_ids: list[str | None] = [None] * len(headers)
+        # Per header, the (details key, items) read from its section; a None
+        # key stands for the header's own section id.
+        self.found: list[list[tuple[str | None, list[Any]]]] = [[] for _ in headers]
+        self.described_sections: dict[str, list[str]] = {}
+        self.description_parts: list[str] = []
+        self.unwrapped_parts: list[str] = []
+
+
 class EventPageScraper:
     """
-    A class to scrape event pages using requests and BeautifulSoup.
+    A class to scrape event pages using requests and the configured parser
+    backend (BeautifulSoup or lxml).
 
     Event pages are server-rendered: dates, descriptions, Pokémon lists, and
     bonuses are all present in the initial HTML response, so no JS execution
     is required to read them.
+
+    One instance may be shared by several worker threads; requests to the same
+    host are capped at ``max_requests_per_host`` at a time.
     """
 
-    def __init__(self, scraper_settings: dict[str, Any] | None = None):
+    def __init__(
+        self,
+        scraper_settings: dict[str, Any] | None = None,
+        http_client: HttpClient | None = None,
+    ):
         settings = scraper_settings or {}
+        self.http = http_client or shared_http_client()
         self.cache_expiration_hours = settings.get("cache_expiration_hours", 1)
         self.max_retries = settings.get("retries", 3)
         self.retry_delay = settings.get("delay", 1)
         self.timeout = settings.get("timeout", 15)
-
-    def _is_cache_valid(self, cache_path: Path) -> bool:
-        """Checks if the cached HTML file exists and is not expired."""
-        if not cache_path.exists():
+        self.dom = get_backend(settings.get("parser"))
+        self.scoped_parsing = settings.get("scoped_parsing", True)
+        self.max_requests_per_host = max(
+            1,
+            settings.get("max_requests_per_host", DEFAULT_MAX_REQUESTS_PER_HOST),
+        )
+        self._host_slots: dict[str, threading.BoundedSemaphore] = {}
+        self._host_slots_lock = threading.Lock()
+        # Parsed results are kept alongside the stored pages.
+        self.parsed_cache = ParsedResultCache(PARSED_DIR if cache_enabled() else None)
+
+    @contextmanager
+    def _host_slot(self, url: str) -> Iterator[None]:
+        """Holds one of the host's request slots for the duration of a fetch."""
+        host = urlsplit(url).netloc
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_requests_per_host)
+                self._host_slots[host] = slot
+        with slot:
+            yield
+
+    def _is_cache_valid(self, url: str) -> bool:
+        """Checks if the stored copy of a page exists and is not expired."""
+        fetched_at = self.http.html_store.fetched_at(url)
+        if fetched_at is None:
             return False
 
-        file_modified_time = datetime.fromtimestamp(cache_path.stat().st_mtime)
-        expiration_time = datetime.now() - timedelta(hours=self.cache_expiration_hours)
-
-        return file_modified_time > expiration_time
+        expiration_time = datetime.now(UTC) - timedelta(
+            hours=self.cache_expiration_hours
+        )
+        return fetched_at > expiration_time
 
-    def _fetch_html(self, url: str) -> str:
-        """Fetches the HTML content of an event page."""
-        response = requests.get(url, timeout=self.timeout)
+    def _fetch_page(self, url: str, reusable: bool) -> requests.Response:
+        """Fetches an event page, revalidating the cached copy when ``reusable``."""
+        with self._host_slot(url):
+            response = self.http.conditional_get(url, reusable, timeout=self.timeout)
         response.raise_for_status()
-        return response.text
+        return response
+
+    def _parse_document(self, html_content: str, url: str) -> Node:
+        """Builds the tree ``_parse_event_details`` reads.
+
+        With scoped parsing only the page content and the date spans are
+        built. If the scoped tree is missing a region the page has, the page
+        is parsed in full instead.
+        """
+        if not (self.scoped_parsing and self.dom.scopes_parsing):
+            return self.dom.parse(html_content)
 
-    def _parse_event_details(self, soup: BeautifulSoup, url: str) -> dict[str, Any]:
-        """Parses the HTML soup to extract event details."""
+        root = self.dom.parse_scoped(html_content, PAGE_SCOPE)
+        if self._scoped_tree_is_complete(root, html_content):
+            return root
+
+        print(f"Scoped parse of {url} looks incomplete; parsing in full", flush=True)
+        return self.dom.parse(html_content)
+
+    def _scoped_tree_is_complete(self, root: Node, html_content: str) -> bool:
+        """Checks that a scoped tree holds the page content and every date span."""
+        dom = self.dom
+        if dom.select_one(root, PAGE_CONTENT) is None:
+            return False
+        found = {
+            date_id
+            for date_id, selector in DATE_SELECTORS.items()
+            if dom.select_one(root, selector) is not None
+        }
+        return set(DATE_ID_PATTERN.findall(html_content)) <= found
+
+    def _parse_event_details(self, soup: Node, url: str) -> dict[str, Any]:
+        """Parses the document root produced by ``self.dom`` into event details."""
+        dom = self.dom
         event_details: dict[str, Any] = {"article_url": url, "details": {}}
-        content = soup.find("div", class_="page-content")
+        content = dom.select_one(soup, PAGE_CONTENT)
 
-        if not isinstance(content, Tag):
+        if content is None:
             return event_details
 
         # Time details
-        start_date_element = cast(Tag | None, soup.find("span", id="event-date-start"))
-        start_time_element = cast(Tag | None, soup.find("span", id="event-time-start"))
-        end_date_element = cast(Tag | None, soup.find("span", id="event-date-end"))
-        end_time_element = cast(Tag | None, soup.find("span", id="event-time-end"))
+        start_date_element = dom.select_one(soup, START_DATE)
+        start_time_element = dom.select_one(soup, START_TIME)
+        end_date_element = dom.select_one(soup, END_DATE)
+        end_time_element = dom.select_one(soup, END_TIME)
 
         is_local = not (
-            isinstance(start_date_element, Tag)
-            and "data-event-page-date" in start_date_element.attrs
+            start_date_element is not None
+            and dom.attr(start_date_element, "data-event-page-date") is not None
         )
         event_details["is_local_time"] = is_local
 
         event_details["start_time"] = process_time_data(
-            start_date_element, start_time_element, is_local
+            start_date_element, start_time_element, is_local, dom
         )
         event_details["end_time"] = process_time_data(
-            end_date_element, end_time_element, is_local
+            end_date_element, end_time_element, is_local, dom
         )
 
-        # Description and embedded sections
-        description_div = content.find("div", class_="event-description")
-        if isinstance(description_div, Tag):
-            description_parts = []
-            current_section_id: str | None = None
-            current_section_items = []
-
-            for child in description_div.children:
-                if not isinstance(child, Tag):
-                    continue
-
-                # Check if this is a section header (h2 with id and event-section-header class)
-                section_id_val = child.get("id")
-                classes = cast(list, child.get("class") or [])
-                if (
-                    child.name == "h2"
-                    and section_id_val
-                    and isinstance(section_id_val, str)
-                    and "event-section-header" in classes
-                ):
-                    # Save current section if we were in one
-                    if current_section_id and current_section_items:
-                        event_details["details"][current_section_id] = (
-                            current_section_items
-                        )
-                        current_section_items = []
-
-                    # Start new section
-                    current_section_id = section_id_val
-                    continue
-
-                # If we're in a section, collect items
-                if current_section_id:
-                    if child.name == "p":
-                        text = clean_spacing(child.get_text(separator=" ", strip=True))
-                        if text:
-                            current_section_items.append(text)
-                    elif child.name == "ul":
-                        for li in child.find_all("li", recursive=False):
-                            text = clean_spacing(li.get_text(separator=" ", strip=True))
-                            if text:
-                                current_section_items.append(text)
-                # Otherwise, add to description
-                else:
-                    if child.name == "p":
-                        text = clean_spacing(child.get_text(separator=" ", strip=True))
-                        if text:
-                            description_parts.append(text)
-                    elif child.name == "ul":
-                        for li in child.find_all("li", recursive=False):
-                            text = clean_spacing(li.get_text(separator=" ", strip=True))
-                            if text:
-                                description_parts.append(f"- {text}")
-
-            # Save any remaining section
-            if current_section_id and current_section_items:
-                event_details["details"][current_section_id] = current_section_items
-
-            if description_parts:
-                event_details["description"] = "\n".join(description_parts)
-
-        if not event_details.get("description"):
-            unwrapped = self._parse_unwrapped_description(content)
-            if unwrapped:
-                event_details["description"] = unwrapped
-
-        # Main sections
-        main_sections = content.find_all("h2", class_="event-section-header")
-        for section in main_sections:
-            self._parse_section(cast(Tag, section), event_details)
+        description_div = dom.select_one(content, EVENT_DESCRIPTION)
+        walk = _ContentWalk(dom.select(content, SECTION_HEADERS))
+        walk.section_ids = [dom.attr(header, "id") or None for header in walk.headers]
+
+        # Each element that holds a section header, the description or the
+        # unwrapped description is walked once, child by child.
+        containers = {id(content): content}
+        if description_div is not None:
+            containers[id(description_div)] = description_div
+        for header in walk.headers:
+            parent = dom.parent(header)
+            if parent is not None:
+                containers.setdefault(id(parent), parent)
+        for container in containers.values():
+            self._walk_children(
+                container,
+                walk,
+                is_description=container is description_div,
+                is_content=container is content,
+            )
+
+        details = event_details["details"]
+        details.update(walk.described_sections)
+        if walk.description_parts:
+            event_details["description"] = "\n".join(walk.description_parts)
+        elif walk.unwrapped_parts:
+            event_details["description"] = "\n".join(walk.unwrapped_parts)
+
+        # Sections are assembled in document order of their headers, as each
+        # header's lists and bonuses would be read one section at a time.
+        for section_id, found in zip(walk.section_ids, walk.found, strict=True):
+            if not section_id:
+                continue
+            for key, items in found:
+                details.setdefault(key or section_id, []).extend(items)
+            self._finish_section(section_id, details)
 
         # Final cleanup - move bonuses to details if it exists
-        if "bonuses" in event_details["details"]:
-            event_details["details"]["bonuses"] = sorted(
-                list(set(event_details["details"]["bonuses"]))
-            )
+        if "bonuses" in details:
+            details["bonuses"] = sorted(list(set(details["bonuses"])))
 
         return event_details
 
-    def _parse_unwrapped_description(self, content: Tag) -> str | None:
-        """Reads intro prose that is not wrapped in a div.event-description.
+    def _list_items(self, element: Node) -> list[Node]:
+        """Returns a list's own <li> children."""
+        return [li for li in self.dom.children(element) if self.dom.tag(li) == "li"]
 
-        Some pages (Twitch Drops, for example) place their description directly
-        in the page content, between the page header and the first section.
+    def _list_texts(self, element: Node) -> list[str]:
+        """Returns the cleaned text of each item of a list."""
+        texts = (
+            clean_spacing(self.dom.text(li, " ")) for li in self._list_items(element)
+        )
+        return [text for text in texts if text]
+
+    def _walk_children(
+        self,
+        container: Node,
+        walk: "_ContentWalk",
+        is_description: bool,
+        is_content: bool,
+    ) -> None:
+        """Reads everything a container's children contribute, in one pass.
+
+        Children are read as section content (Pokémon lists and bonuses that
+        follow a section header), as the wrapped description and its embedded
+        text sections when the container is div.event-description, and as the
+        unwrapped description when the container is the page content. Some
+        pages (Twitch Drops, for example) place their description directly in
+        the page content, between the page header and the first section.
         """
-        description_parts: list[str] = []
-        after_header = False
-
-        for child in content.children:
-            if not isinstance(child, Tag):
-                continue
+        dom = self.dom
+        header_index: int | None = None
 
-            classes = cast(list, child.get("class") or [])
-            if child.name == "div" and "header-page" in classes:
-                after_header = True
-                continue
-            if not after_header:
-                continue
+        # Wrapped description state
+        described_id: str | None = None
+        described_items: list[str] = []
 
-            # The description ends where the page's structured content begins.
-            if child.name in ("h2", "hr", "style", "script") or (
-                child.name == "div" and "event-toc" in classes
-            ):
-                break
-
-            if child.name == "p":
-                text = clean_spacing(child.get_text(separator=" ", strip=True))
-                if text:
-                    description_parts.append(text)
-            elif child.name == "ul":
-                for li in child.find_all("li", recursive=False):
-                    text = clean_spacing(li.get_text(separator=" ", strip=True))
+        # Unwrapped description state
+        after_header = False
+        unwrapped_done = not is_content
+
+        for child in dom.children(container):
+            name = dom.tag(child)
+            classes = dom.classes(child)
+            is_header = name == "h2" and "event-section-header" in classes
+
+            # A section runs until the next section header under the same parent.
+            if is_header:
+                header_index = walk.index.get(id(child))
+            elif header_index is not None and walk.section_ids[header_index]:
+                # Handle both pkmn-list and pkmn-list-flex classes
+                if name == "ul" and (
+                    "pkmn-list" in classes or "pkmn-list-flex" in classes
+                ):
+                    pokemon = self._parse_pokemon_list(child)
+                    if pokemon:
+                        walk.found[header_index].append((None, pokemon))
+                elif name == "div" and "bonus-list" in classes:
+                    bonuses = self._parse_bonuses(child)
+                    if bonuses:
+                        walk.found[header_index].append(("bonuses", bonuses))
+
+            if is_description:
+                section_id_val = dom.attr(child, "id") if is_header else None
+                if section_id_val:
+                    # Save current section if we were in one
+                    if described_id and described_items:
+                        walk.described_sections[described_id] = described_items
+                        described_items = []
+                    described_id = section_id_val
+                elif name == "p":
+                    text = clean_spacing(dom.text(child, " "))
                     if text:
-                        description_parts.append(f"- {text}")
-
-        return "\n".join(description_parts) or None
-
-    def _parse_section(self, section: Tag, event_details: dict[str, Any]):
-        """Parses a single section of the event page."""
-        section_id_val = section.get("id")
-        if not section_id_val or not isinstance(section_id_val, str):
-            return
-        section_id = section_id_val
-
-        next_element = section.find_next_sibling()
-        while isinstance(next_element, Tag):
-            classes = cast(list, next_element.get("class") or [])
-            if (
-                next_element.name == "h2"
-                and classes
-                and "event-section-header" in classes
-            ):
-                break
-
-            # Handle both pkmn-list and pkmn-list-flex classes
-            if (
-                next_element.name == "ul"
-                and classes
-                and ("pkmn-list" in classes or "pkmn-list-flex" in classes)
-            ):
-                self._parse_pokemon_list(next_element, section_id, event_details)
-            elif next_element.name == "div" and classes and "bonus-list" in classes:
-                self._parse_bonuses(next_element, event_details)
-
-            next_element = next_element.find_next_sibling()
-
-        if section_id in event_details["details"]:
-            items = event_details["details"][section_id]
+                        if described_id:
+                            described_items.append(text)
+                        else:
+                            walk.description_parts.append(text)
+                elif name == "ul":
+                    texts = self._list_texts(child)
+                    if described_id:
+                        described_items.extend(texts)
+                    else:
+                        walk.description_parts.extend(f"- {text}" for text in texts)
+
+            if not unwrapped_done:
+                if name == "div" and "header-page" in classes:
+                    after_header = True
+                elif not after_header:
+                    pass
+                # The description ends where the page's structured content begins.
+                elif name in ("h2", "hr", "style", "script") or (
+                    name == "div" and "event-toc" in classes
+                ):
+                    unwrapped_done = True
+                elif name == "p":
+                    text = clean_spacing(dom.text(child, " "))
+                    if text:
+                        walk.unwrapped_parts.append(text)
+                elif name == "ul":
+                    walk.unwrapped_parts.extend(
+                        f"- {text}" for text in self._list_texts(child)
+                    )
+
+        # Save any remaining section
+        if described_id and described_items:
+            walk.described_sections[described_id] = described_items
+
+    def _finish_section(self, section_id: str, details: dict[str, Any]) -> None:
+        """Dedupes and sorts the items collected for a section."""
+        if section_id in details:
+            items = details[section_id]
             if items and isinstance(items[0], dict):
                 # Pokémon entries: dedupe by name (dicts aren't hashable for set()).
                 deduped_by_name = {item["name"]: item for item in items}
-                event_details["details"][section_id] = sorted(
+                details[section_id] = sorted(
                     deduped_by_name.values(), key=lambda p: p["name"]
                 )
             else:
-                event_details["details"][section_id] = sorted(list(set(items)))
+                details[section_id] = sorted(list(set(items)))
 
-    def _parse_pokemon_list(
-        self, element: Tag, section_id: str, event_details: dict[str, Any]
-    ):
+    def _parse_pokemon_list(self, element: Node) -> list[dict[str, Any]]:
         """Parses a list of Pokémon from a section, including asset URL and shiny availability."""
+        dom = self.dom
         pokemon_list = []
         seen_names = set()
-        for li in element.find_all("li", class_="pkmn-list-item"):
-            li_tag = cast(Tag, li)
-            pkmn_name_div = cast(Tag | None, li_tag.find("div", class_="pkmn-name"))
-            if not pkmn_name_div:
+        for li in dom.select(element, PKMN_ITEMS):
+            pkmn_name_div = dom.select_one(li, PKMN_NAME)
+            if pkmn_name_div is None:
                 continue
 
-            name = clean_spacing(pkmn_name_div.get_text(strip=True))
+            name = clean_spacing(dom.text(pkmn_name_div))
             if name in seen_names:
                 continue
             seen_names.add(name)
 
-            asset_img = cast(Tag | None, li_tag.select_one(".pkmn-list-img img"))
-            asset_url = (
-                clean_banner_url(asset_img["src"])
-                if asset_img and asset_img.has_attr("src")
-                else None
-            )
-            is_shiny = li_tag.find("img", class_="shiny-icon") is not None
+            asset_img = dom.select_one(li, PKMN_IMAGE)
+            asset_src = dom.attr(asset_img, "src") if asset_img is not None else None
+            asset_url = clean_banner_url(asset_src) if asset_src is not None else None
+            is_shiny = dom.select_one(li, SHINY_ICON) is not None
 
             pokemon_list.append(
                 {"name": name, "asset_url": asset_url, "shiny_available": is_shiny}
             )
+        return pokemon_list
 
-        if pokemon_list:
-            event_details["details"].setdefault(section_id, []).extend(pokemon_list)
-
-    def _parse_bonuses(self, element: Tag, event_details: dict[str, Any]):
+    def _parse_bonuses(self, element: Node) -> list[str]:
         """Parses a list of bonuses."""
         bonuses = {
-            clean_spacing(item.get_text(strip=True))
-            for item in element.find_all("div", class_="bonus-text")
+            clean_spacing(self.dom.text(item))
+            for item in self.dom.select(element, BONUS_TEXT)
         }
-        if bonuses:
-            event_details["details"].setdefault("bonuses", []).extend(
-                sorted(list(bonuses))
-            )
+        return sorted(list(bonuses))
+
+    def _parse_cached(self, url: str, html_content: str) -> dict[str, Any]:
+        """Parses a page, reusing the stored result when the HTML is identical."""
+        digest = hashlib.sha256(html_content.encode("utf-8")).hexdigest()
+        event_details = self.parsed_cache.get(url, digest, PARSER_VERSION)
+        if event_details is not None:
+            print(f"Using parsed result for unchanged page: {url}", flush=True)
+            return event_details
+
+        with span("EventPageScraper.tree"):
+            root = self._parse_document(html_content, url)
+        with span("EventPageScraper.parse"):
+            event_details = self._parse_event_details(root, url)
+        self.parsed_cache.put(url, digest, PARSER_VERSION, event_details)
+        return event_details
 
     def scrape(self, url: str) -> dict[str, Any]:
         """
@@ -308,28 +451,47 @@ class EventPageScraper:
         Raises:
             RuntimeError: If fetching or parsing fails after all retries.
         """
-        html_path = HTML_DIR / f"event_page_{quote_plus(url)}.html"
+        store = self.http.html_store
 
         for attempt in range(1, self.max_retries + 1):
             try:
-                use_cache = self._is_cache_valid(html_path) and attempt == 1
+                cached = None
+                if attempt == 1 and self._is_cache_valid(url):
+                    cached = store.get_text(url)
+                use_cache = cached is not None
+                if attempt == 1 and store.enabled:
+                    metrics.count(
+                        "cache_requests_total",
+                        cache="html",
+                        result="hit" if use_cache else "miss",
+                    )
 
-                if use_cache:
+                if cached is not None:
                     print(f"Using cached HTML for: {url}", flush=True)
-                    with html_path.open("r", encoding="utf-8") as f:
-                        html_content = f.read()
+                    html_content = cached
                 else:
                     print(
                         f"Scraping event page: {url} (attempt {attempt}/{self.max_retries})",
                         flush=True,
                     )
-                    html_content = self._fetch_html(url)
-
-                soup = BeautifulSoup(html_content, "lxml")
-                event_details = self._parse_event_details(soup, url)
+                    stored = store.get_text(url)
+                    with span("EventPageScraper.fetch") as fetch:
+                        response = self._fetch_page(url, reusable=stored is not None)
+                        fetch.add_bytes(len(response.content))
+                    if response.status_code == 304 and stored is not None:
+                        print(f"Event page not modified: {url}", flush=True)
+                        html_content = stored
+                        # Revalidated, so the copy counts as fresh again.
+                        store.touch(url)
+                        use_cache = True
+                    else:
+                        html_content = response.text
+
+                event_details = self._parse_cached(url, html_content)
 
                 if not use_cache:
-                    save_html(html_content, html_path)
+                    store.put(url, response.content, response.encoding)
+                    self.http.validators.remember(url, response)
                 return event_details
 
             except requests.exceptions.RequestException as e:
@@ -338,6 +500,7 @@ class EventPageScraper:
                     flush=True,
                 )
                 if attempt < self.max_retries:
+                    metrics.count("fetch_retries_total", component="EventPageScraper")
                     time.sleep(self.retry_delay)
                 else:
                     raise RuntimeError(
@@ -353,6 +516,7 @@ class EventPageScraper:
                     raise RuntimeError(
                         f"Failed to parse event page {url} after {self.max_retries} attempts"
                     ) from e
+                metrics.count("fetch_retries_total", component="EventPageScraper")
                 time.sleep(self.retry_delay)
 
         # Should never reach here, but just in case
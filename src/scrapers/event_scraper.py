@@ -1,10 +1,13 @@
 import json
-from typing import Any, cast
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
 from urllib.parse import urljoin
 
 import requests
-from bs4 import BeautifulSoup, Tag
 
+from src.dom import Node, Selector, has_class
+from src.http_client import HttpClient
+from src.metrics import span
 from src.paths import data_dir
 from src.utils import clean_banner_url, parse_feed_datetime
 
@@ -13,8 +16,27 @@ from .event_page_scraper import EventPageScraper
 
 EVENTS_FEED_URL = "https://leekduck.com/feeds/events.json"
 
+EVENT_LINKS = Selector(
+    "a.event-item-link", f"descendant::a[{has_class('event-item-link')}]"
+)
+EVENT_TITLE = Selector(
+    "div.event-text h2", f"descendant::h2[ancestor::div[{has_class('event-text')}]]"
+)
+EVENT_IMAGE = Selector(
+    ".event-img-wrapper img",
+    f"descendant::img[ancestor::*[{has_class('event-img-wrapper')}]]",
+)
+EVENT_CATEGORY = Selector(
+    ".event-item-wrapper > p",
+    f"descendant::p[parent::*[{has_class('event-item-wrapper')}]]",
+)
+
 
 class EventScraper(BaseScraper):
+    # The output also depends on the events feed and every event page, so an
+    # unchanged listing alone never means events.json is current.
+    reuses_unchanged_output = False
+
     def __init__(
         self,
         url: str,
@@ -23,14 +45,17 @@ class EventScraper(BaseScraper):
         check_existing_events: bool = False,
         github_user: str | None = None,
         github_repo: str | None = None,
+        http_client: HttpClient | None = None,
+        incremental: bool = False,
     ):
-        super().__init__(url, file_name, scraper_settings)
+        super().__init__(url, file_name, scraper_settings, http_client)
         self.check_existing_events = check_existing_events
+        self.incremental = incremental
         self.github_user = github_user
         self.github_repo = github_repo
         self.existing_event_urls: set[str] = set()
         self.existing_events_data: dict[str, list[dict[str, Any]]] = {}
-        if self.check_existing_events:
+        if self.check_existing_events or self.incremental:
             self._fetch_existing_events()
         self.event_dates_feed = self._fetch_event_dates_feed()
 
@@ -38,9 +63,14 @@ class EventScraper(BaseScraper):
         """Fetches leekduck.com's official events feed for authoritative start/end times."""
         try:
             timeout = self.scraper_settings.get("timeout", 15)
-            response = requests.get(EVENTS_FEED_URL, timeout=timeout)
+            with span("EventScraper.events_feed") as stage:
+                response = self.http.get(EVENTS_FEED_URL, timeout=timeout)
+                stage.add_bytes(len(response.content))
             response.raise_for_status()
             feed = response.json()
+            self.http.html_store.put(
+                EVENTS_FEED_URL, response.content, response.encoding
+            )
             return {
                 entry["eventID"]: {
                     "start": entry.get("start"),
@@ -91,7 +121,9 @@ class EventScraper(BaseScraper):
         data_url = f"https://raw.githubusercontent.com/{self.github_user}/{self.github_repo}/data/events.json"
         try:
             timeout = self.scraper_settings.get("timeout", 15)
-            response = requests.get(data_url, timeout=timeout)
+            with span("EventScraper.existing_events") as stage:
+                response = self.http.get(data_url, timeout=timeout)
+                stage.add_bytes(len(response.content))
             response.raise_for_status()
             data = response.json()
             self._set_existing_events(data)
@@ -110,43 +142,127 @@ class EventScraper(BaseScraper):
                 self.existing_event_urls.add(event["article_url"])
         print(f"Found {len(self.existing_event_urls)} existing events.", flush=True)
 
-    def parse(self, soup: BeautifulSoup) -> dict[str, list[dict[str, Any]]]:
+    def _card_is_unchanged(
+        self, card: dict[str, Any], previous: dict[str, Any]
+    ) -> bool:
+        """Whether a listing card and its feed dates match the previous record."""
+        for key in ("title", "banner_url", "category"):
+            if card[key] != previous.get(key):
+                return False
+        previous_id = str(previous.get("article_url", "")).strip("/").rsplit("/", 1)
+        if card["event_id"] != previous_id[-1]:
+            return False
+
+        feed_entry = self.event_dates_feed.get(card["event_id"]) or {}
+        for feed_key, time_key in (("start", "start_time"), ("end", "end_time")):
+            feed_time = parse_feed_datetime(feed_entry.get(feed_key))
+            if feed_time is not None and feed_time != previous.get(time_key):
+                return False
+        return True
+
+    def _carry_forward_unchanged(
+        self, all_events_data: dict[str, dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """Replaces unchanged cards with their previous records.
+
+        Returns the new or changed events, which still need their pages scraped.
+        """
+        previous_events = {
+            event["article_url"]: event
+            for events in self.existing_events_data.values()
+            for event in events
+        }
+        to_scrape = []
+        for article_url, card in all_events_data.items():
+            previous = previous_events.get(article_url)
+            if previous is not None and self._card_is_unchanged(card, previous):
+                all_events_data[article_url] = dict(previous)
+            else:
+                to_scrape.append(card)
+
+        carried = len(all_events_data) - len(to_scrape)
+        print(
+            f"Incremental run: {len(to_scrape)} new or changed event(s), "
+            f"{carried} carried forward unchanged",
+            flush=True,
+        )
+        return to_scrape
+
+    def _scrape_event_pages(self, events: list[dict[str, Any]]) -> None:
+        """Scrapes event pages on a bounded worker pool, merging results in order.
+
+        Results are applied in listing order regardless of completion order, and
+        the first failure cancels the pages that have not started yet.
+        """
+        page_scraper = EventPageScraper(self.scraper_settings, self.http)
+        max_workers = max(1, self.scraper_settings.get("max_workers", 1))
+        total_events = len(events)
+
+        def scrape(idx: int, event: dict[str, Any]) -> dict[str, Any]:
+            print(
+                f"Processing event {idx}/{total_events}: {event['title']}", flush=True
+            )
+            return page_scraper.scrape(event["article_url"])
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(scrape, idx, event)
+                for idx, event in enumerate(events, 1)
+            ]
+            try:
+                for event, future in zip(events, futures, strict=True):
+                    result = future.result()
+                    if result and result.get("article_url") == event["article_url"]:
+                        event.update(result)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    def parse(self, soup: Node) -> dict[str, list[dict[str, Any]]]:
+        dom = self.dom
         events_to_scrape: list[dict[str, Any]] = []
-        event_links = soup.select("a.event-item-link")
+        event_links = dom.select(soup, EVENT_LINKS)
         print(f"Found {len(event_links)} event links", flush=True)
 
         for link in event_links:
-            link = cast(Tag, link)
-            href = link.get("href")
+            href = dom.attr(link, "href")
             if not href:
                 continue
 
-            title_element = link.select_one("div.event-text h2")
-            if not title_element:
+            title_element = dom.select_one(link, EVENT_TITLE)
+            if title_element is None:
                 continue
 
-            image_element = link.select_one(".event-img-wrapper img")
-            category_element = link.select_one(".event-item-wrapper > p")
+            image_element = dom.select_one(link, EVENT_IMAGE)
+            category_element = dom.select_one(link, EVENT_CATEGORY)
 
             article_url = urljoin(self.url, str(href))
 
-            if self.check_existing_events and article_url in self.existing_event_urls:
+            if (
+                self.check_existing_events
+                and not self.incremental
+                and article_url in self.existing_event_urls
+            ):
                 continue
 
             banner_url = None
-            if isinstance(image_element, Tag) and image_element.has_attr("src"):
-                banner_url = clean_banner_url(str(image_element["src"]).strip())
+            image_src = (
+                dom.attr(image_element, "src") if image_element is not None else None
+            )
+            if image_src is not None:
+                banner_url = clean_banner_url(image_src.strip())
 
             event_id = str(href).strip("/").rsplit("/", 1)[-1]
 
             events_to_scrape.append(
                 {
-                    "title": title_element.get_text(strip=True),
+                    "title": dom.text(title_element),
                     "article_url": article_url,
                     "banner_url": banner_url,
                     "category": (
-                        category_element.get_text(strip=True)
-                        if category_element
+                        dom.text(category_element)
+                        if category_element is not None
                         else "Event"
                     ),
                     "event_id": event_id,
@@ -157,17 +273,12 @@ class EventScraper(BaseScraper):
             event["article_url"]: event for event in events_to_scrape
         }
 
-        if events_to_scrape:
-            page_scraper = EventPageScraper(self.scraper_settings)
-            total_events = len(events_to_scrape)
-            for idx, event in enumerate(events_to_scrape, 1):
-                print(
-                    f"Processing event {idx}/{total_events}: {event['title']}",
-                    flush=True,
-                )
-                result = page_scraper.scrape(event["article_url"])
-                if result and result.get("article_url") in all_events_data:
-                    all_events_data[result["article_url"]].update(result)
+        if self.incremental:
+            to_scrape = self._carry_forward_unchanged(all_events_data)
+        else:
+            to_scrape = list(all_events_data.values())
+        if to_scrape:
+            self._scrape_event_pages(to_scrape)
 
         self._apply_feed_dates(all_events_data)
         new_events_by_category: dict[str, list[dict[str, Any]]] = {}
@@ -177,6 +288,11 @@ class EventScraper(BaseScraper):
                 new_events_by_category[category] = []
             new_events_by_category[category].append(event)
 
+        # The listing is complete in incremental mode; previous records it no
+        # longer shows are dropped rather than merged back in.
+        if self.incremental:
+            return new_events_by_category
+
         merged_events = {
             category: list(events)
             for category, events in self.existing_events_data.items()
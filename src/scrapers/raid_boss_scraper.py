@@ -1,71 +1,111 @@
 import re
-from typing import Any, cast
-
-from bs4 import BeautifulSoup, Tag
+from functools import partial
+from typing import Any
 
+from src.dom import DomBackend, Node, Selector, has_class
+from src.http_client import HttpClient
 from src.utils import parse_cp_range, parse_pokemon_list
 
 from .base_scraper import BaseScraper
 
+TIER_SECTIONS = Selector(
+    ".raid-bosses .tier, .shadow-raid-bosses .tier",
+    f"descendant::*[{has_class('tier')}][ancestor::*[{has_class('raid-bosses')}"
+    f" or {has_class('shadow-raid-bosses')}]]",
+)
+TIER_HEADER = Selector("h2.header", f"descendant::h2[{has_class('header')}]")
+CARD_NAME = Selector("p.name", f"descendant::p[{has_class('name')}]")
+CP_RANGE = Selector("div.cp-range", f"descendant::div[{has_class('cp-range')}]")
+BOOSTED_CP = Selector(
+    "div.boosted-cp-row", f"descendant::div[{has_class('boosted-cp-row')}]"
+)
+TYPE_IMAGES = Selector(
+    ".boss-type .type img",
+    f"descendant::img[ancestor::*[{has_class('type')}"
+    f" and ancestor::*[{has_class('boss-type')}]]]",
+)
+
+
+# What ``boss_details`` reads from a card, as opposed to the Pokémon fields.
+BOSS_DETAILS = ("tier", "cp_range", "boosted_cp_range", "types")
+
+
+def boss_details(card: Node, dom: DomBackend, tier: Any) -> dict[str, Any]:
+    """Reads the tier, CP ranges and types shown on a raid boss card.
+
+    The card's ``p.name`` text comes back as ``card_name``: the details belong
+    to the boss with that name, which is not necessarily the card's
+    ``data-pokemon``.
+    """
+    name_element = dom.select_one(card, CARD_NAME)
+    if (
+        dom.tag(card) != "div"
+        or "card" not in dom.classes(card)
+        or name_element is None
+    ):
+        return {}
+
+    cp_range_element = dom.select_one(card, CP_RANGE)
+    cp_range_str = dom.text(cp_range_element) if cp_range_element is not None else ""
+
+    boosted_cp_element = dom.select_one(card, BOOSTED_CP)
+    boosted_cp_str = (
+        dom.text(boosted_cp_element) if boosted_cp_element is not None else ""
+    )
+
+    types = [
+        title
+        for t in dom.select(card, TYPE_IMAGES)
+        if (title := dom.attr(t, "title")) is not None
+    ]
+
+    return {
+        "card_name": dom.text(name_element),
+        "tier": tier,
+        "cp_range": parse_cp_range(cp_range_str),
+        "boosted_cp_range": parse_cp_range(boosted_cp_str),
+        "types": types,
+    }
 
-class RaidBossScraper(BaseScraper):
-    def __init__(self, url: str, file_name: str, scraper_settings: dict[str, Any]):
-        super().__init__(url, file_name, scraper_settings)
 
-    def parse(self, soup: BeautifulSoup) -> dict[str, Any]:
+class RaidBossScraper(BaseScraper):
+    def __init__(
+        self,
+        url: str,
+        file_name: str,
+        scraper_settings: dict[str, Any],
+        http_client: HttpClient | None = None,
+    ):
+        super().__init__(url, file_name, scraper_settings, http_client)
+
+    def parse(self, soup: Node) -> dict[str, Any]:
+        dom = self.dom
         raid_data: dict[str, Any] = {}
-        tier_sections = soup.select(".raid-bosses .tier, .shadow-raid-bosses .tier")
+        tier_sections = dom.select(soup, TIER_SECTIONS)
 
         for section in tier_sections:
-            section = cast(Tag, section)
-            header_element = section.find("h2", class_="header")
-            if not header_element:
+            header_element = dom.select_one(section, TIER_HEADER)
+            if header_element is None:
                 continue
 
-            tier_name = header_element.get_text(strip=True)
+            tier_name = dom.text(header_element)
             tier_match = re.search(r"\d+", tier_name)
             tier_value: Any = int(tier_match.group(0)) if tier_match else tier_name
 
-            # name/shiny_available/asset_url come from the shared helper; tier/CP/type
-            # info is raid-specific and merged in by matching on name below.
-            pokemon_by_name = {p["name"]: p for p in parse_pokemon_list(section)}
-
-            for card in section.find_all("div", class_="card"):
-                card = cast(Tag, card)
-                name_element = card.find("p", class_="name")
-                if not name_element:
-                    continue
-
-                boss_info = pokemon_by_name.get(name_element.get_text(strip=True))
-                if boss_info is None:
-                    continue
-
-                cp_range_element = card.find("div", class_="cp-range")
-                cp_range_str = (
-                    cp_range_element.get_text(strip=True) if cp_range_element else ""
-                )
-
-                boosted_cp_element = card.find("div", class_="boosted-cp-row")
-                boosted_cp_str = (
-                    boosted_cp_element.get_text(strip=True)
-                    if boosted_cp_element
-                    else ""
-                )
-
-                types = [
-                    cast(Tag, t)["title"]
-                    for t in card.select(".boss-type .type img")
-                    if cast(Tag, t).has_attr("title")
-                ]
-
-                boss_info.update(
-                    {
-                        "tier": tier_value,
-                        "cp_range": parse_cp_range(cp_range_str),
-                        "boosted_cp_range": parse_cp_range(boosted_cp_str),
-                        "types": types,
-                    }
-                )
+            # Each card is read once; bosses listed twice keep their last card.
+            # Details are re-keyed by the name shown on their card.
+            bosses = parse_pokemon_list(
+                section, dom, [partial(boss_details, tier=tier_value)]
+            )
+            details_by_name: dict[str, dict[str, Any]] = {}
+            for boss in bosses:
+                card_name = boss.pop("card_name", None)
+                details = {key: boss.pop(key) for key in BOSS_DETAILS if key in boss}
+                if card_name is not None:
+                    details_by_name[card_name] = details
+            pokemon_by_name = {p["name"]: p for p in bosses}
+            for name, pokemon in pokemon_by_name.items():
+                pokemon.update(details_by_name.get(name, {}))
 
             raid_data[tier_name] = list(pokemon_by_name.values())
 
@@ -1,72 +1,94 @@
 import re
-from typing import Any, cast
-
-from bs4 import BeautifulSoup, Tag
+from typing import Any
 
+from src.dom import Node, Selector, has_class
+from src.http_client import HttpClient
 from src.utils import parse_cp_range
 
 from .base_scraper import BaseScraper
 
+TASK_CATEGORIES = Selector(
+    "div.task-category", f"descendant::div[{has_class('task-category')}]"
+)
+CATEGORY_TITLE = Selector("h2", "descendant::h2")
+TASK_ITEMS = Selector("li.task-item", f"descendant::li[{has_class('task-item')}]")
+TASK_TEXT = Selector("span.task-text", f"descendant::span[{has_class('task-text')}]")
+REWARDS = Selector(
+    "ul.reward-list > li.reward",
+    f"descendant::li[{has_class('reward')}][parent::ul[{has_class('reward-list')}]]",
+)
+REWARD_LABEL = Selector(
+    "span.reward-label", f"descendant::span[{has_class('reward-label')}]"
+)
+REWARD_IMAGE = Selector(
+    "img.reward-image", f"descendant::img[{has_class('reward-image')}]"
+)
+SHINY_ICON = Selector("img.shiny-icon", f"descendant::img[{has_class('shiny-icon')}]")
+CP_VALUES = Selector("span.cp-values", f"descendant::span[{has_class('cp-values')}]")
+QUANTITY = Selector("div.quantity", f"descendant::div[{has_class('quantity')}]")
 
-class ResearchScraper(BaseScraper):
-    def __init__(self, url: str, file_name: str, scraper_settings: dict[str, Any]):
-        super().__init__(url, file_name, scraper_settings)
 
-    def parse(self, soup: BeautifulSoup) -> dict[str, Any]:
+class ResearchScraper(BaseScraper):
+    def __init__(
+        self,
+        url: str,
+        file_name: str,
+        scraper_settings: dict[str, Any],
+        http_client: HttpClient | None = None,
+    ):
+        super().__init__(url, file_name, scraper_settings, http_client)
+
+    def parse(self, soup: Node) -> dict[str, Any]:
+        dom = self.dom
         research_data: dict[str, Any] = {}
-        task_categories = soup.find_all("div", class_="task-category")
+        task_categories = dom.select(soup, TASK_CATEGORIES)
 
         for category in task_categories:
-            category = cast(Tag, category)
-            category_title_element = category.find("h2")
-            if not category_title_element:
+            category_title_element = dom.select_one(category, CATEGORY_TITLE)
+            if category_title_element is None:
                 continue
 
-            category_title = category_title_element.get_text(strip=True)
+            category_title = dom.text(category_title_element)
             research_data[category_title] = []
 
-            task_items = category.find_all("li", class_="task-item")
+            task_items = dom.select(category, TASK_ITEMS)
 
             for item in task_items:
-                item = cast(Tag, item)
-                task_text_element = item.find("span", class_="task-text")
-                if not task_text_element:
+                task_text_element = dom.select_one(item, TASK_TEXT)
+                if task_text_element is None:
                     continue
 
-                task_description = task_text_element.get_text(strip=True)
+                task_description = dom.text(task_text_element)
                 rewards_list: list[dict[str, Any]] = []
 
-                reward_elements = item.select("ul.reward-list > li.reward")
+                reward_elements = dom.select(item, REWARDS)
 
                 for reward_element in reward_elements:
-                    reward_element = cast(Tag, reward_element)
-                    reward_type = reward_element.get("data-reward-type", "unknown")
-                    reward_label_element = reward_element.find(
-                        "span", class_="reward-label"
-                    )
-                    image_element = reward_element.find("img", class_="reward-image")
+                    reward_type = dom.attr(reward_element, "data-reward-type")
+                    if reward_type is None:
+                        reward_type = "unknown"
+                    reward_label_element = dom.select_one(reward_element, REWARD_LABEL)
+                    image_element = dom.select_one(reward_element, REWARD_IMAGE)
 
-                    if not reward_label_element:
+                    if reward_label_element is None:
                         continue
 
                     asset_url = (
-                        image_element.get("src")
-                        if isinstance(image_element, Tag)
+                        dom.attr(image_element, "src")
+                        if image_element is not None
                         else None
                     )
-                    label_text = reward_label_element.get_text(strip=True)
+                    label_text = dom.text(reward_label_element)
 
                     if reward_type == "encounter":
                         is_shiny = (
-                            reward_element.find("img", class_="shiny-icon") is not None
-                        )
-                        cp_values_element = reward_element.find(
-                            "span", class_="cp-values"
+                            dom.select_one(reward_element, SHINY_ICON) is not None
                         )
+                        cp_values_element = dom.select_one(reward_element, CP_VALUES)
 
                         cp_text = (
-                            cp_values_element.get_text(strip=True)
-                            if cp_values_element
+                            dom.text(cp_values_element)
+                            if cp_values_element is not None
                             else ""
                         )
                         cp_range = parse_cp_range(cp_text)
@@ -81,10 +103,10 @@ class ResearchScraper(BaseScraper):
                             }
                         )
                     else:
-                        quantity_element = reward_element.find("div", class_="quantity")
+                        quantity_element = dom.select_one(reward_element, QUANTITY)
                         quantity = (
-                            quantity_element.get_text(strip=True).replace("×", "")
-                            if quantity_element
+                            dom.text(quantity_element).replace("×", "")
+                            if quantity_element is not None
                             else "1"
                         )
 
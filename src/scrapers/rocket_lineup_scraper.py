@@ -1,37 +1,50 @@
-from typing import Any, cast
-
-from bs4 import BeautifulSoup, Tag
+from typing import Any
 
+from src.dom import Node, Selector, has_class
+from src.http_client import HttpClient
 from src.utils import parse_pokemon_list
 
 from .base_scraper import BaseScraper
 
+ROCKET_PROFILES = Selector(
+    "div.rocket-profile", f"descendant::div[{has_class('rocket-profile')}]"
+)
+LEADER_NAME = Selector("div.name", f"descendant::div[{has_class('name')}]")
+LINEUP_SLOTS = Selector(
+    ".lineup-info .slot",
+    f"descendant::*[{has_class('slot')}][ancestor::*[{has_class('lineup-info')}]]",
+)
 
-class RocketLineupScraper(BaseScraper):
-    def __init__(self, url: str, file_name: str, scraper_settings: dict[str, Any]):
-        super().__init__(url, file_name, scraper_settings)
 
-    def parse(self, soup: BeautifulSoup) -> dict[str, Any]:
+class RocketLineupScraper(BaseScraper):
+    def __init__(
+        self,
+        url: str,
+        file_name: str,
+        scraper_settings: dict[str, Any],
+        http_client: HttpClient | None = None,
+    ):
+        super().__init__(url, file_name, scraper_settings, http_client)
+
+    def parse(self, soup: Node) -> dict[str, Any]:
+        dom = self.dom
         lineups: dict[str, Any] = {}
-        rocket_profiles = soup.find_all("div", class_="rocket-profile")
+        rocket_profiles = dom.select(soup, ROCKET_PROFILES)
 
         for profile in rocket_profiles:
-            profile = cast(Tag, profile)
-            name_element = profile.find("div", class_="name")
-            if not name_element:
+            name_element = dom.select_one(profile, LEADER_NAME)
+            if name_element is None:
                 continue
 
-            leader_name = name_element.get_text(strip=True)
+            leader_name = dom.text(name_element)
             lineups[leader_name] = []
 
-            slots = profile.select(".lineup-info .slot")
+            slots = dom.select(profile, LINEUP_SLOTS)
             for i, slot in enumerate(slots, 1):
-                slot = cast(Tag, slot)
-                pokemon_in_slot = parse_pokemon_list(slot)
+                pokemon_in_slot = parse_pokemon_list(slot, dom)
 
                 if pokemon_in_slot:
-                    classes = slot.get("class")
-                    is_encounter_slot = classes is not None and "encounter" in classes
+                    is_encounter_slot = "encounter" in dom.classes(slot)
                     lineups[leader_name].append(
                         {
                             "slot": i,
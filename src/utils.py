@@ -1,47 +1,242 @@
+import gzip
+import hashlib
 import json
-import os
 import re
-from datetime import datetime
+import threading
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from functools import cache
 from pathlib import Path
 from tempfile import NamedTemporaryFile
-from typing import Any
+from typing import IO, Any
 
-from bs4.element import Tag
+from src.dom import DomBackend, Node, Selector, get_backend, has_class
+from src.metrics import metrics, span
+from src.paths import data_dir, metrics_path
+from src.validation import count_records
 
+try:
+    import orjson
+except ImportError:  # Optional: compact output falls back to the stdlib encoder.
+    orjson = None
 
-def save_html(content: str, path: str | Path) -> None:
-    """Utility function to save HTML content to a specified path."""
-    if not os.getenv("CI"):
-        output_path = Path(path)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with output_path.open("w", encoding="utf-8") as f:
-            f.write(content)
-        print(f"Saved raw HTML to {output_path}")
+JSON_FORMATS = ("pretty", "compact")
 
+# How write_output_json serializes published outputs; see configure_json_output.
+_output_settings: dict[str, Any] = {"format": "pretty", "gzip_sidecars": False}
 
-def write_json_atomic(path: str | Path, data: Any) -> None:
-    """Write JSON atomically so interrupted runs cannot leave truncated files."""
-    output_path = Path(path)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+# Lists every published output in the data directory; see write_output_json.
+MANIFEST_NAME = "manifest.json"
+_manifest_lock = threading.Lock()
+# Each data directory's manifest as it was before the run first wrote to it.
+_run_start_manifests: dict[Path, dict[str, dict[str, Any]]] = {}
+
+
+def write_text_atomic(path: str | Path, content: str) -> None:
+    """Write text atomically, so readers only ever see a complete file."""
+    with atomic_writer(Path(path)) as f:
+        f.write(content)
+
+
+def write_bytes_atomic(path: str | Path, content: bytes) -> None:
+    """Write bytes atomically, so readers only ever see a complete file."""
+    with atomic_writer(Path(path), binary=True) as f:
+        f.write(content)
+
+
+@contextmanager
+def atomic_writer(path: Path, binary: bool = False) -> Iterator[IO[Any]]:
+    """Yield a temporary file that replaces ``path`` only once fully written."""
+    path.parent.mkdir(parents=True, exist_ok=True)
     temporary_path: Path | None = None
     try:
         with NamedTemporaryFile(
-            "w",
-            encoding="utf-8",
-            dir=output_path.parent,
-            prefix=f".{output_path.name}.",
+            "wb" if binary else "w",
+            encoding=None if binary else "utf-8",
+            dir=path.parent,
+            prefix=f".{path.name}.",
             suffix=".tmp",
             delete=False,
         ) as temporary_file:
             temporary_path = Path(temporary_file.name)
-            json.dump(data, temporary_file, ensure_ascii=False, indent=4)
-            temporary_file.write("\n")
-        temporary_path.replace(output_path)
+            yield temporary_file
+        temporary_path.replace(path)
     finally:
         if temporary_path is not None and temporary_path.exists():
             temporary_path.unlink()
 
 
+def encode_json(data: Any, compact: bool = False) -> bytes:
+    """Serialize JSON as UTF-8, indented by default or with no whitespace.
+
+    Compact output uses orjson when it is installed. It writes the same bytes
+    as the stdlib encoder for the strings, integers, booleans and nulls the
+    scrapers produce, but not for everything: floats may be formatted
+    differently, NaN and Infinity become null instead of bare tokens, and
+    integers wider than 64 bits raise instead of being written.
+    """
+    if not compact:
+        return (json.dumps(data, ensure_ascii=False, indent=4) + "\n").encode("utf-8")
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS) + b"\n"
+    text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return (text + "\n").encode("utf-8")
+
+
+def write_json_atomic(
+    path: str | Path, data: Any, compact: bool = False, gzip_sidecar: bool = False
+) -> None:
+    """Write JSON atomically so interrupted runs cannot leave truncated files.
+
+    With ``gzip_sidecar``, a compressed copy is written to ``<path>.gz`` too.
+    It is byte-identical for identical data, so unchanged outputs do not churn.
+    """
+    _write_encoded_json(Path(path), encode_json(data, compact), gzip_sidecar)
+
+
+def _write_encoded_json(path: Path, body: bytes, gzip_sidecar: bool) -> None:
+    with span("write_json") as stage:
+        write_bytes_atomic(path, body)
+        stage.add_bytes(len(body))
+        if gzip_sidecar:
+            compressed = gzip.compress(body, mtime=0)
+            write_bytes_atomic(_sidecar(path), compressed)
+            stage.add_bytes(len(compressed))
+
+
+def _sidecar(path: Path) -> Path:
+    return path.with_name(f"{path.name}.gz")
+
+
+def configure_json_output(settings: dict[str, Any] | None = None) -> None:
+    """Set how ``write_output_json`` writes published outputs.
+
+    ``format`` is ``pretty`` (indented, the default) or ``compact``;
+    ``gzip_sidecars`` adds a ``.json.gz`` copy of every output. Called at
+    the start of every run, which also starts a new run for ``last_changed``.
+    """
+    _run_start_manifests.clear()
+    settings = settings or {}
+    json_format = settings.get("format", "pretty")
+    if json_format not in JSON_FORMATS:
+        raise ValueError(f"Unknown output format: {json_format}")
+    _output_settings["format"] = json_format
+    _output_settings["gzip_sidecars"] = bool(settings.get("gzip_sidecars", False))
+
+
+def load_manifest(directory: Path) -> dict[str, dict[str, Any]]:
+    """Return the output manifest of ``directory``, empty if missing or corrupt."""
+    try:
+        manifest = json.loads((directory / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def write_output_json(path: str | Path, data: Any) -> bool:
+    """Write a published output in the configured format, unless unchanged.
+
+    Outputs in the data directory are listed in its ``manifest.json`` with a
+    canonical digest of their data, their size, their record count and when
+    they last changed. An output whose digest and size match its entry, and
+    whose files are all present, is left untouched. With ``gzip_sidecars``
+    off, any ``.json.gz`` copy is removed. Returns whether the output was
+    written.
+
+    An output written more than once in a run, like ``events.json`` (pruned
+    by the archiver, then rebuilt by the event scraper), only counts as
+    changed if its last write differs from what the run started with.
+    """
+    path = Path(path).resolve()
+    body = encode_json(data, _output_settings["format"] == "compact")
+    gzip_sidecar = _output_settings["gzip_sidecars"]
+    if not gzip_sidecar:
+        # A copy left from when sidecars were on would no longer match.
+        _sidecar(path).unlink(missing_ok=True)
+    root = data_dir()
+    if not path.is_relative_to(root):
+        _write_encoded_json(path, body, gzip_sidecar)
+        return True
+
+    key = path.relative_to(root).as_posix()
+    digest = json_digest(data)
+    with _manifest_lock:
+        manifest = load_manifest(root)
+        run_start = _run_start_manifests.setdefault(root, dict(manifest))
+        entry = manifest.get(key)
+        if (
+            isinstance(entry, dict)
+            and entry.get("digest") == digest
+            and entry.get("size") == len(body)
+            and path.exists()
+            and (not gzip_sidecar or _sidecar(path).exists())
+        ):
+            metrics.count("output_writes_total", result="unchanged")
+            return False
+
+        _write_encoded_json(path, body, gzip_sidecar)
+        metrics.count("output_writes_total", result="written")
+        unchanged = [
+            previous["last_changed"]
+            for previous in (entry, run_start.get(key))
+            if isinstance(previous, dict)
+            and previous.get("digest") == digest
+            and "last_changed" in previous
+        ]
+        manifest[key] = {
+            "digest": digest,
+            "size": len(body),
+            "records": count_records(data),
+            "last_changed": unchanged[0]
+            if unchanged
+            else datetime.now(UTC).isoformat(timespec="seconds"),
+        }
+        write_json_atomic(root / MANIFEST_NAME, dict(sorted(manifest.items())))
+    return True
+
+
+def save_run_metrics() -> None:
+    """Write the run's per-stage timings to run_metrics.json, if kept."""
+    path = metrics_path()
+    if path is None:
+        return
+    write_json_atomic(path, metrics.snapshot())
+    print(f"Run metrics saved to {path}", flush=True)
+
+
+# Markup that changes between otherwise identical responses and is never read
+# by a parser: comments (render timestamps), script bodies, CSP nonces and ad
+# slots.
+VOLATILE_MARKUP = re.compile(
+    rb"<!--.*?-->|<script\b.*?</script>|<ins\b.*?</ins>|\snonce=\"[^\"]*\"",
+    re.DOTALL | re.IGNORECASE,
+)
+
+
+def content_digest(body: bytes, extra_patterns: Iterable[str] = ()) -> str:
+    """Return a SHA-256 of a page body with volatile markup stripped out."""
+    body = VOLATILE_MARKUP.sub(b"", body)
+    for pattern in extra_patterns:
+        body = re.sub(pattern.encode(), b"", body, flags=re.DOTALL)
+    return hashlib.sha256(body).hexdigest()
+
+
+def json_digest(value: Any) -> str:
+    """Return a short digest of an archive or event as published."""
+    encoded = json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+@cache
+def source_fingerprint(*paths: str | Path) -> str:
+    """Return a short digest of source files, used to tell parser versions apart."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()[:16]
+
+
 def parse_cp_range(cp_string: str) -> dict[str, int] | None:
     """
     A helper function to parse a CP range string (e.g., "2190 - 2280").
@@ -58,44 +253,80 @@ def parse_cp_range(cp_string: str) -> dict[str, int] | None:
     return None
 
 
-def parse_pokemon_list(container: Tag) -> list[dict[str, Any]]:
+POKEMON_CARDS = Selector(
+    ".pokemon-card, .shadow-pokemon, .card",
+    f"descendant::*[{has_class('pokemon-card')} or {has_class('shadow-pokemon')}"
+    f" or {has_class('card')}]",
+)
+SPAN_NAME = Selector("span.name", f"descendant::span[{has_class('name')}]")
+P_NAME = Selector("p.name", f"descendant::p[{has_class('name')}]")
+SHINY_SVG = Selector("svg.shiny-icon", f"descendant::svg[{has_class('shiny-icon')}]")
+POKEMON_IMAGE = Selector(
+    "img.pokemon-image, .icon img, .boss-img img",
+    f"descendant::img[{has_class('pokemon-image')}"
+    f" or ancestor::*[{has_class('icon')}] or ancestor::*[{has_class('boss-img')}]]",
+)
+
+
+# Reads scraper-specific fields from a card; returns the fields to add.
+CardExtractor = Callable[[Node, DomBackend], dict[str, Any]]
+
+
+def parse_pokemon_list(
+    container: Node,
+    dom: DomBackend | None = None,
+    extractors: Sequence[CardExtractor] = (),
+) -> list[dict[str, Any]]:
     """
     A generic helper to parse lists of Pokémon from a containing element.
     It intelligently finds the name, shiny status, and asset URL.
+
+    Each card is visited once. ``extractors`` add scraper-specific fields
+    (rarity, CP ranges, types, ...) read from the same card, in order.
     """
+    dom = dom or get_backend()
     pokemon_list = []
-    pokemon_elements = container.select(".pokemon-card, .shadow-pokemon, .card")
+    pokemon_elements = dom.select(container, POKEMON_CARDS)
 
     for p in pokemon_elements:
-        name_element = p.find("span", class_="name") or p.find("p", class_="name")
-        name = p.get("data-pokemon") or (
-            name_element.get_text(strip=True) if name_element else "Unknown"
-        )
+        name = dom.attr(p, "data-pokemon")
+        if not name:
+            name_element = dom.select_one(p, SPAN_NAME)
+            if name_element is None:
+                name_element = dom.select_one(p, P_NAME)
+            name = dom.text(name_element) if name_element is not None else "Unknown"
+
+        if name == "Unknown":
+            continue
 
-        is_shiny = p.find("svg", class_="shiny-icon") is not None
+        is_shiny = dom.select_one(p, SHINY_SVG) is not None
 
-        asset_url_element = p.select_one("img.pokemon-image, .icon img, .boss-img img")
+        asset_url_element = dom.select_one(p, POKEMON_IMAGE)
         asset_url = (
-            asset_url_element["src"]
-            if asset_url_element and asset_url_element.has_attr("src")
+            dom.attr(asset_url_element, "src")
+            if asset_url_element is not None
             else None
         )
 
-        if name != "Unknown":
-            pokemon_list.append(
-                {"name": name, "shiny_available": is_shiny, "asset_url": asset_url}
-            )
+        pokemon = {"name": name, "shiny_available": is_shiny, "asset_url": asset_url}
+        for extractor in extractors:
+            pokemon.update(extractor(p, dom))
+        pokemon_list.append(pokemon)
 
     return pokemon_list
 
 
 def process_time_data(
-    date_element: Tag | None, time_element: Tag | None, is_local: bool
+    date_element: Node | None,
+    time_element: Node | None,
+    is_local: bool,
+    dom: DomBackend | None = None,
 ) -> str | int | None:
+    dom = dom or get_backend()
     if is_local:
-        if date_element and time_element:
-            raw_date_str = date_element.get_text(strip=True)
-            raw_time_str = time_element.get_text(strip=True)
+        if date_element is not None and time_element is not None:
+            raw_date_str = dom.text(date_element)
+            raw_time_str = dom.text(time_element)
             date_str = re.sub(r"\s+", " ", raw_date_str).replace(",", "").strip()
             time_str = (
                 re.sub(r"\s+", " ", raw_time_str)
@@ -110,8 +341,12 @@ def process_time_data(
             except ValueError:
                 return None
     else:
-        if date_element and "data-event-page-date" in date_element.attrs:
-            iso_string = date_element["data-event-page-date"]
+        iso_string = (
+            dom.attr(date_element, "data-event-page-date")
+            if date_element is not None
+            else None
+        )
+        if iso_string is not None:
             try:
                 dt_object = datetime.fromisoformat(str(iso_string))
                 return int(dt_object.timestamp())
@@ -1,6 +1,8 @@
 from datetime import datetime
 from typing import Any
 
+from src.metrics import metrics
+
 
 class OutputValidationError(ValueError):
     """Raised when scraped data is unsafe to publish."""
@@ -11,12 +13,13 @@ def validate_scraper_output(file_name: str, data: Any) -> None:
 
     Event records must be complete, including a non-empty ``description``.
     """
-    _validate_sections(file_name, data, allow_empty=False)
+    with metrics.timer("validation_seconds", file=file_name):
+        _validate_sections(file_name, data, allow_empty=False)
 
-    if file_name != "events":
-        return
+        if file_name != "events":
+            return
 
-    _validate_event_records(file_name, data, require_description=True)
+        _validate_event_records(file_name, data, require_description=True)
 
 
 def validate_archive_output(
@@ -30,12 +33,22 @@ def validate_archive_output(
     current Pokémon object format. Every other field is validated as strictly as
     freshly scraped events.
     """
-    _validate_sections(file_name, data, allow_empty=allow_empty)
+    with metrics.timer("validation_seconds", file=file_name):
+        _validate_sections(file_name, data, allow_empty=allow_empty)
+
+        if allow_empty and not data:
+            return
+
+        _validate_event_records(file_name, data, require_description=False)
 
-    if allow_empty and not data:
-        return
 
-    _validate_event_records(file_name, data, require_description=False)
+def count_records(data: Any) -> int:
+    """Return the number of records in an output: list items or section entries."""
+    if isinstance(data, dict):
+        return sum(len(v) for v in data.values() if isinstance(v, list))
+    if isinstance(data, list):
+        return len(data)
+    return 0
 
 
 def _validate_sections(file_name: str, data: Any, allow_empty: bool) -> None:
@@ -1,12 +1,20 @@
 import json
 import tempfile
+import threading
 import unittest
+from datetime import UTC, datetime
 from pathlib import Path
-from unittest.mock import Mock, patch
+from unittest.mock import ANY, Mock, patch
 
 import requests
 
-from src.archiver import ArchiveFetchError, EventArchiver
+from src.archiver import (
+    ArchiveFetchError,
+    ArchiveIndex,
+    ArchiveLog,
+    EventArchiver,
+    compact_archives,
+)
 from src.validation import OutputValidationError
 
 
@@ -41,9 +49,15 @@ class EventArchiverTests(unittest.TestCase):
         response = Mock(spec=requests.Response)
         response.status_code = status_code
         response.json.return_value = data
+        response.content = json.dumps(data).encode()
         response.raise_for_status.return_value = None
         return response
 
+    def missing(self) -> Mock:
+        response = self.response({}, status_code=404)
+        response.raise_for_status.side_effect = requests.HTTPError(response=response)
+        return response
+
     def test_archive_fetch_failure_does_not_overwrite_existing_history(self) -> None:
         archive_path = self.archiver.archives_dir / "archive_1970.json"
         archive_path.parent.mkdir(parents=True)
@@ -61,10 +75,12 @@ class EventArchiverTests(unittest.TestCase):
             ]
         }
 
-        with patch(
-            "src.archiver.requests.get",
+        with patch.object(
+            self.archiver.http,
+            "get",
             side_effect=[
                 self.response(current_events),
+                self.missing(),
                 requests.ConnectionError("temporary outage"),
             ],
         ):
@@ -88,8 +104,8 @@ class EventArchiverTests(unittest.TestCase):
                 }
             ]
         }
-        with patch(
-            "src.archiver.requests.get", return_value=self.response(current_events)
+        with patch.object(
+            self.archiver.http, "get", return_value=self.response(current_events)
         ):
             self.archiver.run()
 
@@ -102,16 +118,14 @@ class EventArchiverTests(unittest.TestCase):
         self,
     ) -> None:
         current_events = {"Event": [archived_event()]}
-        missing_archive_response = self.response({}, status_code=404)
-        missing_archive_response.raise_for_status.side_effect = requests.HTTPError(
-            response=missing_archive_response
-        )
 
-        with patch(
-            "src.archiver.requests.get",
+        with patch.object(
+            self.archiver.http,
+            "get",
             side_effect=[
                 self.response(current_events),
-                missing_archive_response,
+                self.missing(),
+                self.missing(),
             ],
         ):
             self.archiver.run()
@@ -128,10 +142,12 @@ class EventArchiverTests(unittest.TestCase):
         published_archive = {"Event": [legacy_event]}
         current_events = {"Event": [archived_event()]}
 
-        with patch(
-            "src.archiver.requests.get",
+        with patch.object(
+            self.archiver.http,
+            "get",
             side_effect=[
                 self.response(current_events),
+                self.missing(),
                 self.response(published_archive),
             ],
         ):
@@ -149,10 +165,12 @@ class EventArchiverTests(unittest.TestCase):
         archive_path.write_text('{"Event": []}', encoding="utf-8")
         published_archive = {"Event": [archived_event(description=42)]}
 
-        with patch(
-            "src.archiver.requests.get",
+        with patch.object(
+            self.archiver.http,
+            "get",
             side_effect=[
                 self.response({"Event": [archived_event()]}),
+                self.missing(),
                 self.response(published_archive),
             ],
         ):
@@ -164,6 +182,164 @@ class EventArchiverTests(unittest.TestCase):
         )
         self.assertFalse(self.archiver.events_path.exists())
 
+    # Events ending in 1970 and 2001, so one run touches two archives.
+    two_year_events = {
+        "Event": [
+            archived_event(article_url="old"),
+            archived_event(article_url="newer", end_time=1_000_000_000),
+        ]
+    }
+
+    def routed_get(
+        self, archives: dict[int, object], barrier: threading.Barrier | None = None
+    ):
+        def get(url: str, **kwargs: object) -> Mock:
+            if url == self.archiver.events_url:
+                return self.response(self.two_year_events)
+            if url == self.archiver.index_url:
+                return self.missing()
+            if barrier is not None:
+                barrier.wait()
+            archive = archives[int(url.rsplit("_", 1)[1].removesuffix(".json"))]
+            if isinstance(archive, Exception):
+                raise archive
+            return self.response(archive)
+
+        return get
+
+    def test_year_archives_are_fetched_concurrently(self) -> None:
+        # Each fetch waits for the other, so this only finishes if both run at once.
+        barrier = threading.Barrier(2, timeout=5)
+        get = self.routed_get({1970: {}, 2001: {}}, barrier)
+
+        with patch.object(self.archiver.http, "get", side_effect=get):
+            self.archiver.run()
+
+        for year, url in ((1970, "old"), (2001, "newer")):
+            archive = self.archiver.archives_dir / f"archive_{year}.json"
+            self.assertEqual(
+                json.loads(archive.read_text(encoding="utf-8")),
+                {"Event": [archived_event(article_url=url, end_time=ANY)]},
+            )
+        self.assertEqual(
+            json.loads(self.archiver.events_path.read_text(encoding="utf-8")), {}
+        )
+
+    def test_one_failed_year_writes_no_archive_at_all(self) -> None:
+        get = self.routed_get(
+            {1970: {}, 2001: requests.ConnectionError("temporary outage")}
+        )
+
+        with patch.object(self.archiver.http, "get", side_effect=get):
+            with self.assertRaisesRegex(ArchiveFetchError, "2001"):
+                self.archiver.run()
+
+        self.assertFalse(self.archiver.archives_dir.exists())
+        self.assertFalse(self.archiver.events_path.exists())
+
+    def test_events_already_in_the_index_skip_their_archive(self) -> None:
+        ended = archived_event()
+        index = ArchiveIndex()
+        index.record(1970, {"Event": [ended]})
+
+        with patch.object(
+            self.archiver.http,
+            "get",
+            side_effect=[
+                self.response({"Event": [ended]}),
+                self.response(index.entries),
+            ],
+        ) as get:
+            self.archiver.run()
+
+        self.assertEqual(get.call_count, 2)
+        self.assertFalse(self.archiver.archives_dir.exists())
+        self.assertEqual(
+            json.loads(self.archiver.events_path.read_text(encoding="utf-8")), {}
+        )
+
+    def test_changed_events_are_updated_in_place_and_reindexed(self) -> None:
+        first = archived_event(article_url="first", title="Old title")
+        second = archived_event(article_url="second")
+        renamed = archived_event(article_url="first", title="New title")
+        index = ArchiveIndex()
+        index.record(1970, {"Event": [first, second]})
+
+        with patch.object(
+            self.archiver.http,
+            "get",
+            side_effect=[
+                self.response({"Event": [renamed]}),
+                self.response(index.entries),
+                self.response({"Event": [first, second]}),
+            ],
+        ):
+            self.archiver.run()
+
+        archive_path = self.archiver.archives_dir / "archive_1970.json"
+        self.assertEqual(
+            json.loads(archive_path.read_text(encoding="utf-8")),
+            {"Event": [renamed, second]},
+        )
+        written = ArchiveIndex.load(self.archiver.archives_dir / "index.json")
+        self.assertTrue(written.contains(1970, renamed))
+        self.assertTrue(written.contains(1970, second))
+        self.assertFalse(written.contains(1970, first))
+
+    def test_log_storage_appends_without_fetching_the_archive(self) -> None:
+        self.archiver.storage = "log"
+        ended = archived_event()
+
+        with patch.object(
+            self.archiver.http,
+            "get",
+            side_effect=[self.response({"Event": [ended]}), self.missing()],
+        ) as get:
+            self.archiver.run()
+
+        self.assertEqual(get.call_count, 2)
+        self.assertEqual(ArchiveLog(self.archiver.archives_dir).read(1970), [ended])
+        self.assertFalse((self.archiver.archives_dir / "archive_1970.json").exists())
+        index = ArchiveIndex.load(self.archiver.archives_dir / "index.json")
+        self.assertTrue(index.contains(1970, ended))
+
+    def test_compaction_folds_the_log_into_the_published_layout(self) -> None:
+        archives_dir = self.archiver.archives_dir
+        archives_dir.mkdir()
+        first = archived_event(article_url="first", title="Old title")
+        renamed = archived_event(article_url="first", title="New title")
+        added = archived_event(article_url="added", category="Season")
+        (archives_dir / "archive_1970.json").write_text(
+            json.dumps({"Event": [first]}), encoding="utf-8"
+        )
+        log = ArchiveLog(archives_dir)
+        log.append(1970, [renamed], datetime(2026, 9, 30, tzinfo=UTC))
+        segment = log.append(1970, [added], datetime(2026, 10, 1, tzinfo=UTC))
+        with segment.open("a", encoding="utf-8") as f:
+            f.write('{"title": "torn')
+
+        with patch("builtins.print"):
+            self.assertEqual(compact_archives(archives_dir), [1970])
+
+        self.assertEqual(
+            json.loads((archives_dir / "archive_1970.json").read_text("utf-8")),
+            {"Event": [renamed], "Season": [added]},
+        )
+        self.assertEqual(log.years(), [])
+        index = ArchiveIndex.load(archives_dir / "index.json")
+        self.assertTrue(index.contains(1970, renamed))
+        self.assertTrue(index.contains(1970, added))
+
+    def test_invalid_logged_events_are_never_compacted(self) -> None:
+        log = ArchiveLog(self.archiver.archives_dir)
+        log.append(1970, [archived_event(description=42)], datetime.now(UTC))
+
+        with self.assertRaises(OutputValidationError):
+            compact_archives(self.archiver.archives_dir)
+
+        self.assertFalse((self.archiver.archives_dir / "archive_1970.json").exists())
+        self.assertEqual(log.years(), [1970])
+
 
 if __name__ == "__main__":
     unittest.main()
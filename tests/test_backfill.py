@@ -1,10 +1,27 @@
+import argparse
+import asyncio
+import json
+import tempfile
+import threading
+import time
 import unittest
+from pathlib import Path
 from typing import Any
 from unittest.mock import Mock, patch
 
 import requests
 
-from src.backfill import ArchiveBackfiller, modernize_details, modernize_pokemon
+from src.archiver import ArchiveIndex
+from src.backfill import (
+    ArchiveBackfiller,
+    ArchiveBackfillError,
+    CheckpointJournal,
+    RateLimiter,
+    modernize_details,
+    modernize_pokemon,
+    parse_shard,
+    shard_of,
+)
 
 
 def archived_event(**overrides: Any) -> dict[str, Any]:
@@ -52,19 +69,25 @@ class ModernizeTests(unittest.TestCase):
 
 class ArchiveBackfillerTests(unittest.TestCase):
     def setUp(self) -> None:
-        self.backfiller = ArchiveBackfiller("owner", "repository", [2025], delay=0)
+        self.backfiller = ArchiveBackfiller(
+            "owner", "repository", [2025], requests_per_second=None
+        )
 
     @staticmethod
     def response(text: str = "", status_code: int = 200) -> Mock:
         response = Mock(spec=requests.Response)
         response.status_code = status_code
         response.text = text
+        response.content = text.encode()
+        response.encoding = "utf-8"
         response.raise_for_status.return_value = None
         return response
 
     def test_recovers_description_and_sprites_from_a_live_page(self) -> None:
         event = archived_event()
-        with patch("src.backfill.requests.get", return_value=self.response(EVENT_PAGE)):
+        with patch.object(
+            self.backfiller.http, "get", return_value=self.response(EVENT_PAGE)
+        ):
             rebuilt, outcome = self.backfiller._backfill_event(event)
 
         self.assertEqual(outcome, "description recovered")
@@ -74,7 +97,9 @@ class ArchiveBackfillerTests(unittest.TestCase):
 
     def test_preserves_archived_identity_and_times(self) -> None:
         event = archived_event()
-        with patch("src.backfill.requests.get", return_value=self.response(EVENT_PAGE)):
+        with patch.object(
+            self.backfiller.http, "get", return_value=self.response(EVENT_PAGE)
+        ):
             rebuilt, _ = self.backfiller._backfill_event(event)
 
         for key in ("title", "category", "article_url", "banner_url", "start_time"):
@@ -82,8 +107,8 @@ class ArchiveBackfillerTests(unittest.TestCase):
 
     def test_missing_page_keeps_the_snapshot_and_only_modernizes_it(self) -> None:
         event = archived_event()
-        with patch(
-            "src.backfill.requests.get", return_value=self.response(status_code=404)
+        with patch.object(
+            self.backfiller.http, "get", return_value=self.response(status_code=404)
         ):
             rebuilt, outcome = self.backfiller._backfill_event(event)
 
@@ -97,21 +122,304 @@ class ArchiveBackfillerTests(unittest.TestCase):
     def test_existing_description_survives_a_page_without_one(self) -> None:
         event = archived_event(description="Original description.")
         page = '<div class="page-content"><div class="header-page">Title</div></div>'
-        with patch("src.backfill.requests.get", return_value=self.response(page)):
+        with patch.object(
+            self.backfiller.http, "get", return_value=self.response(page)
+        ):
             rebuilt, _ = self.backfiller._backfill_event(event)
 
         self.assertEqual(rebuilt["description"], "Original description.")
 
     def test_network_failures_are_not_silently_swallowed(self) -> None:
-        from src.backfill import ArchiveBackfillError
-
-        with patch(
-            "src.backfill.requests.get",
+        with patch.object(
+            self.backfiller.http,
+            "get",
             side_effect=requests.ConnectionError("temporary outage"),
         ):
             with self.assertRaises(ArchiveBackfillError):
                 self.backfiller._backfill_event(archived_event())
 
 
+class ConcurrentBackfillTests(unittest.TestCase):
+    def setUp(self) -> None:
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.archives_dir = Path(temporary_directory.name) / "archives"
+        self.archives = {
+            year: {
+                "Event": [
+                    archived_event(
+                        title=f"Event {year}-{n}",
+                        article_url=f"https://example.invalid/events/{year}-{n}/",
+                    )
+                    for n in range(6)
+                ]
+            }
+            for year in (2024, 2025)
+        }
+        self.published_index = {
+            "https://example.invalid/events/2019-0/": {
+                "year": 2019,
+                "category": "Event",
+                "digest": "0" * 64,
+            }
+        }
+
+    def backfiller(self, **options: Any) -> ArchiveBackfiller:
+        backfiller = ArchiveBackfiller(
+            "owner", "repository", list(self.archives), **options
+        )
+        backfiller.archives_dir = self.archives_dir
+        backfiller.journal_dir = self.archives_dir.parent / "backfill"
+        backfiller.shards_dir = self.archives_dir.parent / "shards"
+        return backfiller
+
+    def fake_get(self, url: str, **kwargs: Any) -> Mock:
+        response = ArchiveBackfillerTests.response
+        if url.endswith("archives/index.json"):
+            published = response(json.dumps(self.published_index))
+            published.json.return_value = json.loads(json.dumps(self.published_index))
+            return published
+        for year, archive in self.archives.items():
+            if url.endswith(f"archive_{year}.json"):
+                published = response(json.dumps(archive))
+                published.json.return_value = json.loads(json.dumps(archive))
+                return published
+        if url.endswith("2025-3/"):
+            return response(status_code=404)
+        return response(EVENT_PAGE)
+
+    def test_rebuilds_every_year_in_order_with_per_year_summaries(self) -> None:
+        backfiller = self.backfiller(concurrency=4, requests_per_second=None)
+        with (
+            patch.object(backfiller.http, "get", side_effect=self.fake_get) as get,
+            patch("builtins.print") as printed,
+        ):
+            backfiller.run()
+
+        lines = [call.args[0] for call in printed.call_args_list]
+        self.assertIn("archive_2024: 6 description recovered", lines)
+        self.assertIn("archive_2025: 5 description recovered, 1 missing", lines)
+        for year in self.archives:
+            written = json.loads(
+                (self.archives_dir / f"archive_{year}.json").read_text("utf-8")
+            )
+            self.assertEqual(
+                [event["title"] for event in written["Event"]],
+                [f"Event {year}-{n}" for n in range(6)],
+            )
+            index = ArchiveIndex.load(self.archives_dir / "index.json")
+            for event in written["Event"]:
+                self.assertTrue(index.contains(year, event))
+        # Years that were not rebuilt keep their published entries.
+        for url, entry in self.published_index.items():
+            self.assertEqual(index.entries[url], entry)
+        index_fetches = [
+            call
+            for call in get.call_args_list
+            if call.args[0].endswith("archives/index.json")
+        ]
+        self.assertEqual(len(index_fetches), 1)
+
+    def test_dry_run_writes_nothing(self) -> None:
+        backfiller = self.backfiller(requests_per_second=None)
+        with (
+            patch.object(backfiller.http, "get", side_effect=self.fake_get),
+            patch("builtins.print"),
+        ):
+            backfiller.run(dry_run=True)
+        self.assertFalse(self.archives_dir.exists())
+
+    def test_never_exceeds_the_concurrency_cap(self) -> None:
+        backfiller = self.backfiller(concurrency=2, requests_per_second=None)
+        lock = threading.Lock()
+        in_flight = peak = 0
+
+        def slow_backfill(event: dict[str, Any]) -> tuple[dict[str, Any], str]:
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight -= 1
+            return event, "unchanged"
+
+        events = self.archives[2024]["Event"] + self.archives[2025]["Event"]
+        with patch.object(backfiller, "_backfill_event", side_effect=slow_backfill):
+            results = asyncio.run(backfiller._backfill_events(events))
+
+        self.assertEqual([event for event, _ in results], events)
+        self.assertEqual(peak, 2)
+
+    def test_a_failed_page_fails_the_run_without_writing(self) -> None:
+        backfiller = self.backfiller(requests_per_second=None)
+
+        def get(url: str, **kwargs: Any) -> Mock:
+            if url.endswith("2024-2/"):
+                raise requests.ConnectionError("temporary outage")
+            return self.fake_get(url, **kwargs)
+
+        with (
+            patch.object(backfiller.http, "get", side_effect=get),
+            patch("builtins.print"),
+            self.assertRaises(ArchiveBackfillError),
+        ):
+            backfiller.run()
+        self.assertFalse(self.archives_dir.exists())
+
+    def test_resume_only_rereads_events_an_interrupted_run_missed(self) -> None:
+        failing = True
+
+        def get(url: str, **kwargs: Any) -> Mock:
+            if failing and url.endswith("2024-4/"):
+                raise requests.ConnectionError("temporary outage")
+            return self.fake_get(url, **kwargs)
+
+        backfiller = self.backfiller(concurrency=1, requests_per_second=None)
+        with (
+            patch.object(backfiller.http, "get", side_effect=get),
+            patch("builtins.print"),
+            self.assertRaises(ArchiveBackfillError),
+        ):
+            backfiller.run()
+        journal = backfiller._journal(2024)
+        self.assertEqual(len(journal.load()), 4)
+
+        failing = False
+        with (
+            patch.object(backfiller.http, "get", side_effect=get) as fetched,
+            patch("builtins.print"),
+        ):
+            backfiller.run(resume=True)
+
+        page_urls = [
+            call.args[0]
+            for call in fetched.call_args_list
+            if "/events/" in call.args[0]
+        ]
+        self.assertEqual(len(page_urls), 12 - 4)
+        self.assertNotIn("https://example.invalid/events/2024-0/", page_urls)
+        self.assertFalse(journal.path.exists())
+        written = json.loads(
+            (self.archives_dir / "archive_2024.json").read_text("utf-8")
+        )
+        self.assertTrue(all("description" in event for event in written["Event"]))
+
+    def test_journal_ignores_torn_lines_and_changed_events(self) -> None:
+        journal = CheckpointJournal(self.archives_dir.parent / "journal.ndjson")
+        events = self.archives[2024]["Event"]
+        for event in events[:2]:
+            journal.record("Event", event, {**event, "description": "x"}, "updated")
+        with journal.path.open("a", encoding="utf-8") as f:
+            f.write('{"category": "Event", "article_u')
+
+        self.assertEqual(len(journal.load()), 2)
+
+        self.archives[2024]["Event"][0] = {**events[0], "title": "Renamed"}
+        backfiller = self.backfiller(requests_per_second=None)
+        with (
+            patch.object(backfiller, "_journal", return_value=journal),
+            patch.object(backfiller.http, "get", side_effect=self.fake_get) as fetched,
+            patch("builtins.print"),
+        ):
+            backfiller.run(dry_run=True, resume=True)
+
+        page_urls = {call.args[0] for call in fetched.call_args_list}
+        self.assertIn("https://example.invalid/events/2024-0/", page_urls)
+        self.assertNotIn("https://example.invalid/events/2024-1/", page_urls)
+
+    def test_shards_partition_events_and_merge_into_the_full_archive(self) -> None:
+        unsharded = self.backfiller(requests_per_second=None)
+        unsharded.archives_dir = self.archives_dir.parent / "unsharded"
+        with (
+            patch.object(unsharded.http, "get", side_effect=self.fake_get),
+            patch("builtins.print"),
+        ):
+            unsharded.run()
+
+        fetched_pages: list[str] = []
+        for index in range(3):
+            shard = self.backfiller(requests_per_second=None, shard=(index, 3))
+            with (
+                patch.object(shard.http, "get", side_effect=self.fake_get) as get,
+                patch("builtins.print"),
+            ):
+                shard.run()
+            fetched_pages += [
+                call.args[0]
+                for call in get.call_args_list
+                if "/events/" in call.args[0]
+            ]
+        self.assertEqual(len(fetched_pages), 12)
+        self.assertEqual(len(set(fetched_pages)), 12)
+        self.assertFalse(self.archives_dir.exists())
+
+        merger = self.backfiller()
+        with (
+            patch.object(merger.http, "get", side_effect=self.fake_get),
+            patch("builtins.print") as printed,
+        ):
+            merger.merge(3)
+
+        lines = [call.args[0] for call in printed.call_args_list]
+        self.assertIn("archive_2025: 5 description recovered, 1 missing", lines)
+        for year in self.archives:
+            name = f"archive_{year}.json"
+            self.assertEqual(
+                (self.archives_dir / name).read_text("utf-8"),
+                (unsharded.archives_dir / name).read_text("utf-8"),
+            )
+        self.assertEqual(list(merger.shards_dir.iterdir()), [])
+
+    def test_merge_refuses_incomplete_or_mismatched_shards(self) -> None:
+        for index in range(2):
+            shard = self.backfiller(requests_per_second=None, shard=(index, 2))
+            with (
+                patch.object(shard.http, "get", side_effect=self.fake_get),
+                patch("builtins.print"),
+            ):
+                shard.run()
+        merger = self.backfiller()
+
+        with self.assertRaisesRegex(ArchiveBackfillError, "missing"):
+            merger.merge(3)
+
+        partial_path = merger.shards_dir / "archive_2024.shard-1-of-2.json"
+        partial = json.loads(partial_path.read_text("utf-8"))
+        partial["source"] = "republished"
+        partial_path.write_text(json.dumps(partial), encoding="utf-8")
+        with (
+            self.assertRaisesRegex(ArchiveBackfillError, "different published"),
+            patch("builtins.print"),
+        ):
+            merger.merge(2)
+        self.assertFalse(self.archives_dir.exists())
+
+    def test_shard_assignment_is_stable_and_parsed_strictly(self) -> None:
+        url = "https://leekduck.com/events/community-day/"
+        # A digest of the URL, not hash(), so every process agrees.
+        self.assertEqual((shard_of(url, 4), shard_of(url, 7)), (0, 3))
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for value in ("4/4", "-1/4", "1", "a/b"):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                parse_shard(value)
+
+    def test_rate_limiter_spaces_request_starts(self) -> None:
+        async def starts() -> list[float]:
+            limiter = RateLimiter(50)
+            loop = asyncio.get_running_loop()
+            times: list[float] = []
+
+            async def request() -> None:
+                await limiter.wait()
+                times.append(loop.time())
+
+            await asyncio.gather(*(request() for _ in range(5)))
+            return times
+
+        times = sorted(asyncio.run(starts()))
+        self.assertGreaterEqual(times[-1] - times[0], 4 / 50 - 0.005)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+from src.bench import compare_to_baseline, run_benchmark
+
+
+class BenchmarkTests(unittest.TestCase):
+    def test_benchmark_reports_time_throughput_and_allocation(self) -> None:
+        result = run_benchmark("EggScraper", "lxml", repeat=2)
+        self.assertEqual(result["parser"], "lxml")
+        self.assertEqual(result["runs"], 2)
+        self.assertGreater(result["median_ms"], 0)
+        self.assertGreater(result["pages_per_second"], 0)
+        self.assertGreater(result["peak_kib"], 0)
+
+    def test_slowdown_beyond_threshold_is_a_regression(self) -> None:
+        baseline = {
+            "EggScraper": {"parser": "lxml", "median_ms": 10.0, "peak_kib": 100.0},
+            "RaidBossScraper": {"parser": "bs4", "median_ms": 1.0, "peak_kib": 1.0},
+        }
+        results = {
+            "EggScraper": {"parser": "lxml", "median_ms": 11.9, "peak_kib": 130.0},
+            # Measured with another backend, so not comparable.
+            "RaidBossScraper": {"parser": "lxml", "median_ms": 5.0, "peak_kib": 5.0},
+        }
+        regressions = compare_to_baseline(results, baseline, threshold=0.2)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("EggScraper: peak_kib", regressions[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
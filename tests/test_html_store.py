@@ -0,0 +1,307 @@
+import gzip
+import io
+import json
+import os
+import tarfile
+import tempfile
+import unittest
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from src.bench import CORPUS_DIR
+from src.cache import CacheManager, export_snapshot, import_snapshot
+from src.html_store import HtmlStore, blob_file
+from src.http_client import ValidatorStore
+from src.main import load_config
+from src.paths import cache_enabled
+from src.reparse import reparse
+from src.utils import configure_json_output
+
+EXPECTED_DIR = Path(__file__).parent / "fixtures" / "expected"
+
+
+class HtmlStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.directory = Path(temporary_directory.name)
+
+    def test_identical_bodies_are_stored_once_and_compressed(self) -> None:
+        store = HtmlStore(self.directory)
+        body = b"<html>" + b"<p>Same page</p>" * 200 + b"</html>"
+        store.put("https://leekduck.com/events/a/", body)
+        store.put("https://leekduck.com/events/b/", body)
+
+        blobs = list((self.directory / "blobs").rglob("*.gz"))
+        self.assertEqual(len(blobs), 1)
+        self.assertLess(blobs[0].stat().st_size, len(body))
+        self.assertEqual(gzip.decompress(blobs[0].read_bytes()), body)
+        self.assertEqual(store.get("https://leekduck.com/events/b/"), body)
+
+    def test_index_survives_reopening_and_records_fetch_time(self) -> None:
+        url = "https://leekduck.com/eggs/"
+        before = datetime.now(UTC) - timedelta(seconds=1)
+        store = HtmlStore(self.directory)
+        store.put(url, "Pokémon".encode("cp1252"), "cp1252")
+        self.assertFalse((self.directory / "index.json").exists())
+        store.save()
+
+        reopened = HtmlStore(self.directory)
+        self.assertEqual(reopened.get_text(url), "Pokémon")
+        fetched_at = reopened.fetched_at(url)
+        self.assertIsNotNone(fetched_at)
+        self.assertGreaterEqual(fetched_at, before)
+        index = json.loads((self.directory / "index.json").read_text("utf-8"))
+        digest = index[url]["digest"]
+        self.assertTrue(blob_file(self.directory, digest).exists())
+
+    def test_disabled_and_read_only_stores_write_nothing(self) -> None:
+        HtmlStore(None).put("https://leekduck.com/", b"page")
+        HtmlStore(self.directory, read_only=True).put("https://leekduck.com/", b"x")
+        self.assertEqual(list(self.directory.iterdir()), [])
+        self.assertIsNone(HtmlStore(None).get("https://leekduck.com/"))
+
+
+class CacheEvictionTests(unittest.TestCase):
+    now = datetime(2026, 10, 1, tzinfo=UTC)
+
+    def setUp(self) -> None:
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.directory = Path(temporary_directory.name)
+        self.parsed_dir = self.directory / "parsed"
+        self.parsed_dir.mkdir()
+
+    def store_pages(self, ages_in_days: dict[str, int]) -> HtmlStore:
+        """Store one distinct, incompressible page per URL, fetched days ago."""
+        store = HtmlStore(self.directory / "store")
+        for url in ages_in_days:
+            store.put(url, os.urandom(2048))
+        store.save()
+        index_path = self.directory / "store" / "index.json"
+        index = json.loads(index_path.read_text("utf-8"))
+        for url, days in ages_in_days.items():
+            fetched_at = self.now - timedelta(days=days)
+            index[url]["fetched_at"] = fetched_at.isoformat()
+        index_path.write_text(json.dumps(index), encoding="utf-8")
+        return HtmlStore(self.directory / "store")
+
+    def manager(self, store: HtmlStore, max_bytes: int, max_age_days: int = 30):
+        return CacheManager(
+            store,
+            self.parsed_dir,
+            max_bytes=max_bytes,
+            max_age=timedelta(days=max_age_days),
+            legacy_dir=self.directory,
+            legacy_names=["events"],
+        )
+
+    def test_entries_older_than_the_maximum_age_are_evicted(self) -> None:
+        store = self.store_pages({"old": 40, "recent": 1})
+        stats = self.manager(store, max_bytes=10**9).evict(self.now)
+
+        self.assertEqual(store.urls(), ["recent"])
+        self.assertEqual(stats["evicted_entries"], 1)
+        self.assertEqual(len(store.blobs()), 1)
+        self.assertEqual(HtmlStore(self.directory / "store").urls(), ["recent"])
+
+    def test_least_recently_used_entries_go_first_to_fit_the_budget(self) -> None:
+        store = self.store_pages({"a": 5, "b": 3, "c": 1})
+        # Reading "a" makes it the most recently used.
+        with patch("src.html_store.datetime") as clock:
+            clock.now.return_value = self.now
+            clock.fromisoformat = datetime.fromisoformat
+            store.get("a")
+        sizes = sorted(store.blobs().values())
+
+        stats = self.manager(store, max_bytes=sizes[0] + sizes[1]).evict(self.now)
+
+        self.assertEqual(sorted(store.urls()), ["a", "c"])
+        self.assertEqual(stats["evicted_bytes"], sum(sizes) - stats["kept_bytes"])
+        self.assertLessEqual(stats["kept_bytes"], sizes[0] + sizes[1])
+
+    def test_shared_bodies_are_freed_with_their_last_url(self) -> None:
+        store = HtmlStore(self.directory / "store")
+        store.put("first", b"same body")
+        store.put("second", b"same body")
+        store.remove(["first"])
+        self.assertEqual(store.get("second"), b"same body")
+        store.remove(["second"])
+        self.assertEqual(store.blobs(), {})
+
+    def test_parsed_results_and_legacy_pages_are_evicted_too(self) -> None:
+        store = self.store_pages({"page": 1})
+        stale = self.parsed_dir / "stale.json"
+        stale.write_text("{}", encoding="utf-8")
+        stale_time = (self.now - timedelta(days=60)).timestamp()
+        os.utime(stale, (stale_time, stale_time))
+        (self.directory / "event_page_https%3A%2F%2Fleekduck.com.html").write_text(
+            "<html></html>", encoding="utf-8"
+        )
+        (self.directory / "events.html").write_text("<html></html>", encoding="utf-8")
+        unrelated = self.directory / "notes.html"
+        unrelated.write_text("<html></html>", encoding="utf-8")
+
+        stats = self.manager(store, max_bytes=10**9).evict(self.now)
+
+        self.assertEqual(stats["evicted_entries"], 3)
+        self.assertFalse(stale.exists())
+        self.assertEqual(list(self.directory.glob("*.html")), [unrelated])
+        self.assertEqual(store.urls(), ["page"])
+
+    def test_validators_of_evicted_pages_are_dropped(self) -> None:
+        store = self.store_pages({"old": 40, "recent": 1})
+        validators = ValidatorStore(self.directory / "validators.json")
+        for url in ("old", "recent"):
+            response = Mock(status_code=200, headers={"ETag": f'"{url}"'})
+            validators.remember(url, response)
+        manager = self.manager(store, max_bytes=10**9)
+        manager.validators = validators
+
+        manager.evict(self.now)
+        validators.save()
+
+        reloaded = ValidatorStore(self.directory / "validators.json")
+        self.assertEqual(reloaded.request_headers("old"), {})
+        self.assertEqual(
+            reloaded.request_headers("recent"), {"If-None-Match": '"recent"'}
+        )
+
+    def test_unreferenced_bodies_are_reported_apart_from_evictions(self) -> None:
+        store = self.store_pages({"page": 1})
+        orphan = blob_file(self.directory / "store", "ab" * 32)
+        orphan.parent.mkdir(parents=True, exist_ok=True)
+        orphan.write_bytes(os.urandom(512))
+
+        stats = self.manager(store, max_bytes=10**9).evict(self.now)
+
+        self.assertEqual(stats["evicted_entries"], 0)
+        self.assertEqual(stats["evicted_bytes"], 0)
+        self.assertEqual(stats["orphaned_bytes"], 512)
+        self.assertFalse(orphan.exists())
+        self.assertEqual(store.urls(), ["page"])
+
+
+class CacheSnapshotTests(unittest.TestCase):
+    def setUp(self) -> None:
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.directory = Path(temporary_directory.name)
+        self.snapshot = self.directory / "snapshot.tar.gz"
+
+    def test_snapshot_restores_pages_parsed_results_digests_and_validators(
+        self,
+    ) -> None:
+        source = self.directory / "source"
+        store = HtmlStore(source / "store")
+        store.put("https://leekduck.com/eggs/", b"<html>")
+        store.save()
+        (source / "parsed").mkdir()
+        (source / "parsed" / "abc.json").write_text("{}", encoding="utf-8")
+        (source / "validators.json").write_text("{}", encoding="utf-8")
+        (source / "digests").mkdir()
+        (source / "digests" / "egg_pool.sha256").write_text("abc v1\n", "utf-8")
+        (source / "parsed" / ".abc.json.x1.tmp").write_text("", encoding="utf-8")
+        (source / "event_page_legacy.html").write_text("", encoding="utf-8")
+
+        with patch("builtins.print"):
+            export_snapshot(self.snapshot, source)
+            restored = self.directory / "restored"
+            self.assertTrue(import_snapshot(self.snapshot, restored))
+
+        store = HtmlStore(restored / "store")
+        self.assertEqual(store.get("https://leekduck.com/eggs/"), b"<html>")
+        self.assertTrue((restored / "parsed" / "abc.json").exists())
+        self.assertTrue((restored / "validators.json").exists())
+        self.assertEqual(
+            (restored / "digests" / "egg_pool.sha256").read_text("utf-8"), "abc v1\n"
+        )
+        self.assertFalse((restored / "parsed" / ".abc.json.x1.tmp").exists())
+        self.assertFalse((restored / "event_page_legacy.html").exists())
+
+    def test_unexpected_members_are_never_extracted(self) -> None:
+        with tarfile.open(self.snapshot, "w:gz") as snapshot:
+            for name in ("../escaped.json", "other/file.json", "store/index.json"):
+                member = tarfile.TarInfo(name)
+                member.size = 2
+                snapshot.addfile(member, io.BytesIO(b"{}"))
+
+        restored = self.directory / "cache"
+        with patch("builtins.print"):
+            self.assertTrue(import_snapshot(self.snapshot, restored))
+        self.assertFalse((self.directory / "escaped.json").exists())
+        self.assertFalse((restored / "other").exists())
+        self.assertTrue((restored / "store" / "index.json").exists())
+
+    def test_missing_or_corrupt_snapshots_start_cold(self) -> None:
+        with patch("builtins.print"):
+            self.assertFalse(import_snapshot(self.snapshot, self.directory / "c"))
+            self.snapshot.write_bytes(b"not a tar file")
+            self.assertFalse(import_snapshot(self.snapshot, self.directory / "c"))
+
+    def test_ci_keeps_a_cache_only_in_a_configured_directory(self) -> None:
+        with patch.dict(os.environ, {"CI": "true", "LEAK_DUCK_CACHE_DIR": ""}):
+            self.assertFalse(cache_enabled())
+        environment = {"CI": "true", "LEAK_DUCK_CACHE_DIR": str(self.directory)}
+        with patch.dict(os.environ, environment):
+            self.assertTrue(cache_enabled())
+
+
+class ReparseTests(unittest.TestCase):
+    pages = {
+        "RaidBossScraper": "raid_bosses.html",
+        "ResearchScraper": "research_tasks.html",
+        "RocketLineupScraper": "rocket_lineups.html",
+        "EggScraper": "egg_pool.html",
+    }
+
+    def setUp(self) -> None:
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.directory = Path(temporary_directory.name)
+        self.addCleanup(configure_json_output)
+        self.config = load_config()
+        self.config["scrapers"]["EventScraper"]["enabled"] = False
+        self.store = HtmlStore(self.directory / "store")
+        for name, page in self.pages.items():
+            url = self.config["scrapers"][name]["url"]
+            self.store.put(url, (CORPUS_DIR / page).read_bytes())
+        self.store.save()
+
+    def reparse(self) -> None:
+        output_dir = str(self.directory / "json")
+        with (
+            patch.dict(os.environ, {"LEAK_DUCK_OUTPUT_DIR": output_dir}),
+            patch("src.reparse.HTML_STORE_DIR", self.directory / "store"),
+            patch("src.scrapers.base_scraper.DIGESTS_DIR", self.directory / "digests"),
+            patch("src.http_client.HttpClient.get", side_effect=AssertionError),
+            patch("builtins.print"),
+        ):
+            reparse(self.config)
+
+    def test_outputs_are_rebuilt_from_stored_pages(self) -> None:
+        self.reparse()
+
+        for name, page in self.pages.items():
+            file_name = self.config["scrapers"][name]["file_name"]
+            with self.subTest(scraper=name):
+                written = self.directory / "json" / f"{file_name}.json"
+                expected = EXPECTED_DIR / page.replace(".html", ".json")
+                self.assertEqual(
+                    json.loads(written.read_text("utf-8")),
+                    json.loads(expected.read_text("utf-8")),
+                )
+
+    def test_a_page_missing_from_the_store_fails_only_its_output(self) -> None:
+        self.config["scrapers"]["EggScraper"]["url"] = "https://leekduck.com/gone/"
+
+        with self.assertRaisesRegex(RuntimeError, "EggScraper"):
+            self.reparse()
+
+        self.assertFalse((self.directory / "json" / "egg_pool.json").exists())
+        self.assertTrue((self.directory / "json" / "raid_bosses.json").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
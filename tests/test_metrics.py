@@ -0,0 +1,166 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.metrics import RunMetrics, metrics
+from src.prometheus import export_textfile, render
+from src.utils import save_run_metrics, write_json_atomic
+
+
+class RunMetricsTests(unittest.TestCase):
+    def test_span_accumulates_calls_time_and_bytes(self) -> None:
+        run_metrics = RunMetrics()
+        for size in (10, 32):
+            with run_metrics.span("fetch") as stage:
+                stage.add_bytes(size)
+
+        stage = run_metrics.snapshot()["stages"]["fetch"]
+        self.assertEqual(stage["calls"], 2)
+        self.assertEqual(stage["bytes"], 42)
+        self.assertGreaterEqual(stage["wall_seconds"], 0)
+        self.assertGreaterEqual(stage["cpu_seconds"], 0)
+
+    def test_failed_stage_is_still_recorded(self) -> None:
+        run_metrics = RunMetrics()
+        with self.assertRaises(ValueError), run_metrics.span("parse"):
+            raise ValueError("bad page")
+        self.assertEqual(run_metrics.snapshot()["stages"]["parse"]["calls"], 1)
+
+    def test_timed_decorator_records_each_call(self) -> None:
+        run_metrics = RunMetrics()
+
+        @run_metrics.timed("work")
+        def work(value: int) -> int:
+            return value * 2
+
+        self.assertEqual(work(2), 4)
+        self.assertEqual(work(3), 6)
+        self.assertEqual(run_metrics.snapshot()["stages"]["work"]["calls"], 2)
+
+    def test_spans_from_many_threads_are_all_counted(self) -> None:
+        run_metrics = RunMetrics()
+
+        def work() -> None:
+            for _ in range(100):
+                with run_metrics.span("page") as stage:
+                    stage.add_bytes(1)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stage = run_metrics.snapshot()["stages"]["page"]
+        self.assertEqual((stage["calls"], stage["bytes"]), (800, 800))
+
+    def test_json_writes_record_the_bytes_written(self) -> None:
+        metrics.reset()
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            path = Path(temporary_directory) / "data.json"
+            write_json_atomic(path, {"key": "value"})
+            size = path.stat().st_size
+        self.assertEqual(metrics.snapshot()["stages"]["write_json"]["bytes"], size)
+
+    def test_run_metrics_are_written_to_the_configured_path(self) -> None:
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            path = Path(temporary_directory) / "run_metrics.json"
+            with patch.dict(os.environ, {"LEAK_DUCK_METRICS_PATH": str(path)}):
+                save_run_metrics()
+            saved = json.loads(path.read_text(encoding="utf-8"))
+        self.assertIn("wall_seconds", saved)
+        self.assertIn("stages", saved)
+
+    def test_ci_keeps_no_metrics_without_a_configured_path(self) -> None:
+        environment = {"CI": "true", "LEAK_DUCK_METRICS_PATH": ""}
+        with (
+            patch.dict(os.environ, environment),
+            patch("src.utils.write_json_atomic") as write,
+        ):
+            save_run_metrics()
+        write.assert_not_called()
+
+    def test_counters_gauges_and_histograms_keep_labels_apart(self) -> None:
+        run_metrics = RunMetrics()
+        run_metrics.count("cache_requests_total", cache="http", result="hit")
+        run_metrics.count("cache_requests_total", cache="http", result="hit")
+        run_metrics.count("cache_requests_total", cache="http", result="miss")
+        run_metrics.set_gauge("output_records", 5, file="eggs")
+        run_metrics.set_gauge("output_records", 7, file="eggs")
+        run_metrics.observe("fetch_seconds", 0.2, host="leekduck.com")
+        run_metrics.observe("fetch_seconds", 3.0, host="leekduck.com")
+
+        snapshot = run_metrics.snapshot()
+        hits = {
+            point["labels"]["result"]: point["value"]
+            for point in snapshot["counters"]["cache_requests_total"]
+        }
+        self.assertEqual(hits, {"hit": 2, "miss": 1})
+        self.assertEqual(snapshot["gauges"]["output_records"][0]["value"], 7)
+        histogram = snapshot["histograms"]["fetch_seconds"][0]
+        self.assertEqual(histogram["count"], 2)
+        self.assertEqual(histogram["buckets"][0.25], 1)
+        self.assertEqual(histogram["buckets"][5.0], 2)
+        self.assertAlmostEqual(histogram["sum"], 3.2)
+
+
+class PrometheusExportTests(unittest.TestCase):
+    def test_render_writes_cumulative_buckets_and_run_labels(self) -> None:
+        run_metrics = RunMetrics()
+        with run_metrics.span("EggScraper.parse"):
+            pass
+        run_metrics.count("fetch_retries_total", component="EggScraper")
+        run_metrics.observe("validation_seconds", 0.03, file="eggs")
+
+        text = render(run_metrics.snapshot(), "scrapers", succeeded=False)
+
+        self.assertIn('leak_duck_run_success{command="scrapers"} 0\n', text)
+        self.assertIn("# TYPE leak_duck_fetch_retries_total counter", text)
+        self.assertIn(
+            'leak_duck_fetch_retries_total{command="scrapers",'
+            'component="EggScraper"} 1\n',
+            text,
+        )
+        self.assertIn(
+            'leak_duck_stage_calls_total{command="scrapers",'
+            'stage="EggScraper.parse"} 1\n',
+            text,
+        )
+        labels = 'command="scrapers",file="eggs"'
+        self.assertIn(
+            f'leak_duck_validation_seconds_bucket{{{labels},le="0.01"}} 0\n', text
+        )
+        self.assertIn(
+            f'leak_duck_validation_seconds_bucket{{{labels},le="0.05"}} 1\n', text
+        )
+        self.assertIn(
+            f'leak_duck_validation_seconds_bucket{{{labels},le="+Inf"}} 1\n', text
+        )
+        self.assertIn(f"leak_duck_validation_seconds_count{{{labels}}} 1\n", text)
+
+    def test_label_values_are_escaped(self) -> None:
+        run_metrics = RunMetrics()
+        run_metrics.count("responses_total", host='a"b\\c')
+        text = render(run_metrics.snapshot(), "backfill", succeeded=True)
+        self.assertIn('host="a\\"b\\\\c"', text)
+
+    def test_textfile_is_written_only_when_a_directory_is_configured(self) -> None:
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            with patch.dict(os.environ, {"LEAK_DUCK_PROMETHEUS_DIR": ""}):
+                export_textfile("scrapers", succeeded=True)
+            self.assertEqual(list(Path(temporary_directory).iterdir()), [])
+
+            environment = {"LEAK_DUCK_PROMETHEUS_DIR": temporary_directory}
+            with patch.dict(os.environ, environment):
+                export_textfile("backfill", succeeded=True)
+            exported = Path(temporary_directory) / "leak_duck_backfill.prom"
+            text = exported.read_text(encoding="utf-8")
+        self.assertIn('leak_duck_run_success{command="backfill"} 1', text)
+
+
+if __name__ == "__main__":
+    unittest.main()
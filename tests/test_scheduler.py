@@ -0,0 +1,161 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from src import main
+from src.scheduler import TaskGraph
+
+
+class TaskGraphTests(unittest.TestCase):
+    def test_dependents_run_after_their_dependencies(self) -> None:
+        order: list[str] = []
+        lock = threading.Lock()
+
+        def task(name: str):
+            def run() -> None:
+                with lock:
+                    order.append(name)
+
+            return run
+
+        graph = TaskGraph()
+        graph.add("scraper", task("scraper"), after=["archiver"])
+        graph.add("archiver", task("archiver"))
+        graph.add("report", task("report"), after=["scraper", "archiver"])
+        report = graph.run()
+
+        self.assertEqual(order, ["archiver", "scraper", "report"])
+        self.assertEqual(set(report.durations), {"archiver", "scraper", "report"})
+
+    def test_independent_tasks_run_concurrently(self) -> None:
+        # Each task waits for the other, so this only finishes if both run at once.
+        barrier = threading.Barrier(2, timeout=5)
+        graph = TaskGraph()
+        graph.add("eggs", barrier.wait)
+        graph.add("raids", barrier.wait)
+        report = graph.run(max_workers=2)
+        self.assertEqual(report.failures, {})
+
+    def test_failures_skip_dependents_but_not_unrelated_tasks(self) -> None:
+        ran: list[str] = []
+
+        def fail() -> None:
+            raise RuntimeError("archive unavailable")
+
+        graph = TaskGraph()
+        graph.add("archiver", fail)
+        graph.add("events", lambda: ran.append("events"), after=["archiver"])
+        graph.add("summary", lambda: ran.append("summary"), after=["events"])
+        graph.add("eggs", lambda: ran.append("eggs"))
+        report = graph.run()
+
+        self.assertEqual(ran, ["eggs"])
+        self.assertEqual(str(report.failures["archiver"]), "archive unavailable")
+        self.assertEqual(report.skipped, {"events": "archiver", "summary": "events"})
+
+    def test_unknown_dependencies_and_cycles_are_rejected(self) -> None:
+        graph = TaskGraph()
+        graph.add("events", lambda: None, after=["archiver"])
+        with self.assertRaisesRegex(ValueError, "unknown tasks"):
+            graph.run()
+
+        graph = TaskGraph()
+        graph.add("a", lambda: None, after=["b"])
+        graph.add("b", lambda: None, after=["a"])
+        with self.assertRaisesRegex(ValueError, "cycle"):
+            graph.run()
+
+    def test_critical_path_follows_the_slowest_chain(self) -> None:
+        graph = TaskGraph()
+        for name in ("archiver", "events", "eggs"):
+            graph.add(
+                name, lambda: None, after=["archiver"] if name == "events" else []
+            )
+        report = graph.run()
+        report.durations.update({"archiver": 1.0, "events": 3.0, "eggs": 2.5})
+
+        self.assertEqual(report.critical_path(), (["archiver", "events"], 4.0))
+
+
+class RunAllTests(unittest.TestCase):
+    def test_archiver_failure_skips_event_scraper_and_is_aggregated(self) -> None:
+        # Unlike the old sequential run, a failed archiver no longer stops the
+        # scrapers that do not depend on it; the run still fails at the end.
+        config = main.load_config()
+        ran: list[str] = []
+
+        def run_scraper(scraper_info: dict) -> None:
+            ran.append(scraper_info["class_name"])
+
+        with (
+            patch.object(main, "load_config", return_value=config),
+            patch.object(main, "configure_http_client"),
+            patch.object(main, "maintain_cache"),
+            patch.object(main, "configure_json_output"),
+            patch.object(
+                main.EventArchiver, "run", side_effect=RuntimeError("no archive")
+            ),
+            patch.object(main, "run_scraper", side_effect=run_scraper),
+            self.assertRaises(RuntimeError) as raised,
+        ):
+            main.run_all()
+
+        self.assertNotIn("EventScraper", ran)
+        self.assertEqual(
+            sorted(ran),
+            sorted(
+                name
+                for name, settings in config["scrapers"].items()
+                if settings["enabled"] and name != "EventScraper"
+            ),
+        )
+        self.assertIn("EventArchiver: no archive", str(raised.exception))
+        self.assertIn("EventScraper: skipped", str(raised.exception))
+
+    def test_archiver_worker_count_comes_from_the_config(self) -> None:
+        config = main.load_config()
+        self.assertEqual(
+            main.EventArchiver("owner", "repository").max_workers,
+            config["archiver"]["max_workers"],
+        )
+        config["archiver"]["max_workers"] = 2
+        with (
+            patch.object(main, "load_config", return_value=config),
+            patch.object(main, "configure_http_client"),
+            patch.object(main, "maintain_cache"),
+            patch.object(main, "configure_json_output"),
+            patch.object(main, "EventArchiver") as archiver,
+            patch.object(main, "run_scraper"),
+            patch("builtins.print"),
+        ):
+            main.run_all()
+
+        self.assertEqual(archiver.call_args.kwargs["max_workers"], 2)
+
+    def test_archiver_failure_fails_the_run_after_the_other_scrapers(self) -> None:
+        ran: list[str] = []
+        with (
+            patch.object(main, "configure_http_client"),
+            patch.object(main, "maintain_cache"),
+            patch.object(main, "configure_json_output"),
+            patch.object(main, "save_run_metrics"),
+            patch.object(main, "export_textfile") as exported,
+            patch.object(
+                main.EventArchiver, "run", side_effect=RuntimeError("no archive")
+            ),
+            patch.object(
+                main,
+                "run_scraper",
+                side_effect=lambda info: ran.append(info["class_name"]),
+            ),
+            patch("builtins.print"),
+            self.assertRaises(RuntimeError),
+        ):
+            main.main()
+
+        self.assertIn("EggScraper", ran)
+        exported.assert_called_once_with("scrapers", False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,21 @@
 import json
 import tempfile
+import threading
+import time
 import unittest
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import requests
 from bs4 import BeautifulSoup
 
+from src.bench import BENCHMARKS, CORPUS_DIR, page_parser
+from src.cache import ParsedResultCache
+from src.dom import get_backend
+from src.html_store import HtmlStore
+from src.http_client import HttpClient, ValidatorStore, shared_http_client
+from src.main import load_config
+from src.metrics import metrics
 from src.scrapers.base_scraper import BaseScraper, ScraperFetchError
 from src.scrapers.egg_scraper import EggScraper
 from src.scrapers.event_page_scraper import EventPageScraper
@@ -14,6 +23,7 @@ from src.scrapers.event_scraper import EventScraper
 from src.scrapers.raid_boss_scraper import RaidBossScraper
 from src.scrapers.research_scraper import ResearchScraper
 from src.scrapers.rocket_lineup_scraper import RocketLineupScraper
+from src.validation import OutputValidationError
 
 
 class DummyScraper(BaseScraper):
@@ -31,8 +41,9 @@ class ScraperSafetyTests(unittest.TestCase):
             )
             scraper.json_path = output_path
 
-            with patch(
-                "src.scrapers.base_scraper.requests.get",
+            with patch.object(
+                scraper.http,
+                "get",
                 side_effect=requests.ConnectionError("offline"),
             ):
                 with self.assertRaises(ScraperFetchError):
@@ -42,6 +53,14 @@ class ScraperSafetyTests(unittest.TestCase):
                 output_path.read_text(encoding="utf-8"), '{"existing": true}'
             )
 
+    def test_components_share_one_pooled_client_by_default(self) -> None:
+        scraper = DummyScraper("https://example.invalid", "dummy", {})
+        page_scraper = EventPageScraper()
+
+        self.assertIs(scraper.http, shared_http_client())
+        self.assertIs(page_scraper.http, scraper.http)
+        self.assertIn("leak-duck", scraper.http.session.headers["User-Agent"])
+
     def test_existing_event_check_prefers_archiver_cleaned_local_data(self) -> None:
         with tempfile.TemporaryDirectory() as temporary_directory:
             output_dir = Path(temporary_directory)
@@ -71,6 +90,368 @@ class ScraperSafetyTests(unittest.TestCase):
             self.assertEqual(scraper.existing_event_urls, {"active-url"})
 
 
+def http_response(
+    text: str = "", status_code: int = 200, headers: dict[str, str] | None = None
+) -> Mock:
+    response = Mock(spec=requests.Response)
+    response.status_code = status_code
+    response.text = text
+    response.content = text.encode()
+    response.encoding = "utf-8"
+    response.headers = headers or {}
+    response.raise_for_status.return_value = None
+    return response
+
+
+class ConditionalGetTests(unittest.TestCase):
+    def setUp(self) -> None:
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.directory = Path(temporary_directory.name)
+        self.http = HttpClient(
+            validators=ValidatorStore(self.directory / "v.json"),
+            html_store=HtmlStore(self.directory / "store"),
+        )
+
+    def dummy_scraper(self) -> DummyScraper:
+        scraper = DummyScraper(
+            "https://example.invalid", "dummy", {"retries": 1}, self.http
+        )
+        scraper.json_path = self.directory / "dummy.json"
+        scraper.digest_path = self.directory / "dummy.sha256"
+        return scraper
+
+    def test_validators_are_sent_to_a_freshly_seeded_output_dir(self) -> None:
+        # CI rebuilds the output directory from the published outputs on every
+        # run; only the cache directory carries over.
+        page = http_response("<p>1</p>", headers={"ETag": '"v1"'})
+        published = None
+        for run in range(2):
+            scraper = self.dummy_scraper()
+            scraper.json_path = self.directory / f"run-{run}" / "dummy.json"
+            if published is not None:
+                scraper.json_path.parent.mkdir()
+                scraper.json_path.write_bytes(published)
+            with (
+                patch.object(DummyScraper, "parse", return_value={"items": [1]}),
+                patch.object(self.http.session, "get", return_value=page) as get,
+            ):
+                scraper.run()
+            published = scraper.json_path.read_bytes()
+
+        self.assertEqual(get.call_args.kwargs["headers"], {"If-None-Match": '"v1"'})
+
+    def test_validators_persist_once_output_is_saved(self) -> None:
+        scraper = self.dummy_scraper()
+        page = http_response("<p></p>", headers={"ETag": '"v1"'})
+        with patch.object(self.http.session, "get", return_value=page) as get:
+            with self.assertRaises(OutputValidationError):
+                # Empty output fails validation, so the ETag must not stick.
+                scraper.run()
+            self.assertEqual(get.call_args.kwargs["headers"], {})
+
+        self.assertEqual(self.http.validators.request_headers(scraper.url), {})
+
+        with patch.object(DummyScraper, "parse", return_value={"items": [1]}):
+            with patch.object(self.http.session, "get", return_value=page):
+                scraper.run()
+
+        self.assertFalse((self.directory / "v.json").exists())
+        self.http.validators.save()
+        reloaded = ValidatorStore(self.directory / "v.json")
+        self.assertEqual(
+            reloaded.request_headers(scraper.url), {"If-None-Match": '"v1"'}
+        )
+
+    def test_not_modified_keeps_previous_output_without_parsing(self) -> None:
+        scraper = self.dummy_scraper()
+        scraper.json_path.write_text('{"items": [1]}', encoding="utf-8")
+        scraper.digest_path.write_text(f"old {scraper.parser_version}")
+        self.http.validators.remember(
+            scraper.url, http_response(headers={"ETag": '"v1"'})
+        )
+
+        with patch.object(
+            self.http.session, "get", return_value=http_response(status_code=304)
+        ) as get:
+            with patch.object(DummyScraper, "parse") as parse:
+                scraper.run()
+
+        self.assertEqual(get.call_args.kwargs["headers"], {"If-None-Match": '"v1"'})
+        parse.assert_not_called()
+        self.assertEqual(
+            scraper.json_path.read_text(encoding="utf-8"), '{"items": [1]}'
+        )
+
+    def test_fetches_and_revalidations_are_counted(self) -> None:
+        scraper = self.dummy_scraper()
+        scraper.json_path.write_text('{"items": [1]}', encoding="utf-8")
+        scraper.digest_path.write_text(f"old {scraper.parser_version}")
+        self.http.validators.remember(
+            scraper.url, http_response(headers={"ETag": '"v1"'})
+        )
+        metrics.reset()
+
+        with patch.object(
+            self.http.session, "get", return_value=http_response(status_code=304)
+        ):
+            scraper.run()
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(
+            snapshot["counters"]["cache_requests_total"],
+            [{"labels": {"cache": "http", "result": "hit"}, "value": 1}],
+        )
+        self.assertEqual(
+            snapshot["counters"]["responses_total"][0]["labels"],
+            {"host": "example.invalid", "status": "304"},
+        )
+        self.assertEqual(snapshot["histograms"]["fetch_seconds"][0]["count"], 1)
+
+    def test_output_from_an_older_parser_is_never_revalidated(self) -> None:
+        scraper = self.dummy_scraper()
+        scraper.json_path.write_text('{"items": [1]}', encoding="utf-8")
+        scraper.digest_path.write_text("old old-parser")
+        self.http.validators.remember(
+            scraper.url, http_response(headers={"ETag": '"v1"'})
+        )
+
+        self.assertFalse(scraper._saved_output_is_reusable())
+
+    def test_identical_content_skips_parse_and_write(self) -> None:
+        scraper = self.dummy_scraper()
+        first = http_response('<p>Same</p><script nonce="a">1</script>')
+        second = http_response('<p>Same</p><script nonce="b">2</script>')
+        with patch.object(DummyScraper, "parse", return_value={"items": [1]}):
+            with patch.object(self.http.session, "get", return_value=first):
+                scraper.run()
+        scraper.json_path.write_text('{"sentinel": [1]}', encoding="utf-8")
+
+        with patch.object(DummyScraper, "parse") as parse:
+            with patch.object(self.http.session, "get", return_value=second):
+                scraper.run()
+
+        parse.assert_not_called()
+        self.assertEqual(
+            scraper.json_path.read_text(encoding="utf-8"), '{"sentinel": [1]}'
+        )
+
+    def test_changed_content_is_parsed_again(self) -> None:
+        scraper = self.dummy_scraper()
+        with patch.object(DummyScraper, "parse", return_value={"items": [1]}) as parse:
+            with patch.object(
+                self.http.session, "get", return_value=http_response("<p>1</p>")
+            ):
+                scraper.run()
+            with patch.object(
+                self.http.session, "get", return_value=http_response("<p>2</p>")
+            ):
+                scraper.run()
+            self.assertEqual(parse.call_count, 2)
+
+    def test_event_page_not_modified_reuses_the_cached_copy(self) -> None:
+        url = "https://example.invalid/events/cached/"
+        self.http.validators.remember(
+            url, http_response(headers={"Last-Modified": "Mon, 20 Jul 2026"})
+        )
+        with patch("src.scrapers.event_page_scraper.PARSED_DIR", self.directory):
+            page_scraper = EventPageScraper({"cache_expiration_hours": 0}, self.http)
+            self.http.html_store.put(
+                url,
+                b'<div class="page-content"><div class="event-description">'
+                b"<p>Cached description.</p></div></div>",
+            )
+            with patch.object(
+                self.http.session, "get", return_value=http_response(status_code=304)
+            ) as get:
+                data = page_scraper.scrape(url)
+
+        self.assertEqual(
+            get.call_args.kwargs["headers"],
+            {"If-Modified-Since": "Mon, 20 Jul 2026"},
+        )
+        self.assertEqual(data["description"], "Cached description.")
+
+
+class IncrementalEventScraperTests(unittest.TestCase):
+    listing = BeautifulSoup(
+        "".join(
+            f'<a class="event-item-link" href="/events/{slug}/">'
+            '<div class="event-item-wrapper"><p>Event</p>'
+            f'<div class="event-text"><h2>{title}</h2></div></div></a>'
+            for slug, title in (
+                ("kept", "Kept"),
+                ("renamed", "Renamed"),
+                ("new", "New"),
+            )
+        ),
+        "lxml",
+    )
+
+    @staticmethod
+    def previous(slug: str, title: str) -> dict[str, object]:
+        return {
+            "title": title,
+            "article_url": f"https://leekduck.com/events/{slug}/",
+            "banner_url": None,
+            "category": "Event",
+            "description": f"{title} description.",
+            "details": {},
+            "is_local_time": False,
+            "start_time": 1,
+            "end_time": 2,
+        }
+
+    def test_only_new_or_changed_events_are_scraped(self) -> None:
+        scraper = EventScraper.__new__(EventScraper)
+        scraper.url = "https://leekduck.com/events/"
+        scraper.scraper_settings = {}
+        scraper.dom = get_backend()
+        scraper.check_existing_events = False
+        scraper.incremental = True
+        scraper.event_dates_feed = {}
+        scraper.existing_events_data = {
+            "Event": [
+                self.previous("kept", "Kept"),
+                self.previous("renamed", "Old Name"),
+                self.previous("gone", "Gone"),
+            ]
+        }
+
+        with patch.object(EventScraper, "_scrape_event_pages") as scrape_pages:
+            data = scraper.parse(self.listing)
+
+        scraped = [event["title"] for event in scrape_pages.call_args.args[0]]
+        self.assertEqual(scraped, ["Renamed", "New"])
+        self.assertEqual(
+            [event["title"] for event in data["Event"]], ["Kept", "Renamed", "New"]
+        )
+        self.assertEqual(data["Event"][0], self.previous("kept", "Kept"))
+
+    def test_changed_feed_dates_force_a_rescrape(self) -> None:
+        scraper = EventScraper.__new__(EventScraper)
+        scraper.event_dates_feed = {"kept": {"start": "2026-07-20T10:00:00"}}
+        card = {
+            "title": "Kept",
+            "banner_url": None,
+            "category": "Event",
+            "event_id": "kept",
+        }
+
+        self.assertFalse(
+            scraper._card_is_unchanged(card, self.previous("kept", "Kept"))
+        )
+
+
+class ParsedResultCacheTests(unittest.TestCase):
+    page = (
+        '<div class="page-content"><div class="event-description">'
+        "<p>Event description.</p></div></div>"
+    )
+
+    def setUp(self) -> None:
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.cache = ParsedResultCache(Path(temporary_directory.name))
+        self.page_scraper = EventPageScraper()
+        self.page_scraper.parsed_cache = self.cache
+
+    def test_identical_html_skips_parsing(self) -> None:
+        first = self.page_scraper._parse_cached("event-url", self.page)
+        with patch.object(self.page_scraper.dom, "parse") as parse:
+            second = self.page_scraper._parse_cached("event-url", self.page)
+
+        parse.assert_not_called()
+        self.assertEqual(first, second)
+        self.assertEqual(second["description"], "Event description.")
+
+    def test_changed_html_or_parser_is_parsed_again(self) -> None:
+        self.page_scraper._parse_cached("event-url", self.page)
+        changed_page = self.page.replace("Event description", "New description")
+        self.assertEqual(
+            self.page_scraper._parse_cached("event-url", changed_page)["description"],
+            "New description.",
+        )
+
+        with patch("src.scrapers.event_page_scraper.PARSER_VERSION", "next"):
+            with patch.object(
+                EventPageScraper, "_parse_event_details", return_value={}
+            ) as parse:
+                self.page_scraper._parse_cached("event-url", changed_page)
+        parse.assert_called_once()
+
+
+class EventPageConcurrencyTests(unittest.TestCase):
+    def scraper(self, **settings: object) -> EventScraper:
+        scraper = EventScraper.__new__(EventScraper)
+        scraper.scraper_settings = {"retries": 1, "delay": 0, **settings}
+        scraper.http = Mock(spec=HttpClient)
+        return scraper
+
+    def test_results_are_merged_in_listing_order(self) -> None:
+        events = [
+            {"title": f"Event {index}", "article_url": f"https://a.invalid/{index}"}
+            for index in range(8)
+        ]
+
+        def scrape(_: EventPageScraper, url: str) -> dict[str, object]:
+            # Later pages finish first, so completion order is reversed.
+            time.sleep(0.002 * (8 - int(url.rsplit("/", 1)[-1])))
+            return {"article_url": url, "description": url}
+
+        with patch.object(
+            EventPageScraper, "scrape", autospec=True, side_effect=scrape
+        ):
+            self.scraper(max_workers=4)._scrape_event_pages(events)
+
+        self.assertEqual(
+            [event["description"] for event in events],
+            [event["article_url"] for event in events],
+        )
+
+    def test_default_host_cap_matches_the_shipped_config(self) -> None:
+        settings = load_config()["scraper_settings"]
+        self.assertEqual(
+            EventPageScraper().max_requests_per_host,
+            EventPageScraper(settings).max_requests_per_host,
+        )
+
+    def test_requests_to_one_host_are_capped(self) -> None:
+        page_scraper = EventPageScraper({"max_requests_per_host": 2})
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def fetch(url: str) -> None:
+            nonlocal active, peak
+            with page_scraper._host_slot(url):
+                with lock:
+                    active += 1
+                    peak = max(peak, active)
+                time.sleep(0.01)
+                with lock:
+                    active -= 1
+
+        threads = [
+            threading.Thread(target=fetch, args=(f"https://a.invalid/{index}",))
+            for index in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(peak, 2)
+
+    def test_page_failure_is_raised(self) -> None:
+        events = [{"title": "Broken", "article_url": "https://a.invalid/broken"}]
+        with patch.object(
+            EventPageScraper, "scrape", side_effect=RuntimeError("page failed")
+        ):
+            with self.assertRaises(RuntimeError):
+                self.scraper(max_workers=2)._scrape_event_pages(events)
+
+
 class ParserFixtureTests(unittest.TestCase):
     settings = {"retries": 1, "delay": 0, "timeout": 1}
 
@@ -86,6 +467,23 @@ class ParserFixtureTests(unittest.TestCase):
         self.assertEqual(data["5 km Eggs"][0]["hatch_distance"], 5)
         self.assertEqual(data["5 km Eggs"][0]["rarity_tier"], 1)
 
+    def test_egg_parser_reads_rarity_from_each_card(self) -> None:
+        soup = BeautifulSoup(
+            '<article class="article-page"><h2>10 km Eggs</h2><ul class="egg-grid">'
+            '<li class="pokemon-card"><span class="name"> Riolu </span>'
+            '<div class="rarity"><svg class="mini-egg"></svg></div></li>'
+            '<li class="pokemon-card" data-pokemon="Beldum"><span class="name">'
+            'Beldum <span class="form">(Alola)</span></span><div class="rarity">'
+            '<svg class="mini-egg"></svg><svg class="mini-egg"></svg>'
+            '<svg class="mini-egg"></svg></div></li></ul></article>',
+            "lxml",
+        )
+        data = EggScraper("offline", "egg_pool", self.settings).parse(soup)
+        self.assertEqual(
+            [(p["name"], p["rarity_tier"]) for p in data["10 km Eggs"]],
+            [("Riolu", 1), ("Beldum", 3)],
+        )
+
     def test_raid_parser(self) -> None:
         soup = BeautifulSoup(
             '<div class="raid-bosses"><div class="tier"><h2 class="header">Tier 5</h2>'
@@ -97,6 +495,28 @@ class ParserFixtureTests(unittest.TestCase):
         data = RaidBossScraper("offline", "raid_bosses", self.settings).parse(soup)
         self.assertEqual(data["Tier 5"][0]["cp_range"], {"min": 2200, "max": 2300})
 
+    def test_raid_details_follow_the_displayed_name(self) -> None:
+        # The second card's data-pokemon and p.name disagree: its details go
+        # to the boss its p.name names, and the boss it is keyed as gets none.
+        page = (
+            '<div class="raid-bosses"><div class="tier"><h2 class="header">Tier 5</h2>'
+            '<div class="card" data-pokemon="Mewtwo"><p class="name">Mewtwo</p>'
+            '<div class="cp-range">2200 - 2300</div></div>'
+            '<div class="card" data-pokemon="Armored Mewtwo"><p class="name">Mewtwo</p>'
+            '<div class="cp-range">1800 - 1900</div></div></div></div>'
+        )
+        for parser in ("bs4", "lxml"):
+            with self.subTest(parser=parser):
+                scraper = RaidBossScraper(
+                    "offline", "raid_bosses", {**self.settings, "parser": parser}
+                )
+                data = scraper.parse(scraper.dom.parse(page))
+                bosses = {boss["name"]: boss for boss in data["Tier 5"]}
+                self.assertEqual(
+                    bosses["Mewtwo"]["cp_range"], {"min": 1800, "max": 1900}
+                )
+                self.assertNotIn("cp_range", bosses["Armored Mewtwo"])
+
     def test_research_parser(self) -> None:
         soup = BeautifulSoup(
             '<div class="task-category"><h2>Catch</h2><li class="task-item">'
@@ -148,6 +568,37 @@ class ParserFixtureTests(unittest.TestCase):
         self.assertEqual(data["description"], "First paragraph.\nSecond paragraph.")
         self.assertEqual(data["details"]["bonuses"], ["Double XP"])
 
+    def test_event_page_parser_reads_every_section_once(self) -> None:
+        soup = BeautifulSoup(
+            '<div class="page-content"><div class="event-description">'
+            "<p>Intro.</p>"
+            '<h2 class="event-section-header" id="research">Research</h2>'
+            "<p>Catch B.</p><p>Catch A.</p>"
+            '<h2 class="event-section-header" id="bonuses">Bonuses</h2>'
+            '<div class="bonus-list"><div class="bonus-text">Double XP</div></div>'
+            '</div><div class="wrapper">'
+            '<h2 class="event-section-header" id="spawns">Spawns</h2>'
+            '<ul class="pkmn-list-flex"><li class="pkmn-list-item">'
+            '<div class="pkmn-name">Zubat</div></li><li class="pkmn-list-item">'
+            '<div class="pkmn-name">Abra</div></li></ul>'
+            '<h2 class="event-section-header">Untitled</h2>'
+            '<div class="bonus-list"><div class="bonus-text">Ignored</div></div>'
+            '<h2 class="event-section-header" id="spawns">More spawns</h2>'
+            '<ul class="pkmn-list"><li class="pkmn-list-item">'
+            '<div class="pkmn-name">Abra</div><img class="shiny-icon"></li></ul>'
+            "</div></div>",
+            "lxml",
+        )
+        data = EventPageScraper(self.settings)._parse_event_details(soup, "event-url")
+        self.assertEqual(data["description"], "Intro.")
+        self.assertEqual(list(data["details"]), ["research", "bonuses", "spawns"])
+        self.assertEqual(data["details"]["research"], ["Catch A.", "Catch B."])
+        self.assertEqual(data["details"]["bonuses"], ["Double XP"])
+        self.assertEqual(
+            [(p["name"], p["shiny_available"]) for p in data["details"]["spawns"]],
+            [("Abra", True), ("Zubat", False)],
+        )
+
     def test_event_page_parser_prefers_the_wrapped_description(self) -> None:
         soup = BeautifulSoup(
             '<div class="page-content"><div class="header-page">Title</div>'
@@ -159,5 +610,175 @@ class ParserFixtureTests(unittest.TestCase):
         self.assertEqual(data["description"], "Wrapped description.")
 
 
+class ParserBackendParityTests(unittest.TestCase):
+    """Every scraper must produce the same output on either parser backend."""
+
+    pages = {
+        EggScraper: (
+            '<article class="article-page"><h2>7 km Eggs <!-- gift --></h2>'
+            '<ul class="egg-grid"><li class="pokemon-card"><span class="name">'
+            'Farfetch’d</span><img class="pokemon-image" src="f.png">'
+            '<svg class="shiny-icon"></svg><div class="rarity">'
+            '<svg class="mini-egg"></svg><svg class="mini-egg"></svg></div></li>'
+            '<li class="pokemon-card"><span class="name">Mr. <b>Mime</b></span>'
+            "</li></ul></article>"
+        ),
+        RaidBossScraper: (
+            '<div class="raid-bosses"><div class="tier"><h2 class="header">'
+            'Tier&nbsp;5</h2><div class="card"><p class="name">Mewtwo</p>'
+            '<div class="cp-range"><span>CP</span> 2200 - 2300</div>'
+            '<div class="boosted-cp-row">2700 - 2800</div>'
+            '<div class="boss-type"><div class="type"><img title="Psychic"></div>'
+            '</div><svg class="shiny-icon"></svg>'
+            '<img class="pokemon-image" src="mewtwo.png"></div></div></div>'
+        ),
+        ResearchScraper: (
+            '<div class="task-category"><h2>Catch &amp; Throw</h2>'
+            '<li class="task-item"><span class="task-text">Catch <i>one</i></span>'
+            '<ul class="reward-list"><li class="reward" data-reward-type="encounter">'
+            '<img class="reward-image" src="p.png"><img class="shiny-icon">'
+            '<span class="reward-label"><span>Pikachu</span></span>'
+            '<span class="cp-values"><span class="min-cp">300</span>'
+            '<span class="max-cp">320</span></span></li></ul></li></div>'
+        ),
+        RocketLineupScraper: (
+            '<div class="rocket-profile"><div class="name">Cliff<script>x()</script>'
+            '</div><div class="lineup-info"><div class="slot encounter">'
+            '<div class="shadow-pokemon" data-pokemon="Dratini">'
+            '<img src="dratini.png"><svg class="shiny-icon"></svg></div></div>'
+            '<div class="slot"><div class="pokemon-card" data-pokemon="Zubat">'
+            "</div></div></div></div>"
+        ),
+    }
+
+    def test_scrapers_match_across_backends(self) -> None:
+        settings = {"retries": 1, "delay": 0, "timeout": 1}
+        for scraper_class, markup in self.pages.items():
+            with self.subTest(scraper=scraper_class.__name__):
+                results = [
+                    scraper_class(
+                        "offline", "output", {**settings, "parser": name}
+                    ).parse(get_backend(name).parse(markup.encode("utf-8")))
+                    for name in ("bs4", "lxml")
+                ]
+                self.assertTrue(results[0])
+                self.assertEqual(results[0], results[1])
+
+    def test_event_page_matches_across_backends(self) -> None:
+        markup = (
+            '<div class="page-content"><div class="header-page">Title</div>'
+            '<span id="event-date-start">Monday July 20, 2026</span>'
+            '<span id="event-time-start">at 10:00 AM Local Time</span>'
+            '<span id="event-date-end">Monday July 20, 2026</span>'
+            '<span id="event-time-end">at 11:00 AM Local Time</span>'
+            "<p>First <strong>paragraph</strong> .</p><ul><li>One</li></ul><hr>"
+            '<h2 class="event-section-header" id="spawns">Spawns</h2>'
+            '<ul class="pkmn-list-flex"><li class="pkmn-list-item">'
+            '<div class="pkmn-list-img"><img src="p.png"></div>'
+            '<img class="shiny-icon"><div class="pkmn-name">Pikachu </div></li></ul>'
+            '<h2 class="event-section-header" id="bonuses">Bonuses</h2>'
+            '<div class="bonus-list"><div class="bonus-text">Double XP</div></div>'
+            "</div>"
+        )
+        results = [
+            EventPageScraper({"parser": name})._parse_event_details(
+                get_backend(name).parse(markup), "event-url"
+            )
+            for name in ("bs4", "lxml")
+        ]
+        self.assertEqual(results[0]["details"]["spawns"][0]["name"], "Pikachu")
+        self.assertEqual(results[0], results[1])
+
+    def test_unknown_backend_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            get_backend("html5lib")
+
+
+class ScopedEventPageParsingTests(unittest.TestCase):
+    page = (
+        "<html><head><script>var tracking = true;</script></head><body>"
+        '<nav><a href="/events/">Events</a></nav>'
+        '<span id="event-date-start">Monday July 20, 2026</span>'
+        '<span id="event-time-start">at 10:00 AM Local Time</span>'
+        '<div class="page-content"><div class="header-page">Title</div>'
+        "<p>Intro.</p><hr>"
+        '<span id="event-date-end">Monday July 20, 2026</span>'
+        '<span id="event-time-end">at 11:00 AM Local Time</span>'
+        '<h2 class="event-section-header" id="bonuses">Bonuses</h2>'
+        '<div class="bonus-list"><div class="bonus-text">Double XP</div></div>'
+        "</div><footer><p>Footer text.</p></footer></body></html>"
+    )
+
+    def parse(self, scraper: EventPageScraper) -> dict[str, object]:
+        return scraper._parse_event_details(
+            scraper._parse_document(self.page, "event-url"), "event-url"
+        )
+
+    def test_scoped_tree_only_holds_the_page_regions(self) -> None:
+        root = EventPageScraper({"parser": "bs4"})._parse_document(
+            self.page, "event-url"
+        )
+        self.assertIsNone(root.find("nav"))
+        self.assertIsNone(root.find("footer"))
+        self.assertIsNotNone(root.find("span", id="event-date-start"))
+
+    def test_lxml_skips_the_markup_before_the_page_regions(self) -> None:
+        root = EventPageScraper({"parser": "lxml"})._parse_document(
+            self.page, "event-url"
+        )
+        self.assertEqual(root.xpath("//script | //nav"), [])
+        self.assertEqual(len(root.xpath("//span[@id='event-date-start']")), 1)
+
+    def test_configured_event_parser_scopes(self) -> None:
+        config = load_config()
+        settings = dict(config["scraper_settings"])
+        settings["parser"] = config["scrapers"]["EventScraper"].get(
+            "parser", settings.get("parser")
+        )
+        scraper = EventPageScraper(settings)
+        self.assertTrue(scraper.scoped_parsing)
+        with patch.object(scraper.dom, "parse", wraps=scraper.dom.parse) as full_parse:
+            self.parse(scraper)
+        self.assertNotIn(self.page, [call.args[0] for call in full_parse.mock_calls])
+
+    def test_scoped_parse_matches_full_parse(self) -> None:
+        for parser in ("bs4", "lxml"):
+            with self.subTest(parser=parser):
+                scoped = self.parse(EventPageScraper({"parser": parser}))
+                full = self.parse(
+                    EventPageScraper({"parser": parser, "scoped_parsing": False})
+                )
+                self.assertEqual(scoped["start_time"], "2026-07-20T10:00:00")
+                self.assertEqual(scoped, full)
+
+    def test_incomplete_scoped_tree_falls_back_to_full_parse(self) -> None:
+        scraper = EventPageScraper({"parser": "bs4"})
+        scoped_root = scraper.dom.parse('<div class="page-content"></div>')
+        with patch.object(scraper.dom, "parse_scoped", return_value=scoped_root):
+            data = self.parse(scraper)
+        self.assertEqual(data["start_time"], "2026-07-20T10:00:00")
+        self.assertEqual(data["details"]["bonuses"], ["Double XP"])
+
+
+class PageCorpusTests(unittest.TestCase):
+    """The saved pages parse to the checked-in outputs on both backends."""
+
+    expected_dir = Path(__file__).parent / "fixtures" / "expected"
+
+    def test_corpus_pages_match_expected_output(self) -> None:
+        for class_name, pages in BENCHMARKS.items():
+            for parser in ("bs4", "lxml"):
+                parse = page_parser(class_name, parser)
+                for page in pages:
+                    with self.subTest(page=page, parser=parser):
+                        expected_path = self.expected_dir / page.replace(
+                            ".html", ".json"
+                        )
+                        expected = json.loads(expected_path.read_text(encoding="utf-8"))
+                        self.assertEqual(
+                            parse((CORPUS_DIR / page).read_bytes()), expected
+                        )
+
+
 if __name__ == "__main__":
     unittest.main()
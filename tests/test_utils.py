@@ -0,0 +1,165 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src import utils
+from src.utils import (
+    configure_json_output,
+    encode_json,
+    load_manifest,
+    write_json_atomic,
+    write_output_json,
+)
+
+EXPECTED_DIR = Path(__file__).parent / "fixtures" / "expected"
+DATA = {"Tier 5": [{"name": "Palkia", "types": ["Water", "Dragon"], "cp": 2190}]}
+
+
+class JsonOutputTests(unittest.TestCase):
+    def setUp(self) -> None:
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.directory = Path(temporary_directory.name)
+        self.addCleanup(configure_json_output)
+
+    def test_pretty_output_is_unchanged_and_sidecars_are_reproducible(self) -> None:
+        path = self.directory / "raid_bosses.json"
+        write_json_atomic(path, DATA, gzip_sidecar=True)
+        first_sidecar = (self.directory / "raid_bosses.json.gz").read_bytes()
+        write_json_atomic(path, DATA, gzip_sidecar=True)
+
+        body = path.read_text(encoding="utf-8")
+        self.assertEqual(body, json.dumps(DATA, ensure_ascii=False, indent=4) + "\n")
+        sidecar = (self.directory / "raid_bosses.json.gz").read_bytes()
+        self.assertEqual(sidecar, first_sidecar)
+        self.assertEqual(gzip.decompress(sidecar), path.read_bytes())
+        self.assertEqual(
+            sorted(p.name for p in self.directory.iterdir()),
+            [
+                "raid_bosses.json",
+                "raid_bosses.json.gz",
+            ],
+        )
+
+    def test_compact_output_has_no_whitespace_with_either_encoder(self) -> None:
+        data = {**DATA, "note": "Pokémon"}
+        expected = '{"Tier 5":[{"name":"Palkia","types":["Water","Dragon"],'
+        expected += '"cp":2190}],"note":"Pokémon"}\n'
+        with patch.object(utils, "orjson", None):
+            self.assertEqual(encode_json(data, compact=True).decode(), expected)
+        if utils.orjson is not None:
+            self.assertEqual(encode_json(data, compact=True).decode(), expected)
+
+    @unittest.skipIf(utils.orjson is None, "orjson is not installed")
+    def test_both_encoders_write_the_same_published_outputs(self) -> None:
+        for path in sorted(EXPECTED_DIR.glob("*.json")):
+            with self.subTest(output=path.name):
+                data = json.loads(path.read_text(encoding="utf-8"))
+                with_orjson = encode_json(data, compact=True)
+                with patch.object(utils, "orjson", None):
+                    self.assertEqual(encode_json(data, compact=True), with_orjson)
+
+    def test_outputs_follow_the_configured_format(self) -> None:
+        configure_json_output({"format": "compact", "gzip_sidecars": True})
+        write_output_json(self.directory / "eggs.json", DATA)
+        self.assertEqual(
+            (self.directory / "eggs.json").read_bytes(),
+            encode_json(DATA, compact=True),
+        )
+        self.assertTrue((self.directory / "eggs.json.gz").exists())
+
+        with self.assertRaisesRegex(ValueError, "fancy"):
+            configure_json_output({"format": "fancy"})
+
+
+class OutputManifestTests(unittest.TestCase):
+    def setUp(self) -> None:
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.directory = Path(temporary_directory.name).resolve()
+        environment = patch.dict(
+            os.environ, {"LEAK_DUCK_OUTPUT_DIR": str(self.directory)}
+        )
+        environment.start()
+        self.addCleanup(environment.stop)
+        self.addCleanup(configure_json_output)
+        self.path = self.directory / "raid_bosses.json"
+
+    def test_unchanged_data_is_not_rewritten(self) -> None:
+        self.assertTrue(write_output_json(self.path, DATA))
+        os.utime(self.path, (0, 0))
+        reordered = {"Tier 5": [dict(reversed(DATA["Tier 5"][0].items()))]}
+
+        self.assertFalse(write_output_json(self.path, reordered))
+
+        self.assertEqual(self.path.stat().st_mtime, 0)
+        entry = load_manifest(self.directory)["raid_bosses.json"]
+        self.assertEqual(entry["size"], self.path.stat().st_size)
+        self.assertEqual(entry["records"], 1)
+
+    def test_last_changed_moves_only_when_the_data_changes(self) -> None:
+        write_output_json(self.path, DATA)
+        manifest = load_manifest(self.directory)
+        manifest["raid_bosses.json"]["last_changed"] = "2026-01-01T00:00:00+00:00"
+        (self.directory / "manifest.json").write_text(json.dumps(manifest))
+
+        # A new format or a missing sidecar rewrites the file, not the data.
+        configure_json_output({"format": "compact", "gzip_sidecars": True})
+        self.assertTrue(write_output_json(self.path, DATA))
+        entry = load_manifest(self.directory)["raid_bosses.json"]
+        self.assertEqual(entry["last_changed"], "2026-01-01T00:00:00+00:00")
+        self.assertTrue((self.directory / "raid_bosses.json.gz").exists())
+
+        self.assertTrue(write_output_json(self.path, {"Tier 1": []}))
+        entry = load_manifest(self.directory)["raid_bosses.json"]
+        self.assertNotEqual(entry["last_changed"], "2026-01-01T00:00:00+00:00")
+        self.assertEqual(entry["records"], 0)
+
+    def test_turning_sidecars_off_removes_the_old_copies(self) -> None:
+        configure_json_output({"gzip_sidecars": True})
+        write_output_json(self.path, DATA)
+        sidecar = self.directory / "raid_bosses.json.gz"
+        self.assertTrue(sidecar.exists())
+
+        configure_json_output({"gzip_sidecars": False})
+        self.assertFalse(write_output_json(self.path, DATA))
+        self.assertFalse(sidecar.exists())
+
+        self.assertTrue(write_output_json(self.path, {"Tier 1": []}))
+        self.assertFalse(sidecar.exists())
+
+    def test_an_output_restored_within_a_run_keeps_its_last_changed(self) -> None:
+        events = self.directory / "events.json"
+        write_output_json(events, DATA)
+        manifest = load_manifest(self.directory)
+        manifest["events.json"]["last_changed"] = "2026-01-01T00:00:00+00:00"
+        (self.directory / "manifest.json").write_text(json.dumps(manifest))
+
+        # The archiver prunes events.json, then the event scraper rebuilds it.
+        configure_json_output()
+        self.assertTrue(write_output_json(events, {"Tier 5": []}))
+        self.assertTrue(write_output_json(events, DATA))
+
+        entry = load_manifest(self.directory)["events.json"]
+        self.assertEqual(entry["last_changed"], "2026-01-01T00:00:00+00:00")
+        self.assertEqual(json.loads(events.read_text(encoding="utf-8")), DATA)
+
+    def test_missing_files_are_rewritten_and_other_directories_untracked(self) -> None:
+        write_output_json(self.path, DATA)
+        self.path.unlink()
+        self.assertTrue(write_output_json(self.path, DATA))
+        self.assertTrue(self.path.exists())
+
+        with tempfile.TemporaryDirectory() as elsewhere:
+            outside = Path(elsewhere) / "eggs.json"
+            self.assertTrue(write_output_json(outside, DATA))
+            self.assertTrue(write_output_json(outside, DATA))
+        self.assertEqual(list(load_manifest(self.directory)), ["raid_bosses.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()